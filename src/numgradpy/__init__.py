@@ -5,5 +5,39 @@ NumgradPy
 Dummy command line tool to square a number.
 """
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .__version__ import __version__
 from .cli import console_entry_point
+
+if TYPE_CHECKING:
+    from .api import (
+        GradientEngine,
+        GradientResult,
+        GradientSettings,
+        compute_gradient,
+        compute_gradient_async,
+    )
+
+_API = (
+    "GradientEngine",
+    "GradientResult",
+    "GradientSettings",
+    "compute_gradient",
+    "compute_gradient_async",
+)
+
+__all__ = ["__version__", "console_entry_point", *_API]
+
+
+def __getattr__(name: str) -> Any:
+    # the library interface (and NumPy) is imported on first use only, so
+    # that the command line and the thin client start quickly
+    if name in _API:
+        # pylint: disable-next=import-outside-toplevel
+        from . import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,268 @@
+"""
+Re-entrant library interface for the numerical gradient.
+
+Every call works in its own explicit directory with its own configuration
+and environment. Neither the working directory nor os.environ nor the run
+configuration of the process are read after the call has started or
+modified, so that many calculations can run at the same time from threads
+or asyncio tasks, as long as their work directories differ.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .constants import RunConfig
+from .extprocs.jobs import program_environment
+from .extprocs.scheduler import ThreadJobScheduler
+from .gradient.structurerun import StructureRun, run_structures
+from .io import Structure
+
+
+@dataclass(frozen=True)
+class GradientSettings:
+    """
+    Settings of one gradient calculation.
+
+    Attributes
+    ----------
+    workdir : str
+        Directory of all files of the calculation (created if missing).
+        Calculations running at the same time need different directories.
+    binary : str
+        Name of the binary that generates the ORCA inputs.
+    step : float
+        Finite-difference step in Bohr.
+    nprocs : int
+        Number of single points that run at the same time.
+    config : Tuple[str, ...]
+        Configuration entries of the form 'section.key=value'. The project
+        file '.numgradpyrc' is read from 'workdir'.
+    environ : Mapping[str, str] | None
+        Environment of the external programs and source of the NUMGRADPY_*
+        configuration variables (default: a copy of os.environ at the start
+        of the call).
+    dipole : bool
+        Also read the dipole moments and return the dipole derivatives.
+    """
+
+    workdir: str
+    binary: str = "qvSZP"
+    step: float = 5e-5
+    nprocs: int = 6
+    config: Tuple[str, ...] = ()
+    environ: Mapping[str, str] | None = None
+    dipole: bool = True
+
+
+@dataclass(frozen=True)
+class GradientResult:
+    """
+    Result of a gradient calculation (all in atomic units). Without the
+    displacements, 'gradient' and 'dipgrad' are None.
+    """
+
+    energy: float
+    gradient: npt.NDArray[np.float64] | None
+    dipole: npt.NDArray[np.float64] | None
+    dipgrad: npt.NDArray[np.float64] | None
+    workdir: str
+    alpha: npt.NDArray[np.float64] | None = None
+
+
+class GradientEngine:
+    """
+    Gradient calculations that keep their configuration, worker pool and
+    work directories from call to call.
+
+    The single points are scheduled as in batch mode ('StructureRun'),
+    with the retries and speculative copies of the 'orca' configuration.
+    The directory of each structure keeps the orbitals ('eq.gbw') of its
+    last equilibrium calculation, which ORCA reads as the initial guess of
+    the next call for the same directory (e.g. the next optimisation step).
+    Calls of one engine from several threads run one after another.
+    """
+
+    def __init__(self, settings: GradientSettings) -> None:
+        """
+        Load the configuration and start the worker pool.
+        """
+
+        if settings.nprocs < 1:
+            raise ValueError("Number of parallel single points must be positive.")
+        self.settings = settings
+        self.workdir = os.path.abspath(settings.workdir)
+        os.makedirs(self.workdir, exist_ok=True)
+        environ = dict(os.environ if settings.environ is None else settings.environ)
+        self.config = RunConfig.load(
+            settings.config,
+            environ=environ,
+            projectdir=self.workdir,
+            home=environ.get("HOME"),
+        )
+        self.env = program_environment(self.config, environ)
+        # the work is done by the external programs, so threads suffice
+        self._scheduler = ThreadJobScheduler.from_config(
+            settings.nprocs, config=self.config
+        )
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> GradientEngine:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker pool.
+        """
+
+        self._scheduler.close()
+
+    def compute(
+        self,
+        structures: Sequence[Structure],
+        labels: Sequence[str] | None = None,
+        polarizability: bool = False,
+        gradient: bool = True,
+    ) -> list[GradientResult]:
+        """
+        Calculate the gradients of several structures on one schedule.
+
+        The equilibrium points of all structures are submitted first; the
+        displacements of a structure are released as soon as its
+        equilibrium point has finished.
+
+        Parameters
+        ----------
+        structures : Sequence[Structure]
+            Structures, e.g. the images of a reaction path.
+        labels : Sequence[str] | None
+            Subdirectories of the work directory per structure (default:
+            the work directory itself for one structure, '000', '001', ...
+            for several).
+        polarizability : bool
+            Also calculate the analytical (CP-SCF) polarizability.
+        gradient : bool
+            Run the displacements; without them only the equilibrium
+            points (energy, dipole moment, polarizability) are calculated.
+
+        Returns
+        -------
+        results : list[GradientResult]
+            Results in the order of the structures.
+        """
+
+        if labels is None:
+            labels = (
+                [""]
+                if len(structures) == 1
+                else [f"{n:03d}" for n in range(len(structures))]
+            )
+        if len(labels) != len(structures):
+            raise ValueError("One label per structure is required.")
+
+        runs = [
+            StructureRun(
+                n,
+                label,
+                struc,
+                os.path.join(self.workdir, label),
+                self.settings.binary,
+                self.settings.step,
+                self.config,
+                self.env,
+                gradient=gradient,
+                dipole="property" if self.settings.dipole else None,
+                alpha="cpscf" if polarizability else None,
+                dipgrad=self.settings.dipole,
+            )
+            for n, (struc, label) in enumerate(zip(structures, labels))
+        ]
+        with self._lock:
+            run_structures(self._scheduler, iter(runs), lambda run: None, len(runs))
+        return [self._result(run) for run in runs]
+
+    @staticmethod
+    def _result(run: StructureRun) -> GradientResult:
+        record = run.summary()
+        if run.error is not None:
+            raise RuntimeError(f"Calculation of '{run.workdir}' failed: {run.error}")
+
+        def tensor(name: str) -> npt.NDArray[np.float64] | None:
+            value = record.get(name)
+            return None if value is None else np.array(value, dtype=np.float64)
+
+        assert run.eq_energy is not None
+        return GradientResult(
+            energy=run.eq_energy,
+            gradient=tensor("gradient"),
+            dipole=tensor("dipole"),
+            dipgrad=tensor("dipgrad"),
+            workdir=run.workdir,
+            alpha=tensor("alpha"),
+        )
+
+
+def compute_gradient(
+    structure: Structure | str, settings: GradientSettings
+) -> GradientResult:
+    """
+    Calculate the energy and the numerical nuclear gradient of a structure.
+
+    Parameters
+    ----------
+    structure : Structure | str
+        Structure or name of a structure file (relative names are resolved
+        against the working directory of the process at the call).
+    settings : GradientSettings
+        Settings of the calculation.
+
+    Returns
+    -------
+    result : GradientResult
+        Energy, gradient of shape (nat, 3) and, if requested, the dipole
+        moment and the dipole derivatives of shape (3N, 3).
+    """
+
+    if isinstance(structure, str):
+        struc = Structure()
+        struc.read(structure)
+    else:
+        struc = structure
+
+    with GradientEngine(settings) as engine:
+        return engine.compute([struc])[0]
+
+
+async def compute_gradient_async(
+    structure: Structure | str,
+    settings: GradientSettings,
+    executor: Executor | None = None,
+) -> GradientResult:
+    """
+    Run 'compute_gradient' in an executor (default: that of the event
+    loop), so that an event loop can await many calculations at once.
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(compute_gradient, structure, settings)
+    )
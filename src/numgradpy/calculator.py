@@ -0,0 +1,186 @@
+"""
+ASE calculator running the NumGradPy engine.
+
+Requires the optional 'ase' package (pip install numgradpy[ase]). The
+calculator keeps one GradientEngine (configuration and thread pool) and
+its own work directory, whose orbitals start the next step. Calculators
+attached to the images of a band with 'attach_band' calculate all images
+that have moved on one schedule.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from .api import GradientEngine, GradientResult, GradientSettings
+from .constants import AA2AU, AU2EV
+from .io import Structure
+
+try:
+    from ase import Atoms
+    from ase.calculators.calculator import Calculator, all_changes
+except ImportError as exc:
+    raise ImportError(
+        "The ASE calculator requires the 'ase' package (pip install numgradpy[ase])."
+    ) from exc
+
+
+def atoms_structure(
+    atoms: Atoms, charge: int | None = None, multiplicity: int | None = None
+) -> Structure:
+    """
+    Structure (atomic units) of an ASE Atoms object.
+    """
+
+    struc = Structure()
+    struc.nat = len(atoms)
+    struc.atoms = list(atoms.get_chemical_symbols())
+    struc.coordinates = np.ascontiguousarray(
+        atoms.get_positions() * AA2AU, dtype=np.float64
+    )
+    struc.charge = charge
+    struc.multiplicity = multiplicity
+    return struc
+
+
+def ase_results(result: GradientResult) -> dict[str, Any]:
+    """
+    Results of a gradient calculation in the units of ASE (eV, Angstrom).
+    """
+
+    results: dict[str, Any] = {"energy": result.energy * AU2EV}
+    if result.gradient is not None:
+        results["forces"] = -result.gradient * AU2EV * AA2AU
+    if result.dipole is not None:
+        results["dipole"] = result.dipole / AA2AU
+    if result.alpha is not None:
+        # e^2 Bohr^2 / Hartree -> e^2 Angstrom^2 / eV
+        results["polarizability"] = result.alpha / AA2AU**2 / AU2EV
+    return results
+
+
+class NumGradPyCalculator(Calculator):
+    """
+    ASE calculator with the energy, the numerical forces, the dipole moment
+    and the analytical (CP-SCF) polarizability of NumGradPy.
+
+    Parameters are 'charge' and 'multiplicity' of the molecule (default:
+    those of the q-vSZP configuration) and 'polarizability', which adds the
+    CP-SCF polarizability to every calculation, so that a later request for
+    it does not repeat the calculation (default: only when it is requested).
+    The displacements run only for requests of the forces.
+    """
+
+    implemented_properties = ["energy", "forces", "dipole", "polarizability"]
+    default_parameters: dict[str, Any] = {
+        "charge": None,
+        "multiplicity": None,
+        "polarizability": False,
+    }
+
+    def __init__(
+        self,
+        settings: GradientSettings | None = None,
+        engine: GradientEngine | None = None,
+        image: str = "",
+        **kwargs: Any,
+    ) -> None:
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        settings : GradientSettings | None
+            Settings of a new engine owned by the calculator.
+        engine : GradientEngine | None
+            Engine shared with other calculators (instead of 'settings').
+        image : str
+            Subdirectory of the work directory of the engine.
+        """
+
+        super().__init__(**kwargs)
+        if engine is None:
+            if settings is None:
+                raise ValueError("Either settings or an engine are required.")
+            engine = GradientEngine(settings)
+            self._owner = True
+        else:
+            self._owner = False
+        self.engine = engine
+        self.image = image
+        self.band: list[Atoms] | None = None
+
+    @classmethod
+    def attach_band(
+        cls, images: Sequence[Atoms], settings: GradientSettings, **kwargs: Any
+    ) -> GradientEngine:
+        """
+        Attach calculators sharing one engine to the images of a band
+        (e.g. NEB), so that the first force request after a step calculates
+        all images that have moved on one schedule.
+
+        Returns
+        -------
+        engine : GradientEngine
+            Engine of the band, to be closed by the caller.
+        """
+
+        engine = GradientEngine(settings)
+        band = list(images)
+        for n, atoms in enumerate(band):
+            calc = cls(engine=engine, image=f"{n:03d}", **kwargs)
+            calc.band = band
+            atoms.calc = calc
+        return engine
+
+    def calculate(
+        self,
+        atoms: Atoms | None = None,
+        properties: Sequence[str] = ("energy",),
+        system_changes: Sequence[str] = tuple(all_changes),
+    ) -> None:
+        super().calculate(atoms, properties, system_changes)
+        assert self.atoms is not None
+
+        # this image and all images of the band that have moved since
+        members: list[tuple[NumGradPyCalculator, Atoms]] = [(self, self.atoms)]
+        for other in self.band or []:
+            calc = other.calc
+            if (
+                calc is self
+                or not isinstance(calc, NumGradPyCalculator)
+                or calc.engine is not self.engine
+            ):
+                continue
+            if calc.atoms is None or calc.check_state(other):
+                members.append((calc, other))
+
+        results = self.engine.compute(
+            [
+                atoms_structure(
+                    member,
+                    calc.parameters.get("charge"),
+                    calc.parameters.get("multiplicity"),
+                )
+                for calc, member in members
+            ],
+            labels=[calc.image for calc, _ in members],
+            polarizability=bool(self.parameters.get("polarizability"))
+            or "polarizability" in properties,
+            gradient="forces" in properties,
+        )
+        for (calc, member), result in zip(members, results):
+            if calc is not self:
+                calc.atoms = member.copy()
+            calc.results = ase_results(result)
+
+    def close(self) -> None:
+        """
+        Stop the engine if it is owned by this calculator.
+        """
+
+        if self._owner:
+            self.engine.close()
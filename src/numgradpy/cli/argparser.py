@@ -19,6 +19,159 @@ def parser() -> argparse.ArgumentParser:
 
     p = argparse.ArgumentParser(description="Calculate the gradient of a function.")
 
+    add_calculation_arguments(p)
+    p.add_argument(
+        "-s",
+        "--struc",
+        type=str,
+        help="Structure file (XYZ, extended XYZ or Turbomole coord) that is used for the calculation.",
+        required=True,
+    )
+
+    return p
+
+
+def add_calculation_arguments(p: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments defining the calculation (binary, finite difference
+    and requested properties) to a parser.
+
+    Parameters
+    ----------
+    p : argparse.ArgumentParser
+        Parser to which the arguments are added.
+    """
+
+    add_run_arguments(p)
+    p.add_argument(
+        "-g",
+        "--gradient",
+        nargs="?",
+        const="numerical",
+        default=False,
+        choices=["numerical", "analytic"],
+        help="Calculate the gradient from the 6N nuclear displacements \
+('numerical', default) or analytically with ORCA (EnGrad) in the equilibrium \
+calculation, checked against central differences of random components \
+('analytic').",
+        required=False,
+    )
+    p.add_argument(
+        "--spotchecks",
+        type=int,
+        default=3,
+        help="Number of random Cartesian components of an analytic gradient \
+that are checked against central differences (default: 3).",
+        required=False,
+    )
+    p.add_argument(
+        "--spotcheck-tol",
+        type=float,
+        default=1e-4,
+        help="Largest deviation of a checked component in Hartree/Bohr before \
+the full numerical gradient is calculated instead (default: 1e-4).",
+        required=False,
+    )
+    p.add_argument(
+        "--spotcheck-seed",
+        type=int,
+        default=None,
+        help="Seed of the random choice of the spot-checked components \
+(default: a new seed, which is printed).",
+        required=False,
+    )
+    p.add_argument(
+        "--append-gradient",
+        action="store_true",
+        help="Add the gradient as the next cycle of an existing 'gradient' \
+file instead of overwriting it, as Turbomole-style optimisers expect.",
+        required=False,
+    )
+    p.add_argument(
+        "--directions",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Calculate only the derivatives along the displacement vectors in \
+FILE (text with 3N numbers per vector or .npy, 2 single points per vector).",
+        required=False,
+    )
+    p.add_argument(
+        "--hessian",
+        default=False,
+        action="store_true",
+        help="Calculate the semi-numerical Hessian from analytical ORCA \
+gradients and the harmonic frequencies.",
+        required=False,
+    )
+    p.add_argument(
+        "--raman",
+        default=False,
+        action="store_true",
+        help="Calculate Raman activities from the polarizabilities of the \
+nuclear displacements (implies --hessian).",
+        required=False,
+    )
+    p.add_argument(
+        "-d",
+        "--dipole",
+        nargs="?",
+        const="property",
+        default=False,
+        choices=["property", "finitefield", "check"],
+        help="Calculate the dipole moment: read from the equilibrium ORCA \
+property file (default, no extra single points), from finite fields (six \
+single points) or both with a report of the difference ('check').",
+        required=False,
+    )
+    p.add_argument(
+        "-a",
+        "--alpha",
+        nargs="?",
+        const=True,
+        default=False,
+        choices=["analytical", "numdiff", "cpscf"],
+        help="Calculate the polarizability: from the dipole moments of six \
+field points ('analytical', default), from the energies of field points \
+('numdiff') or analytically by ORCA in the equilibrium calculation \
+('cpscf', no further single points).",
+        required=False,
+    )
+    p.add_argument(
+        "--beta",
+        default=False,
+        action="store_true",
+        help="Calculate the first hyperpolarizability from finite fields.",
+        required=False,
+    )
+    p.add_argument(
+        "--gamma",
+        default=False,
+        action="store_true",
+        help="Calculate the second hyperpolarizability from finite fields.",
+        required=False,
+    )
+    p.add_argument(
+        "--fieldsource",
+        choices=["dipole", "energy"],
+        default="dipole",
+        help="Differentiate the dipole moments (default) or the energies of \
+the field points for the hyperpolarizabilities.",
+        required=False,
+    )
+
+
+def add_run_arguments(p: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments shared by all modes (binary, finite difference,
+    configuration and results store) to a parser.
+
+    Parameters
+    ----------
+    p : argparse.ArgumentParser
+        Parser to which the arguments are added.
+    """
+
     # define arguments that are passed via a command line flag (e.g. -n)
     p.add_argument(
         "-f",
@@ -36,13 +189,6 @@ def parser() -> argparse.ArgumentParser:
         help="Binary that is used for the calculation.",
         required=True,
     )
-    p.add_argument(
-        "-s",
-        "--struc",
-        type=str,
-        help="Structure file that is used for the calculation.",
-        required=True,
-    )
     p.add_argument(
         "-v",
         "--verbose",
@@ -52,28 +198,285 @@ def parser() -> argparse.ArgumentParser:
         required=False,
     )
     p.add_argument(
-        "-g",
-        "--gradient",
+        "--accuracy",
+        type=float,
+        default=None,
+        help="Target accuracy of the derivatives (e.g. 1e-5 Hartree/Bohr); \
+the loosest SCF convergence and grid whose energy noise divided by the \
+step stays below it are used (explicit --set entries take precedence).",
+        required=False,
+    )
+    p.add_argument(
+        "--measure-noise",
         default=False,
         action="store_true",
-        help="Calculate the gradient.",
+        help="With --accuracy, recalculate the equilibrium point with the \
+configured settings and report the measured energy deviation and time.",
         required=False,
     )
     p.add_argument(
-        "-d",
-        "--dipole",
+        "--agents",
+        type=str,
+        metavar="[HOST:]PORT",
+        help="Run the single points on worker agents ('numgradpy agent') \
+that connect to this address instead of on local worker processes \
+(default host: localhost).",
+        default=None,
+        required=False,
+    )
+    p.add_argument(
+        "--agent-token",
+        type=str,
+        help="Shared secret the agents have to register with (required for \
+addresses other than the loopback interface).",
+        default=None,
+        required=False,
+    )
+    p.add_argument(
+        "--set",
+        type=str,
+        action="append",
+        default=[],
+        metavar="SECTION.KEY=VALUE",
+        help="Override a configuration entry, e.g. 'qvszp.mpi=4' (takes \
+precedence over NUMGRADPY_<SECTION>_<KEY> variables, ./.numgradpyrc and \
+~/.numgradpyrc).",
+        required=False,
+    )
+    p.add_argument(
+        "--store",
+        type=str,
+        help="Directory of a binary results store, to which the geometry, all \
+single point results and the final tensors are appended.",
+        default=None,
+        required=False,
+    )
+
+
+def check_run_arguments(p: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """
+    Reject combinations of the run arguments that are accepted by the
+    parser 'p' but would be ignored.
+    """
+
+    if args.measure_noise and args.accuracy is None:
+        p.error("--measure-noise requires --accuracy.")
+
+
+def batch_parser() -> argparse.ArgumentParser:
+    """
+    Parser for the command line arguments of the 'batch' subcommand.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        Parser for command line arguments.
+    """
+
+    p = argparse.ArgumentParser(
+        prog="numgradpy batch",
+        description="Calculate derivatives for many structures on one worker pool.",
+    )
+
+    add_calculation_arguments(p)
+    p.add_argument(
+        "-i",
+        "--input",
+        type=str,
+        help="Multi-frame XYZ file or text file listing one structure file per line.",
+        required=True,
+    )
+    p.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="JSON lines file to which one record per structure is streamed.",
+        default="numgradpy_batch.jsonl",
+        required=False,
+    )
+    p.add_argument(
+        "-w",
+        "--workdir",
+        type=str,
+        help="Directory holding one subdirectory per structure.",
+        default="numgradpy_batch",
+        required=False,
+    )
+    p.add_argument(
+        "-n",
+        "--nprocs",
+        type=int,
+        help="Number of parallel single point calculations.",
+        default=6,
+        required=False,
+    )
+    p.add_argument(
+        "--maxpending",
+        type=int,
+        help="Maximum number of queued and running single points.",
+        default=None,
+        required=False,
+    )
+    p.add_argument(
+        "--maxstructures",
+        type=int,
+        help="Maximum number of structures that are processed at the same time.",
+        default=16,
+        required=False,
+    )
+
+    return p
+
+
+def optimize_parser() -> argparse.ArgumentParser:
+    """
+    Parser for the command line arguments of the 'optimize' subcommand.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        Parser for command line arguments.
+    """
+
+    p = argparse.ArgumentParser(
+        prog="numgradpy optimize",
+        description="Optimise a structure with the numerical gradient.",
+    )
+
+    add_run_arguments(p)
+    p.add_argument(
+        "-s",
+        "--struc",
+        type=str,
+        help="Structure file (XYZ, extended XYZ or Turbomole coord) that is optimised.",
+        required=True,
+    )
+    p.add_argument(
+        "--maxcycles",
+        type=int,
+        help="Maximum number of optimisation cycles.",
+        default=50,
+        required=False,
+    )
+    p.add_argument(
+        "--trustradius",
+        type=float,
+        help="Maximum length of an optimisation step in Bohr.",
+        default=0.3,
+        required=False,
+    )
+    p.add_argument(
+        "--econv",
+        type=float,
+        help="Convergence threshold of the energy change in Hartree.",
+        default=5e-6,
+        required=False,
+    )
+    p.add_argument(
+        "--gconv",
+        type=float,
+        help="Convergence threshold of the largest gradient component in \
+Hartree/Bohr (the RMS threshold is a third of it).",
+        default=3e-4,
+        required=False,
+    )
+
+    return p
+
+
+def serve_parser() -> argparse.ArgumentParser:
+    """
+    Parser for the command line arguments of the 'serve' subcommand.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        Parser for command line arguments.
+    """
+
+    p = argparse.ArgumentParser(
+        prog="numgradpy serve",
+        description="Run a daemon that executes NumGradPy command lines on a \
+warm worker pool. Clients forward their command lines to it if the socket is \
+given in the environment variable NUMGRADPY_SOCKET.",
+    )
+
+    p.add_argument(
+        "--socket",
+        type=str,
+        help="Path of the Unix socket of the daemon.",
+        default="numgradpy.sock",
+        required=False,
+    )
+    p.add_argument(
+        "-n",
+        "--nprocs",
+        type=int,
+        help="Number of worker processes of the shared pool.",
+        default=6,
+        required=False,
+    )
+    p.add_argument(
+        "--stop",
         default=False,
         action="store_true",
-        help="Calculate the dipole moment.",
+        help="Stop the daemon listening on the socket.",
+        required=False,
+    )
+
+    return p
+
+
+def agent_parser() -> argparse.ArgumentParser:
+    """
+    Parser for the command line arguments of the 'agent' subcommand.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        Parser for command line arguments.
+    """
+
+    p = argparse.ArgumentParser(
+        prog="numgradpy agent",
+        description="Run a worker agent that connects to a NumGradPy run \
+started with '--agents' and calculates its single points on this host.",
+    )
+
+    p.add_argument(
+        "connect",
+        type=str,
+        metavar="HOST:PORT",
+        help="Address of the NumGradPy run.",
+    )
+    p.add_argument(
+        "-n",
+        "--capacity",
+        type=int,
+        help="Number of single points that run at the same time.",
+        default=1,
         required=False,
     )
     p.add_argument(
-        "-a",
-        "--alpha",
-        nargs="?",
-        const=True,
-        default=False,
-        help="Calculate the polarizability.",
+        "--scratch",
+        type=str,
+        help="Directory of the temporary task directories.",
+        default=None,
+        required=False,
+    )
+    p.add_argument(
+        "--token",
+        type=str,
+        help="Shared secret of the NumGradPy run.",
+        default=None,
+        required=False,
+    )
+    p.add_argument(
+        "--wait",
+        type=float,
+        help="Time in seconds during which the connection is retried, if \
+the run has not started yet (default: 60).",
+        default=60.0,
         required=False,
     )
 
@@ -0,0 +1,183 @@
+"""
+Batch driver processing many structures on one persistent worker pool.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from argparse import Namespace
+from collections.abc import Iterator, Mapping
+from contextlib import ExitStack
+from typing import TextIO
+
+import numpy as np
+
+from ..constants import set_run_config
+from ..extprocs.jobs import program_environment
+from ..extprocs.scheduler import JobScheduler
+from ..gradient.structurerun import StructureRun, run_structures
+from ..io import ResultsStore, Structure, XYZTrajectory
+from ..io.structure import format_from_name
+from .driver import load_run_config
+
+
+class BatchDriver:
+    """
+    Driver for the 'batch' subcommand of the NumGradPy CLI.
+    """
+
+    def __init__(
+        self, args: Namespace, environ: Mapping[str, str] | None = None
+    ) -> None:
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        args : Namespace
+            Command line arguments of the 'batch' subcommand.
+        environ : Mapping[str, str] | None
+            Environment with the NUMGRADPY_* configuration variables
+            (default: os.environ).
+        """
+
+        self.args = args
+        # parsed once and sent along with every job
+        self.config, _ = load_run_config(args, environ)
+        set_run_config(self.config)
+        self.env = program_environment(self.config)
+        if args.alpha == "numdiff":
+            raise ValueError(
+                "Batch mode supports only the analytical and the CP-SCF \
+polarizability."
+            )
+        if args.gradient == "analytic":
+            raise ValueError("Batch mode supports only the numerical gradient.")
+        unsupported = [
+            option
+            for option, requested in (
+                ("--hessian", args.hessian),
+                ("--raman", args.raman),
+                ("--beta", args.beta),
+                ("--gamma", args.gamma),
+                ("--directions", args.directions is not None),
+                ("--measure-noise", args.measure_noise),
+                ("--append-gradient", args.append_gradient),
+                # the agents run only ORCA single points, not whole structures
+                ("--agents", args.agents is not None),
+            )
+            if requested
+        ]
+        if unsupported:
+            raise ValueError(f"Batch mode does not support {', '.join(unsupported)}.")
+
+    def structures(self) -> Iterator[tuple[str, Structure]]:
+        """
+        Yield all structures of the input lazily.
+
+        A (multi-frame) XYZ file is read frame by frame; any other file is
+        a list with one structure file per line, relative to the list.
+        """
+
+        inputfile = self.args.input
+        if format_from_name(inputfile) == "xyz":
+            with XYZTrajectory(inputfile) as traj:
+                for i in range(len(traj)):
+                    yield f"{inputfile}:{i}", traj.read_frame(i)
+            return
+
+        listdir = os.path.dirname(os.path.abspath(inputfile))
+        with open(inputfile, encoding="UTF-8") as file:
+            for line in file:
+                path = line.strip()
+                if not path or path.startswith("#"):
+                    continue
+                struc = Structure()
+                struc.read(os.path.join(listdir, path))
+                yield path, struc
+
+    def runs(self) -> Iterator[StructureRun]:
+        """
+        Yield the bookkeeping of all structures of the input lazily.
+        """
+
+        args = self.args
+        for index, (label, struc) in enumerate(self.structures()):
+            yield StructureRun(
+                index,
+                label,
+                struc,
+                os.path.join(args.workdir, f"{index:06d}"),
+                args.binary,
+                args.finitediff,
+                self.config,
+                self.env,
+                gradient=bool(args.gradient),
+                dipole=args.dipole,
+                alpha=args.alpha,
+            )
+
+    def run(self) -> None:
+        """
+        Run all single points of all structures on one worker pool.
+        """
+
+        st = time.time()
+        args = self.args
+
+        counts = {"done": 0, "failed": 0}
+        with ExitStack() as stack:
+            # the results store is closed as well if a structure raises
+            store = (
+                stack.enter_context(ResultsStore(args.store))
+                if args.store is not None
+                else None
+            )
+            sched = stack.enter_context(
+                JobScheduler.from_config(args.nprocs, args.maxpending, self.config)
+            )
+            out = stack.enter_context(open(args.output, "w", encoding="UTF-8"))
+
+            def finished(run: StructureRun) -> None:
+                counts["done"] += 1
+                counts["failed"] += run.error is not None
+                record = run.summary()
+                self.write_record(out, record)
+                if store is not None:
+                    for name in (
+                        "gradient",
+                        "dipgrad",
+                        "dipole",
+                        "dipolefield",
+                        "alpha",
+                    ):
+                        if name in record:
+                            store.add_tensor(run.index, name, np.array(record[name]))
+                rate = counts["done"] / max(time.time() - st, 1e-9) * 3600.0
+                print(
+                    f"Structure {run.index + 1} ({run.label}) "
+                    f"{'failed' if run.error else 'done'}: "
+                    f"{counts['done']} structures, {rate:.1f} structures/h"
+                )
+
+            run_structures(sched, self.runs(), finished, args.maxstructures, store)
+            print(f"Single point jobs: {sched.report()}")
+
+        et = time.time()
+        ndone, nfailed = counts["done"], counts["failed"]
+        rate = ndone / max(et - st, 1e-9) * 3600.0
+        print(
+            f"Processed {ndone} structures ({nfailed} failed) in {et-st:.2f} s: "
+            f"{rate:.1f} structures/h"
+        )
+
+    @staticmethod
+    def write_record(out: TextIO, record: dict[str, object]) -> None:
+        """
+        Append one structure record as a JSON line and flush it to disk.
+        """
+
+        out.write(json.dumps(record) + "\n")
+        out.flush()
@@ -0,0 +1,110 @@
+"""
+Thin client of the NumGradPy daemon ('numgradpy serve').
+
+If the environment variable NUMGRADPY_SOCKET points to the socket of a
+running daemon, the command line is forwarded to it instead of being run
+in a new process, so that existing scripts calling 'numgradpy' get the
+warm worker pool without changes. Only the standard library is imported
+here to keep the start-up of the client short.
+
+Protocol: one JSON object per line in each direction.
+
+- request: {"version": 1, "argv": [...], "cwd": "...", "env": {...}}
+  ('env' holds the NUMGRADPY_* configuration variables of the client),
+  or {"version": 1, "command": "ping" | "shutdown"}
+- response: {"returncode": int, "stdout": "...", "stderr": "..."}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+PROTOCOL_VERSION = 1
+"""Version of the JSON protocol between client and daemon."""
+
+SOCKET_ENV = "NUMGRADPY_SOCKET"
+"""Environment variable with the path of the daemon socket."""
+
+
+def request(socketpath: str, message: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Send one request to the daemon and wait for the response.
+
+    Parameters
+    ----------
+    socketpath : str
+        Path of the Unix socket of the daemon.
+    message : Mapping[str, Any]
+        Request (the protocol version is added).
+
+    Returns
+    -------
+    response : dict[str, Any]
+        Decoded response of the daemon.
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socketpath)
+        payload = dict(message, version=PROTOCOL_VERSION)
+        sock.sendall(json.dumps(payload).encode("UTF-8") + b"\n")
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError(f"No response from the daemon at '{socketpath}'.")
+    response: dict[str, Any] = json.loads(line)
+    return response
+
+
+def forward(
+    socketpath: str,
+    argv: Sequence[str],
+    cwd: str | None = None,
+    environ: Mapping[str, str] | None = None,
+) -> int | None:
+    """
+    Run a command line on the daemon and print its output.
+
+    Parameters
+    ----------
+    socketpath : str
+        Path of the Unix socket of the daemon.
+    argv : Sequence[str]
+        Command line arguments (without the program name).
+    cwd : str | None
+        Working directory of the command (default: current directory).
+    environ : Mapping[str, str] | None
+        Environment whose NUMGRADPY_* variables are sent along
+        (default: os.environ).
+
+    Returns
+    -------
+    returncode : int | None
+        Exit code of the command or None if no daemon is reachable, in which
+        case the command has to be run locally.
+    """
+
+    environ = os.environ if environ is None else environ
+    try:
+        response = request(
+            socketpath,
+            {
+                "argv": list(argv),
+                "cwd": os.path.abspath(cwd if cwd is not None else os.getcwd()),
+                "env": {
+                    key: value
+                    for key, value in environ.items()
+                    if key.startswith("NUMGRADPY_") and key != SOCKET_ENV
+                },
+            },
+        )
+    except (ConnectionError, FileNotFoundError):
+        return None
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("returncode", 1))
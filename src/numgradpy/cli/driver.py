@@ -2,30 +2,102 @@
 Driver for the NumGradPy CLI.
 """
 
+from __future__ import annotations
+
 import os
 import shutil
 import time
 from argparse import Namespace
+from collections.abc import Mapping
+from contextlib import ExitStack
+
+import numpy as np
+import numpy.typing as npt
 
-from ..constants import DefaultArguments
-from ..extprocs.singlepoint import sp_orca as spo
+from ..constants import (
+    PrecisionSettings,
+    RunConfig,
+    describe_precision,
+    reference_settings,
+    select_precision,
+    set_run_config,
+)
+from ..extprocs.agents import AgentScheduler, parse_address
+from ..extprocs.jobs import orca_timeout, program_environment
+from ..extprocs.scheduler import JobScheduler
+from ..extprocs.singlepoint import (
+    POLARIZABILITY_BLOCK,
+    add_orca_block,
+    add_orca_keywords,
+    add_orca_moread,
+    sp_orca_recover,
+)
 from ..extprocs.singlepoint import sp_qvszp as spq
+from ..extprocs.singlepoint import structure_arglist
+from ..gradient.gradients import PreparedDisplacements, dipole_derivatives
 from ..gradient.gradients import dipole_gradient_analytical as dpa
 from ..gradient.gradients import (
     dipole_gradient_numdiff,
+    directional_gradient,
+    displacement_gradient,
     efield_gradient,
+    field_derivatives,
+    gradient_components,
     nuclear_gradient,
+    polarizability_derivatives,
+    seminumerical_hessian,
+    subspace_gradient,
 )
+from ..gradient.vibrations import harmonic_analysis, ir_intensities, raman_activities
 from ..io import (
+    ResultsStore,
     Structure,
+    get_orca_dipolemoment,
     get_orca_energy,
+    get_orca_engrad,
+    get_orca_polarizability,
+    read_displacement_vectors,
     write_dipole,
+    write_directional_derivatives,
+    write_hyperpolarizability,
     write_polarizability,
+    write_tm_dipgrad,
     write_tm_energy,
     write_tm_gradient,
+    write_tm_hessian,
+    write_tm_vibspectrum,
 )
 
 
+def load_run_config(
+    args: Namespace, environ: Mapping[str, str] | None = None
+) -> tuple[RunConfig, PrecisionSettings | None]:
+    """
+    Load the run configuration, with the SCF settings selected for the
+    target accuracy of the derivatives if one is given.
+
+    Returns
+    -------
+    config : RunConfig
+        Configuration of the run.
+    precision : PrecisionSettings | None
+        Selected SCF settings (None without '--accuracy').
+    """
+
+    config = RunConfig.load(args.set, environ=environ)
+    if args.accuracy is None:
+        return config, None
+
+    precision = select_precision(args.accuracy, args.finitediff)
+    reference = reference_settings(
+        config.get("qvszp", "conv"), config.get("qvszp", "defgrid"), args.finitediff
+    )
+    print(describe_precision(precision, args.accuracy, reference))
+    # entries given with --set are applied last and take precedence
+    config = RunConfig.load(precision.overrides() + args.set, environ=environ)
+    return config, precision
+
+
 class Driver:
     """
     Driver for the NumGradPy CLI.
@@ -33,7 +105,12 @@ class Driver:
 
     prefix_eq = "eq"
 
-    def __init__(self, args: Namespace) -> None:
+    def __init__(
+        self,
+        args: Namespace,
+        environ: Mapping[str, str] | None = None,
+        scheduler: JobScheduler | None = None,
+    ) -> None:
         """
         Constructor.
 
@@ -41,120 +118,503 @@ class Driver:
         ----------
         args : Namespace
             Command line arguments.
+        environ : Mapping[str, str] | None
+            Environment with the NUMGRADPY_* configuration variables
+            (default: os.environ).
+        scheduler : JobScheduler | None
+            Worker pool that is kept alive by the caller (e.g. the daemon).
         """
 
         self.args = args
+        self.scheduler = scheduler
+        self.environ = environ
 
-        controlargs = DefaultArguments()
-        config = controlargs.get_config()
-        orca_default_args = config["orca"]
-        # if key of orca_default_args contains "path", then
-        # the value is a path to the binary
-        if "path" in orca_default_args:
-            # print("Setting new environment variables for ORCA...")
-            os.environ["PATH"] = (
-                str(orca_default_args["path"]) + ":" + os.environ["PATH"]
-            )
-            os.environ["LD_LIBRARY_PATH"] = (
-                str(orca_default_args["path"]) + ":" + os.environ["LD_LIBRARY_PATH"]
-            )
-            os.system("export PATH")
-            os.system("export LD_LIBRARY_PATH")
+        # the configuration is loaded and validated once for the whole run
+        self.config, self.precision = load_run_config(args, environ)
+        set_run_config(self.config)
+        # the configured ORCA directory is added to the environment of the
+        # external programs only, so that nothing leaks into the next run of
+        # a daemon
+        self.env = program_environment(self.config)
+        if scheduler is not None:
+            # a shared pool runs with the settings of the current request
+            scheduler.configure(self.config)
 
     def run(self) -> None:
         """
         Run the driver.
         """
 
+        with ExitStack() as stack:
+            sched = self.scheduler
+            if sched is None:
+                # one worker pool with the configured retries for the run
+                sched = stack.enter_context(self.start_scheduler())
+            self.calculate(sched)
+
+    def start_scheduler(self) -> JobScheduler:
+        """
+        Start the worker pool of the run: local worker processes or, with
+        '--agents', a coordinator of worker agents on other hosts.
+        """
+
+        if self.args.agents is None:
+            return JobScheduler.from_config(6)
+        sched = AgentScheduler.configured(
+            parse_address(self.args.agents), self.args.agent_token, self.config
+        )
+        print(f"Waiting for agents on {sched.address[0]}:{sched.address[1]}.")
+        return sched
+
+    def calculate(self, sched: JobScheduler) -> None:
+        """
+        Run all requested calculations on a worker pool.
+        """
+
         st = time.time()
+        stats = dict(sched.stats)
 
         args = self.args
 
-        # get structure from file
+        # get structure from file (XYZ or Turbomole coord, detected automatically)
         struc = Structure()
-        struc.read_xyz(args.struc)
-        # if args.struc corresponds to 'coord', copy 'coord' to 'coord.bak'
-        if args.struc == "coord":
-            shutil.copy2("coord", "coord.bak")
+        struc.read(args.struc)
+        # if args.struc is a Turbomole coord file, copy e.g. 'coord' to 'coord.bak'
+        if struc.filetype == "coord":
+            shutil.copy2(args.struc, args.struc + ".bak")
+        # all field calculations start from the XYZ file written for the
+        # equilibrium calculation, so that no format conversion is needed
+        eqstrucfile = self.prefix_eq + ".xyz"
+        qvszpargs = structure_arglist(struc, efield=False)
         if args.verbose:
             print("Structure from file:")
             struc.print_xyz()
 
-        # calculate equilibrium energy
-        eq_energy = self.eq_energy(struc)
-        print("Equilibrium energy: " + str(eq_energy))
+        # all single point results are appended to the optional results store
+        store = ResultsStore(args.store) if args.store is not None else None
+        if store is not None:
+            store.add_structure(0, struc)
 
-        # write equilibrium energy to file
-        write_tm_energy(eq_energy, "energy")
+        # Raman activities need the normal modes of the Hessian
+        hessian_requested = args.hessian or args.raman
 
-        # calculate nuclear gradient
-        if args.gradient:
-            gradient = nuclear_gradient(
-                struc, args.finitediff, self.prefix_eq, args.binary, args.verbose
-            )
-            # print the gradient matrix in nice format
-            print("Gradient matrix:")
-            for i in range(struc.nat):
-                print(
-                    f"{gradient[i, 0]:10.6f} \
-{gradient[i, 1]:10.6f} {gradient[i, 2]:10.6f}"
+        # the displacement inputs prepared in the background are finished
+        # (or stopped after an error) before the calculation returns
+        with ExitStack() as preparations:
+            # calculate equilibrium energy; the displacements need only its
+            # orbitals, so their inputs are prepared while it runs
+            gradient_inputs: PreparedDisplacements | None = None
+            hessian_inputs: PreparedDisplacements | None = None
+            eqstart = time.time()
+            # with the Hessian, the gradient is taken from the energies of
+            # its displacements, so the 6N displacements run only once
+            shared_displacements = args.gradient == "numerical" and hessian_requested
+            if args.gradient == "numerical" and not hessian_requested:
+                gradient_inputs = preparations.enter_context(
+                    PreparedDisplacements(
+                        struc,
+                        args.finitediff,
+                        args.binary,
+                        args.verbose,
+                        env=self.env,
+                    )
                 )
-            write_tm_gradient(gradient, eq_energy, struc, "gradient")
-        if args.dipole:
-            dipole = efield_gradient(
-                args.struc, args.finitediff, self.prefix_eq, args.verbose
-            )
-            print(
-                f"Dipole moment vector / a.u.: \
-{dipole[0]:12.8f} {dipole[1]:12.8f} {dipole[2]:12.8f}"
+            elif hessian_requested:
+                hessian_inputs = preparations.enter_context(
+                    PreparedDisplacements(
+                        struc,
+                        args.finitediff,
+                        args.binary,
+                        args.verbose,
+                        "EnGrad",
+                        bool(args.raman),
+                        env=self.env,
+                    )
+                )
+            eq_energy = self.eq_energy(
+                struc,
+                polarizability=args.alpha == "cpscf",
+                keywords="EnGrad" if args.gradient == "analytic" else None,
             )
-            write_dipole(dipole, "dipole.qvSZP")
-        if args.alpha:
-            if args.alpha == "analytical":
-                alpha = dpa(
-                    args.struc,
+            print("Equilibrium energy: " + str(eq_energy))
+            if args.measure_noise and self.precision is not None:
+                self.measure_noise(struc, eq_energy, time.time() - eqstart)
+            if store is not None:
+                store.add_singlepoint(0, "eq", eq_energy, efield=struc.efield)
+
+            # write equilibrium energy to file
+            write_tm_energy(eq_energy, "energy")
+
+            # the dipole moments of the nuclear displacements give dmu/dR
+            dipoles = np.full((6 * struc.nat, 3), np.nan, dtype=np.float64)
+            polarizabilities = None
+            if args.raman:
+                polarizabilities = np.zeros((6 * struc.nat, 3, 3), dtype=np.float64)
+
+            energies = None
+            if shared_displacements:
+                energies = np.zeros((6 * struc.nat), dtype=np.float64)
+            if hessian_requested:
+                # the field points of the Raman grid share the zero-field
+                # displacements (and the pool) with the Hessian
+                hessian = seminumerical_hessian(
+                    struc,
                     args.finitediff,
                     self.prefix_eq,
+                    args.binary,
                     args.verbose,
+                    store=store,
+                    scheduler=sched,
+                    dipoles=dipoles,
+                    polarizabilities=polarizabilities,
+                    prepared=hessian_inputs,
+                    energies=energies,
+                    env=self.env,
                 )
-            if args.alpha == "numdiff":
-                if args.verbose:
+
+            # calculate nuclear gradient; the displacements of the spot-checks
+            # are reused if the numerical gradient is needed after all
+            gradient = None
+            if shared_displacements:
+                assert energies is not None
+                gradient = displacement_gradient(energies, struc.nat, args.finitediff)
+            if args.gradient == "analytic":
+                energies = np.full((6 * struc.nat), np.nan, dtype=np.float64)
+                gradient = self.analytic_gradient(
+                    struc, store, sched, energies, dipoles
+                )
+            # the 6N displacements also give the dipole derivatives
+            numerical_gradient = bool(args.gradient) and (
+                gradient is None or shared_displacements
+            )
+            if args.gradient:
+                if gradient is None:
+                    gradient = nuclear_gradient(
+                        struc,
+                        args.finitediff,
+                        self.prefix_eq,
+                        args.binary,
+                        args.verbose,
+                        store=store,
+                        scheduler=sched,
+                        dipoles=dipoles,
+                        prepared=gradient_inputs,
+                        energies=energies,
+                        env=self.env,
+                    )
+                # print the gradient matrix in nice format
+                print("Gradient matrix:")
+                for i in range(struc.nat):
                     print(
-                        "Calculating polarizability tensor with \
-numerical differentiation."
+                        f"{gradient[i, 0]:10.6f} "
+                        f"{gradient[i, 1]:10.6f} {gradient[i, 2]:10.6f}"
                     )
-                alpha = dipole_gradient_numdiff(
-                    args.struc,
+                write_tm_gradient(
+                    gradient, eq_energy, struc, "gradient", append=args.append_gradient
+                )
+                if store is not None:
+                    store.add_tensor(0, "gradient", gradient)
+            if args.directions is not None:
+                directions = read_displacement_vectors(args.directions, struc.nat)
+                derivatives = directional_gradient(
+                    struc,
+                    directions,
                     args.finitediff,
                     self.prefix_eq,
+                    args.binary,
                     args.verbose,
+                    store=store,
+                    scheduler=sched,
                 )
-            else:
-                if args.verbose:
+                subspace = subspace_gradient(directions, derivatives, struc.nat)
+                print("Derivatives along the displacement vectors / Hartree/Bohr:")
+                for i, value in enumerate(derivatives):
+                    print(f"{i + 1:6d} {value:14.8f}")
+                write_directional_derivatives(derivatives, "dirgrad")
+                if store is not None:
+                    store.add_tensor(0, "dirgrad", derivatives)
+                    store.add_tensor(0, "subspacegrad", subspace)
+            dipgrad = None
+            if numerical_gradient or hessian_requested:
+                dipgrad = dipole_derivatives(dipoles, args.finitediff)
+                if dipgrad is None:
+                    print("No dipole derivatives: dipole moments missing.")
+                else:
+                    write_tm_dipgrad(dipgrad, "dipgrad")
+                    if store is not None:
+                        store.add_tensor(0, "dipgrad", dipgrad)
+            if hessian_requested:
+                write_tm_hessian(hessian, "hessian")
+                frequencies, modes = harmonic_analysis(hessian, struc)
+                intensities = None
+                if dipgrad is not None:
+                    intensities = ir_intensities(dipgrad, modes)
+                activities = None
+                if polarizabilities is not None:
+                    dalpha = polarizability_derivatives(
+                        polarizabilities, args.finitediff
+                    )
+                    activities = raman_activities(dalpha, modes)
+                print(
+                    "Harmonic frequencies / cm^-1, IR intensities / km/mol "
+                    "and Raman activities / A^4/amu:"
+                )
+                for i, freq in enumerate(frequencies):
+                    inten = "-" if intensities is None else f"{intensities[i]:12.4f}"
+                    act = "-" if activities is None else f"{activities[i]:12.4f}"
+                    print(f"{i + 1:6d} {freq:12.2f} {inten:>12s} {act:>12s}")
+                write_tm_vibspectrum(frequencies, "vibspectrum", intensities)
+                if store is not None:
+                    store.add_tensor(0, "hessian", hessian)
+                    store.add_tensor(0, "frequencies", frequencies)
+                    if intensities is not None:
+                        store.add_tensor(0, "irintensities", intensities)
+                    if activities is not None:
+                        store.add_tensor(0, "dalpha", dalpha)
+                        store.add_tensor(0, "ramanactivities", activities)
+            if args.dipole:
+                # the SCF dipole moment of the equilibrium calculation is free
+                propdipole = None
+                if args.dipole in ("property", "check"):
+                    propdipole = get_orca_dipolemoment(self.prefix_eq + "_property.txt")
+                fielddipole = None
+                if args.dipole in ("finitefield", "check"):
+                    fielddipole = efield_gradient(
+                        eqstrucfile,
+                        args.finitediff,
+                        self.prefix_eq,
+                        args.verbose,
+                        extefield=struc.efield,
+                        qvszpargs=qvszpargs,
+                        store=store,
+                        scheduler=sched,
+                    )
+                if propdipole is not None and fielddipole is not None:
                     print(
-                        "Calculating polarizability tensor with \
-analytical differentiation."
+                        "Finite-field dipole moment vector / a.u.: "
+                        f"{fielddipole[0]:12.8f} {fielddipole[1]:12.8f} "
+                        f"{fielddipole[2]:12.8f}"
+                    )
+                    print(
+                        "Difference to the SCF dipole moment / a.u.: "
+                        f"{np.linalg.norm(fielddipole - propdipole):12.4e}"
+                    )
+                    if store is not None:
+                        store.add_tensor(0, "dipolefield", fielddipole)
+                dipole = propdipole if propdipole is not None else fielddipole
+                assert dipole is not None
+                print(
+                    "Dipole moment vector / a.u.: "
+                    f"{dipole[0]:12.8f} {dipole[1]:12.8f} {dipole[2]:12.8f}"
+                )
+                write_dipole(dipole, "dipole.qvSZP")
+                if store is not None:
+                    store.add_tensor(0, "dipole", dipole)
+            if args.alpha:
+                if args.alpha == "cpscf":
+                    # requested in the equilibrium input, no further single points
+                    alpha = get_orca_polarizability(self.prefix_eq + ".out")
+                elif args.alpha == "numdiff":
+                    if args.verbose:
+                        print(
+                            "Calculating polarizability tensor with "
+                            "numerical differentiation."
+                        )
+                    alpha = dipole_gradient_numdiff(
+                        eqstrucfile,
+                        args.finitediff,
+                        self.prefix_eq,
+                        args.verbose,
+                        qvszpargs=qvszpargs,
+                        store=store,
+                        scheduler=sched,
+                        extefield=struc.efield,
+                    )
+                else:
+                    if args.verbose:
+                        print(
+                            "Calculating polarizability tensor with "
+                            "analytical differentiation."
+                        )
+                    alpha = dpa(
+                        eqstrucfile,
+                        args.finitediff,
+                        self.prefix_eq,
+                        args.verbose,
+                        qvszpargs=qvszpargs,
+                        store=store,
+                        scheduler=sched,
+                        extefield=struc.efield,
                     )
-                alpha = dpa(
-                    args.struc,
+                print(
+                    "Polarizability tensor / a.u.:\n"
+                    f"{alpha[0, 0]:12.8f} {alpha[0, 1]:12.8f} {alpha[0, 2]:12.8f}\n"
+                    f"{alpha[1, 0]:12.8f} {alpha[1, 1]:12.8f} {alpha[1, 2]:12.8f}\n"
+                    f"{alpha[2, 0]:12.8f} {alpha[2, 1]:12.8f} {alpha[2, 2]:12.8f}"
+                )
+                write_polarizability(alpha, "alpha.qvSZP")
+                if store is not None:
+                    store.add_tensor(0, "alpha", alpha)
+            for order, name, flag in ((3, "beta", args.beta), (4, "gamma", args.gamma)):
+                if not flag:
+                    continue
+                # the equilibrium calculation is the point without extra field
+                hyper = field_derivatives(
+                    eqstrucfile,
                     args.finitediff,
                     self.prefix_eq,
                     args.verbose,
+                    order,
+                    source=args.fieldsource,
+                    extefield=struc.efield,
+                    qvszpargs=qvszpargs,
+                    store=store,
+                    scheduler=sched,
+                    zeropoint=self.prefix_eq,
                 )
+                print(f"Hyperpolarizability {name} / a.u.:")
+                for row in hyper.reshape(-1, 3):
+                    print(f"{row[0]:14.6f} {row[1]:14.6f} {row[2]:14.6f}")
+                write_hyperpolarizability(hyper, name + ".qvSZP", name)
+                if store is not None:
+                    # the store holds up to three dimensions
+                    store.add_tensor(0, name, hyper.reshape(3, 3, -1))
+
+            if store is not None:
+                store.close()
+
+            print(f"Single point jobs: {sched.report(stats)}")
+            et = time.time()
+            print(f"Total execution time: {et-st:.2f} s")
+
+    def analytic_gradient(
+        self,
+        struc: Structure,
+        store: ResultsStore | None,
+        sched: JobScheduler,
+        energies: npt.NDArray[np.float64] | None = None,
+        dipoles: npt.NDArray[np.float64] | None = None,
+    ) -> npt.NDArray[np.float64] | None:
+        """
+        Analytical gradient of the equilibrium calculation, checked against
+        central differences of randomly chosen Cartesian components
+        ('--spotcheck-seed' reproduces the choice). The energies and dipole
+        moments of the checked displacements are written to 'energies' and
+        'dipoles' (see 'gradient_components').
+
+        Returns
+        -------
+        gradient : np.ndarray | None
+            Gradient of shape (nat, 3), or None if it is missing or a check
+            fails and the numerical gradient has to be calculated instead.
+        """
+
+        args = self.args
+        try:
+            _, gradient = get_orca_engrad(self.prefix_eq + ".engrad")
+        except (OSError, RuntimeError) as exc:
+            print(f"No analytical gradient ({exc}), calculating it numerically.")
+            return None
+
+        ncart = 3 * struc.nat
+        seed = args.spotcheck_seed
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        components = np.random.default_rng(seed).choice(
+            ncart, size=min(max(args.spotchecks, 0), ncart), replace=False
+        )
+        if len(components) == 0:
+            return gradient
+        print(f"Spot-check seed: {seed}")
+        numerical = gradient_components(
+            struc,
+            [int(c) for c in components],
+            args.finitediff,
+            self.prefix_eq,
+            args.binary,
+            args.verbose,
+            store=store,
+            scheduler=sched,
+            energies=energies,
+            dipoles=dipoles,
+            env=self.env,
+        )
+        deviations = np.abs(numerical - gradient.ravel()[components])
+        print("Spot-checks of the analytical gradient / Hartree/Bohr:")
+        for c, value, dev in zip(components, numerical, deviations):
+            print(
+                f"atom {c // 3 + 1:4d} {'xyz'[c % 3]}: analytical \
+{gradient[c // 3, c % 3]:12.8f}, numerical {value:12.8f}, deviation {dev:10.2e}"
+            )
+        if np.any(deviations > args.spotcheck_tol):
             print(
-                f"Polarizability tensor / a.u.:\n\
-{alpha[0, 0]:12.8f} {alpha[0, 1]:12.8f} {alpha[0, 2]:12.8f}\n\
-{alpha[1, 0]:12.8f} {alpha[1, 1]:12.8f} {alpha[1, 2]:12.8f}\n\
-{alpha[2, 0]:12.8f} {alpha[2, 1]:12.8f} {alpha[2, 2]:12.8f}"
+                f"Spot-check deviation above {args.spotcheck_tol:.1e}, \
+calculating the full numerical gradient."
             )
-            write_polarizability(alpha, "alpha.qvSZP")
+            return None
+        return gradient
 
-        et = time.time()
-        print(f"Total execution time: {et-st:.2f} s")
+    def measure_noise(self, eqstruc: Structure, energy: float, eqtime: float) -> None:
+        """
+        Recalculate the equilibrium point with the configured SCF settings
+        (without '--accuracy') and report the energy deviation and the time
+        of the selected settings.
+        """
 
-    def eq_energy(self, eqstruc: Structure) -> float:
+        assert self.precision is not None
+        reference = RunConfig.load(self.args.set, environ=self.environ)
+        refargs: list[str] = []
+        for key in ("conv", "defgrid"):
+            value = reference.get("qvszp", key)
+            if value is not None:
+                refargs += ["--" + key, value]
+        prefix = self.prefix_eq + "_ref"
+        st = time.time()
+        e = spq(
+            self.args.binary,
+            ["--struc", self.prefix_eq + ".xyz", "--outname", prefix]
+            + refargs
+            + ["--mpi", "6"]
+            + structure_arglist(eqstruc),
+            prefix,
+            verbose=self.args.verbose,
+            env=self.env,
+        )
+        if not e:
+            raise RuntimeError("Reference energy calculation failed.")
+        sp_orca_recover("orca", prefix, timeout=orca_timeout(self.config), env=self.env)
+        reftime = time.time() - st
+        deviation = abs(energy - get_orca_energy(prefix + ".out"))
+        print(
+            f"Measured energy deviation from the configured settings: "
+            f"{deviation:.2e} Hartree (derivative error <= "
+            f"{deviation / self.args.finitediff:.1e}, target "
+            f"{self.args.accuracy:.1e}); single point time {eqtime:.2f} s vs. "
+            f"{reftime:.2f} s ({100.0 * (1.0 - eqtime / max(reftime, 1e-9)):.0f}% "
+            f"saved)."
+        )
+
+    def eq_energy(
+        self,
+        eqstruc: Structure,
+        guess: str | None = None,
+        polarizability: bool = False,
+        keywords: str | None = None,
+    ) -> float:
         """
         Calculate the equilibrium energy of a structure.
+
+        Parameters
+        ----------
+        eqstruc : Structure
+            Structure of the calculation.
+        guess : str | None
+            GBW file from which the initial orbitals are read (e.g. that of
+            the previous optimisation cycle).
+        polarizability : bool
+            Also request the analytical (CP-SCF) polarizability from ORCA.
+        keywords : str | None
+            Additional simple input keywords of the ORCA input (e.g. 'EnGrad').
         """
 
         # delete the following files if they are present
@@ -166,13 +626,24 @@ analytical differentiation."
         Structure.write_xyz(eqstruc, self.prefix_eq + ".xyz", verbose=self.args.verbose)
         e = spq(
             self.args.binary,
-            ["--struc", "eq.xyz", "--outname", self.prefix_eq, "--mpi", "6"],
+            ["--struc", self.prefix_eq + ".xyz", "--outname", self.prefix_eq]
+            + ["--mpi", "6"]
+            + structure_arglist(eqstruc),
             self.prefix_eq,
             verbose=self.args.verbose,
+            env=self.env,
         )
         if not e:
             raise RuntimeError("Equilibrium energy calculation failed.")
-        e = spo("orca", self.prefix_eq)
+        if guess is not None:
+            add_orca_moread(self.prefix_eq + ".inp", guess)
+        if keywords is not None:
+            add_orca_keywords(self.prefix_eq + ".inp", keywords)
+        if polarizability:
+            add_orca_block(self.prefix_eq + ".inp", POLARIZABILITY_BLOCK)
+        sp_orca_recover(
+            "orca", self.prefix_eq, timeout=orca_timeout(self.config), env=self.env
+        )
         print("Equilibrium energy successfully calculated.")
         energy = get_orca_energy(self.prefix_eq + ".out")
         return energy
@@ -4,20 +4,124 @@ Entrypoint for command line interface.
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+import os
+import sys
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING
 
-from .argparser import parser
-from .driver import Driver
+from .argparser import (
+    agent_parser,
+    batch_parser,
+    check_run_arguments,
+    optimize_parser,
+    parser,
+    serve_parser,
+)
+from .client import SOCKET_ENV, forward, request
+
+if TYPE_CHECKING:
+    from ..extprocs.scheduler import JobScheduler
 
 
 def console_entry_point(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if len(argv) > 0 and argv[0] == "serve":
+        args = serve_parser().parse_args(argv[1:])
+        if args.stop:
+            request(args.socket, {"command": "shutdown"})
+            return 0
+        # pylint: disable-next=import-outside-toplevel
+        from .server import GradientServer
+
+        GradientServer(args.socket, args.nprocs).serve_forever()
+        return 0
+
+    if len(argv) > 0 and argv[0] == "agent":
+        args = agent_parser().parse_args(argv[1:])
+        # pylint: disable-next=import-outside-toplevel
+        from ..extprocs.agents import WorkerAgent, parse_address
+
+        agent = WorkerAgent(
+            parse_address(args.connect, "localhost"),
+            capacity=args.capacity,
+            scratch=args.scratch,
+            token=args.token,
+        )
+        agent.run(connect_timeout=args.wait)
+        print(f"Agent stopped after {agent.ntasks} tasks.")
+        return 0
+
+    # forward the command line to a running daemon, if there is one
+    socketpath = os.environ.get(SOCKET_ENV)
+    if socketpath:
+        returncode = forward(socketpath, argv)
+        if returncode is not None:
+            return returncode
+
+    return run_command(argv)
+
+
+def run_command(
+    argv: Sequence[str],
+    environ: Mapping[str, str] | None = None,
+    scheduler: JobScheduler | None = None,
+) -> int:
+    """
+    Run a command line in the current process.
+
+    Parameters
+    ----------
+    argv : Sequence[str]
+        Command line arguments (without the program name).
+    environ : Mapping[str, str] | None
+        Environment with the NUMGRADPY_* configuration variables
+        (default: os.environ).
+    scheduler : JobScheduler | None
+        Worker pool kept alive by a daemon.
+
+    Returns
+    -------
+    returncode : int
+        Exit code of the command.
+    """
+
+    # the drivers (and NumPy) are only imported if the command is run in
+    # this process and not forwarded to a daemon
+    # pylint: disable=import-outside-toplevel
+    from .batch import BatchDriver
+    from .driver import Driver
+    from .optimize import OptimizationDriver
+
+    # subcommands are selected by the first argument
+    if len(argv) > 0 and argv[0] == "batch":
+        p = batch_parser()
+        args = p.parse_args(argv[1:])
+        check_run_arguments(p, args)
+        if args.verbose:
+            print(args)
+        BatchDriver(args, environ=environ).run()
+        return 0
+    if len(argv) > 0 and argv[0] == "optimize":
+        p = optimize_parser()
+        args = p.parse_args(argv[1:])
+        check_run_arguments(p, args)
+        if args.verbose:
+            print(args)
+        optdriver = OptimizationDriver(args, environ=environ, scheduler=scheduler)
+        optdriver.run()
+        return 0 if optdriver.converged else 1
+
     # parse arguments
-    args = parser().parse_args(argv)
+    p = parser()
+    args = p.parse_args(argv)
+    check_run_arguments(p, args)
     if args.verbose:
         print(args)
 
     # run driver
-    driver = Driver(args)
+    driver = Driver(args, environ=environ, scheduler=scheduler)
     driver.run()
 
     return 0
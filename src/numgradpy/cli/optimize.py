@@ -0,0 +1,156 @@
+"""
+Driver for the 'optimize' subcommand, which runs a complete geometry
+optimisation in one process.
+
+Compared to calling NumGradPy as an external gradient script in every
+cycle, the run configuration is parsed once, the worker pool is kept alive
+across the cycles and the orbitals of the previous cycle are read as the
+initial guess of the next one.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from contextlib import ExitStack
+
+import numpy as np
+
+from ..constants import AA2AU
+from ..gradient.gradients import PreparedDisplacements, nuclear_gradient
+from ..io import (
+    ResultsStore,
+    Structure,
+    get_orca_scf_iterations,
+    write_tm_energy,
+    write_tm_gradient,
+)
+from ..optimize import ConvergenceCriteria, RFOptimizer
+from .driver import Driver
+
+
+class OptimizationDriver(Driver):
+    """
+    Driver for the 'optimize' subcommand of the NumGradPy CLI.
+    """
+
+    trajectory = "numgradpy_opt.xyz"
+    prefix_guess = "eq_guess"
+    converged = False
+
+    def run(self) -> None:
+        """
+        Optimise the structure with the numerical gradient.
+        """
+
+        st = time.time()
+        args = self.args
+
+        struc = Structure()
+        struc.read(args.struc)
+        if struc.filetype == "coord":
+            shutil.copy2(args.struc, args.struc + ".bak")
+        if args.verbose:
+            print("Structure from file:")
+            struc.print_xyz()
+        if os.path.exists(self.trajectory):
+            os.remove(self.trajectory)
+
+        criteria = ConvergenceCriteria(
+            energy=args.econv, maxgrad=args.gconv, rmsgrad=args.gconv / 3.0
+        )
+        optimizer = RFOptimizer(
+            3 * struc.nat, trustradius=args.trustradius, criteria=criteria
+        )
+        store = ResultsStore(args.store) if args.store is not None else None
+
+        converged = False
+        lastenergy: float | None = None
+        print(
+            f"{'cycle':>5s} {'energy / Eh':>20s} {'change':>12s} \
+{'max|g|':>10s} {'rms|g|':>10s} {'SCF it.':>7s} {'time / s':>9s}"
+        )
+        # one worker pool for the displacements of all cycles
+        with ExitStack() as stack:
+            sched = self.scheduler
+            if sched is None:
+                sched = stack.enter_context(self.start_scheduler())
+            stats = dict(sched.stats)
+            for cycle in range(args.maxcycles):
+                ct = time.time()
+                guess = None
+                if cycle > 0:
+                    # ORCA does not read and write the same GBW file
+                    shutil.copy2(self.prefix_eq + ".gbw", self.prefix_guess + ".gbw")
+                    guess = self.prefix_guess + ".gbw"
+                # the displacement inputs are prepared during the SCF
+                with PreparedDisplacements(
+                    struc, args.finitediff, args.binary, args.verbose, env=self.env
+                ) as prepared:
+                    energy = self.eq_energy(struc, guess=guess)
+                    iterations = get_orca_scf_iterations(self.prefix_eq + ".out")
+                    if store is not None:
+                        store.add_structure(cycle, struc)
+                        store.add_singlepoint(cycle, "eq", energy, efield=struc.efield)
+                    gradient = nuclear_gradient(
+                        struc,
+                        args.finitediff,
+                        self.prefix_eq,
+                        args.binary,
+                        args.verbose,
+                        store=store,
+                        structure=cycle,
+                        scheduler=sched,
+                        prepared=prepared,
+                        env=self.env,
+                    )
+                if store is not None:
+                    store.add_tensor(cycle, "gradient", gradient)
+
+                # files expected by external optimisers; the gradient file
+                # keeps all cycles of this optimisation
+                write_tm_energy(energy, "energy")
+                write_tm_gradient(gradient, energy, struc, "gradient", append=cycle > 0)
+                with open(self.trajectory, "a", encoding="UTF-8") as f:
+                    f.write(
+                        struc.xyz_template()
+                        % tuple((struc.coordinates / AA2AU).ravel())
+                    )
+
+                change = None if lastenergy is None else energy - lastenergy
+                print(
+                    f"{cycle + 1:5d} {energy:20.10f} \
+{0.0 if change is None else change:12.3e} {np.max(np.abs(gradient)):10.2e} \
+{np.sqrt(np.mean(gradient**2)):10.2e} \
+{'-' if iterations is None else str(iterations):>7s} {time.time() - ct:9.2f}"
+                )
+                if optimizer.converged(change, gradient):
+                    converged = True
+                    break
+                lastenergy = energy
+                struc.coordinates = np.ascontiguousarray(
+                    optimizer.step(struc.coordinates, energy, gradient)
+                )
+
+            print(f"Single point jobs: {sched.report(stats)}")
+
+        if store is not None:
+            store.close()
+
+        # write the final geometry (Turbomole: update the coord file)
+        if struc.filetype == "coord":
+            struc.write(args.struc, verbose=args.verbose, fmt="coord")
+            final = args.struc
+        else:
+            final = os.path.splitext(args.struc)[0] + ".opt.xyz"
+            struc.write(final, verbose=args.verbose, fmt="xyz")
+
+        et = time.time()
+        if converged:
+            print(f"Geometry optimisation converged after {cycle + 1} cycles.")
+        else:
+            print(f"Geometry optimisation not converged in {args.maxcycles} cycles.")
+        print(f"Final structure written to '{final}'.")
+        print(f"Total execution time: {et-st:.2f} s")
+        self.converged = converged
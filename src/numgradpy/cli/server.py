@@ -0,0 +1,139 @@
+"""
+Daemon serving NumGradPy command lines over a Unix socket
+('numgradpy serve'), see 'client.py' for the protocol.
+
+The daemon keeps the interpreter, NumPy and one worker pool alive between
+requests. Requests are handled one after another: each one is run in the
+working directory of its client with the client's NUMGRADPY_* configuration
+variables, and its console output is returned to the client.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import socket
+import traceback
+from typing import Any
+
+from ..extprocs.scheduler import JobScheduler
+from .client import PROTOCOL_VERSION
+from .entrypoint import run_command
+
+
+class GradientServer:
+    """
+    Unix socket server running NumGradPy command lines on a warm worker pool.
+    """
+
+    def __init__(self, socketpath: str, nprocs: int = 6) -> None:
+        """
+        Bind the socket and start the worker pool.
+
+        Parameters
+        ----------
+        socketpath : str
+            Path of the Unix socket.
+        nprocs : int
+            Number of worker processes of the shared pool.
+        """
+
+        self.socketpath = os.path.abspath(socketpath)
+        self.nrequests = 0
+        if os.path.exists(self.socketpath):
+            # a socket file left behind by a daemon that was killed
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(self.socketpath) == 0:
+                    raise RuntimeError(
+                        f"Another daemon is listening on '{self.socketpath}'."
+                    )
+            os.remove(self.socketpath)
+        self.scheduler = JobScheduler.from_config(nprocs)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socketpath)
+        self._sock.listen()
+
+    def close(self) -> None:
+        """
+        Stop the worker pool and remove the socket.
+        """
+
+        self._sock.close()
+        self.scheduler.close()
+        if os.path.exists(self.socketpath):
+            os.remove(self.socketpath)
+
+    def serve_forever(self) -> None:
+        """
+        Handle requests until a 'shutdown' request or an interrupt.
+        """
+
+        print(f"NumGradPy daemon listening on '{self.socketpath}'.", flush=True)
+        try:
+            while True:
+                conn, _ = self._sock.accept()
+                with conn, conn.makefile("rb") as stream:
+                    try:
+                        message = json.loads(stream.readline())
+                    except ValueError:
+                        continue
+                    response = self.handle(message)
+                    try:
+                        conn.sendall(json.dumps(response).encode("UTF-8") + b"\n")
+                    except OSError:
+                        pass
+                if message.get("command") == "shutdown":
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        print(f"NumGradPy daemon stopped after {self.nrequests} requests.")
+
+    def handle(self, message: dict[str, Any]) -> dict[str, Any]:
+        """
+        Run one request and return the response.
+        """
+
+        if message.get("version") != PROTOCOL_VERSION:
+            return {
+                "returncode": 2,
+                "stdout": "",
+                "stderr": f"Unsupported protocol version {message.get('version')}.\n",
+            }
+        command = message.get("command")
+        if command in ("ping", "shutdown"):
+            return {"returncode": 0, "stdout": "", "stderr": ""}
+
+        self.nrequests += 1
+        stdout, stderr = io.StringIO(), io.StringIO()
+        olddir = os.getcwd()
+        try:
+            os.chdir(message["cwd"])
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                returncode = run_command(
+                    message["argv"],
+                    environ=message.get("env", {}),
+                    scheduler=self.scheduler,
+                )
+        except SystemExit as exc:
+            # argparse errors and '--help'
+            returncode = exc.code if isinstance(exc.code, int) else 1
+        except Exception:  # pylint: disable=broad-except
+            stderr.write(traceback.format_exc())
+            returncode = 1
+        finally:
+            os.chdir(olddir)
+            if self.scheduler.pending > 0:
+                # jobs left behind by a failed request must not be mixed
+                # up with the next one
+                self.scheduler.close()
+                self.scheduler = JobScheduler.from_config(self.scheduler.nprocs)
+
+        return {
+            "returncode": returncode,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
@@ -6,5 +6,22 @@ This module contains all external procedures that are required for the
 calculation of the gradient of a function.
 """
 
-from .convfactors import AA2AU, ATOMIC_NUMBER, PSE
+from .convfactors import (
+    AA2AU,
+    AMU2AU,
+    ATOMIC_MASS,
+    ATOMIC_NUMBER,
+    AU2A4AMU,
+    AU2EV,
+    AU2KMMOL,
+    AU2WAVENUMBER,
+    PSE,
+)
 from .defaultargs import DefaultArguments
+from .precision import (
+    PrecisionSettings,
+    describe_precision,
+    reference_settings,
+    select_precision,
+)
+from .runconfig import RunConfig, get_run_config, set_run_config
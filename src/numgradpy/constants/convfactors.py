@@ -6,6 +6,24 @@ AA2AU = 1.8897261246204404
 # AA2AU = 1.88972594929722 ## OLD CONSTANT
 """Factor for conversion from angstrom to atomic units."""
 
+AU2EV = 27.211386245988
+"""Factor for conversion from Hartree to electron volts."""
+
+AMU2AU = 1822.888486209
+"""Factor for conversion from atomic mass units to electron masses."""
+
+AU2WAVENUMBER = 219474.6313632
+"""Factor for conversion from Hartree to wavenumbers (cm^-1)."""
+
+AU2KMMOL = 1777097.7313
+"""Factor for conversion of squared dipole derivatives along mass-weighted
+normal coordinates (e^2 / m_e) to IR intensities in km/mol."""
+
+AU2A4AMU = AMU2AU / AA2AU**4
+"""Factor for conversion of squared polarizability derivatives along
+mass-weighted normal coordinates (Bohr^4 / m_e) to Raman activities in
+Angstrom^4/amu."""
+
 PSE = {
     0: "X",
     1: "H",
@@ -131,3 +149,93 @@ PSE = {
 
 ATOMIC_NUMBER = {sym: num for num, sym in PSE.items()}
 """Atomic numbers for elements in periodic table."""
+
+ATOMIC_MASS = {
+    1: 1.008,
+    2: 4.0026,
+    3: 6.94,
+    4: 9.0122,
+    5: 10.81,
+    6: 12.011,
+    7: 14.007,
+    8: 15.999,
+    9: 18.998,
+    10: 20.180,
+    11: 22.990,
+    12: 24.305,
+    13: 26.982,
+    14: 28.085,
+    15: 30.974,
+    16: 32.06,
+    17: 35.45,
+    18: 39.948,
+    19: 39.098,
+    20: 40.078,
+    21: 44.956,
+    22: 47.867,
+    23: 50.942,
+    24: 51.996,
+    25: 54.938,
+    26: 55.845,
+    27: 58.933,
+    28: 58.693,
+    29: 63.546,
+    30: 65.38,
+    31: 69.723,
+    32: 72.630,
+    33: 74.922,
+    34: 78.971,
+    35: 79.904,
+    36: 83.798,
+    37: 85.468,
+    38: 87.62,
+    39: 88.906,
+    40: 91.224,
+    41: 92.906,
+    42: 95.95,
+    43: 97.907,
+    44: 101.07,
+    45: 102.91,
+    46: 106.42,
+    47: 107.87,
+    48: 112.41,
+    49: 114.82,
+    50: 118.71,
+    51: 121.76,
+    52: 127.60,
+    53: 126.90,
+    54: 131.29,
+    55: 132.91,
+    56: 137.33,
+    57: 138.91,
+    58: 140.12,
+    59: 140.91,
+    60: 144.24,
+    61: 144.91,
+    62: 150.36,
+    63: 151.96,
+    64: 157.25,
+    65: 158.93,
+    66: 162.50,
+    67: 164.93,
+    68: 167.26,
+    69: 168.93,
+    70: 173.05,
+    71: 174.97,
+    72: 178.49,
+    73: 180.95,
+    74: 183.84,
+    75: 186.21,
+    76: 190.23,
+    77: 192.22,
+    78: 195.08,
+    79: 196.97,
+    80: 200.59,
+    81: 204.38,
+    82: 207.2,
+    83: 208.98,
+    84: 208.98,
+    85: 209.99,
+    86: 222.02,
+}
+"""Standard atomic weights in atomic mass units (elements 1-86)."""
@@ -15,7 +15,7 @@ class DefaultArguments:
     defargs: dict[str, dict[str, object]]
 
     def __init__(self) -> None:
-        self.defargs = {"qvszp": self.qvszp_def_args(), "orca": {}}
+        self.defargs = {"qvszp": self.qvszp_def_args(), "orca": self.orca_def_args()}
 
     def get_config(self) -> dict[str, dict[str, object]]:
         """
@@ -32,32 +32,29 @@ class DefaultArguments:
         """
         Read the arguments from the configuration file.
         """
-        with open(numgradpyrc, encoding="UTF-8") as file:
-            lines = file.readlines()
-
-        dictkey = ""
-        for line in lines:
-            if line[0] == "#":
-                continue
-            if line.strip().lower() == "$qvszp":
-                dictkey = "qvszp"
-                continue
-            elif line.strip().lower() == "$orca":
-                dictkey = "orca"
-                continue
-            elif line.strip().lower() == "$end":
-                return
-
-            if dictkey not in self.defargs:
-                raise ValueError("Invalid program name in ~/.numgradpyrc.")
-
-            key, value = line.split("=")
-            key = key.strip()
-            value = value.strip()
-            self.check_argument(dictkey, key, value)
-            self.defargs[dictkey][key] = value
+        for dictkey, entries in parse_config_file(numgradpyrc).items():
+            self.defargs[dictkey].update(entries)
 
     def check_argument(self, program: str, key: str, value: str | int | float) -> None:
+        choices = {
+            "retention": ["keep-all", "keep-outputs-compressed", "keep-results-only"],
+            "compression": ["gzip", "zstd"],
+        }
+        if program == "orca" and key in choices and value not in choices[key]:
+            raise ValueError(
+                f"Value for '{key}' must be one of {choices[key]} in 'numgradpyrc'."
+            )
+        if program == "orca" and key in ("timeout", "retries", "backoff", "speculate"):
+            try:
+                number = int(value) if key == "retries" else float(value)
+            except ValueError as exc:
+                raise ValueError(
+                    f"Value for '{key}' must be a number in 'numgradpyrc'."
+                ) from exc
+            if number < 0:
+                raise ValueError(
+                    f"Value for '{key}' must not be negative in 'numgradpyrc'."
+                )
         if program == "qvszp":
             qvszp_defargs = self.qvszp_def_args()
             # if key not in qvszp_defargs: # don't need this check, prevents user-defined arguments that are not in the default arguments
@@ -85,6 +82,17 @@ class DefaultArguments:
  {valid_guesses} in 'numgradpyrc'."
                     )
 
+    def orca_def_args(self) -> dict[str, str | object]:
+        # 'timeout' (wall-time limit of a single point in seconds) is unset
+        orca_defargs: dict[str, str | object] = {
+            "retries": 2,
+            "backoff": 1.0,
+            "speculate": 3.0,
+            "retention": "keep-all",
+            "compression": "gzip",
+        }
+        return orca_defargs
+
     def qvszp_def_args(self) -> dict[str, str | object]:
         qvszp_defargs = {
             "bfile": "/home/marcel/source_rest/qvSZP/q-vSZP_basis/basisq",
@@ -95,3 +103,47 @@ class DefaultArguments:
             "conv": "VeryTightSCF",
         }
         return qvszp_defargs
+
+
+def parse_config_file(numgradpyrc: Path) -> dict[str, dict[str, str]]:
+    """
+    Parse and validate a configuration file.
+
+    Parameters
+    ----------
+    numgradpyrc : Path
+        Path of the configuration file.
+
+    Returns
+    -------
+    entries : dict[str, dict[str, str]]
+        Entries of the file for each program section.
+    """
+    with open(numgradpyrc, encoding="UTF-8") as file:
+        lines = file.readlines()
+
+    checker = DefaultArguments()
+    entries: dict[str, dict[str, str]] = {}
+    dictkey = ""
+    for line in lines:
+        if line[0] == "#" or not line.strip():
+            continue
+        if line.strip().lower() == "$qvszp":
+            dictkey = "qvszp"
+            continue
+        elif line.strip().lower() == "$orca":
+            dictkey = "orca"
+            continue
+        elif line.strip().lower() == "$end":
+            break
+
+        if dictkey not in checker.defargs:
+            raise ValueError(f"Invalid program name in {numgradpyrc}.")
+
+        key, value = line.split("=", 1)
+        key = key.strip()
+        value = value.strip()
+        checker.check_argument(dictkey, key, value)
+        entries.setdefault(dictkey, {})[key] = value
+
+    return entries
@@ -0,0 +1,156 @@
+"""
+Module selecting the SCF convergence and the integration grid of the
+single points from the target accuracy of a finite-difference derivative.
+
+The numerical noise of an energy enters a central difference divided by
+the step, so large steps or rough targets (e.g. early optimisation cycles)
+tolerate much looser settings than the defaults.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+SCF_NOISE = {
+    "SloppySCF": 3e-5,
+    "LooseSCF": 1e-5,
+    "NormalSCF": 1e-6,
+    "StrongSCF": 3e-7,
+    "TightSCF": 1e-8,
+    "VeryTightSCF": 1e-9,
+    "ExtremeSCF": 1e-14,
+}
+"""Energy noise in Hartree per ORCA SCF convergence level (TolE)."""
+
+SCF_COST = {
+    "SloppySCF": 0.45,
+    "LooseSCF": 0.55,
+    "NormalSCF": 0.7,
+    "StrongSCF": 0.8,
+    "TightSCF": 0.9,
+    "VeryTightSCF": 1.0,
+    "ExtremeSCF": 1.4,
+}
+"""Estimated SCF time per convergence level relative to VeryTightSCF."""
+
+GRID_NOISE = {1: 3e-8, 2: 5e-9, 3: 1e-9}
+"""Noise of energy differences in Hartree from the moving integration grid
+per ORCA DefGrid level."""
+
+GRID_COST = {1: 0.6, 2: 0.8, 3: 1.0}
+"""Estimated time per DefGrid level relative to DefGrid3."""
+
+
+@dataclass(frozen=True)
+class PrecisionSettings:
+    """
+    SCF settings of the single points and their expected derivative error.
+    """
+
+    conv: str
+    defgrid: int
+    step: float
+
+    @property
+    def noise(self) -> float:
+        """
+        Estimated energy noise in Hartree.
+        """
+
+        return float((SCF_NOISE[self.conv] ** 2 + GRID_NOISE[self.defgrid] ** 2) ** 0.5)
+
+    @property
+    def error(self) -> float:
+        """
+        Expected error of a central-difference derivative (noise / step).
+        """
+
+        return self.noise / self.step
+
+    @property
+    def cost(self) -> float:
+        """
+        Estimated time of a single point relative to VeryTightSCF/DefGrid3.
+        """
+
+        return SCF_COST[self.conv] * GRID_COST[self.defgrid]
+
+    def overrides(self) -> list[str]:
+        """
+        Configuration entries ('section.key=value') of the settings.
+        """
+
+        return [f"qvszp.conv={self.conv}", f"qvszp.defgrid={self.defgrid}"]
+
+
+def select_precision(accuracy: float, step: float) -> PrecisionSettings:
+    """
+    Cheapest SCF convergence and grid whose energy noise divided by the
+    step stays below the target accuracy of the derivative.
+
+    Parameters
+    ----------
+    accuracy : float
+        Target accuracy of the derivatives (e.g. Hartree/Bohr).
+    step : float
+        Finite-difference step.
+
+    Returns
+    -------
+    settings : PrecisionSettings
+        Selected settings; the tightest ones if the target is out of reach
+        (check 'error').
+    """
+
+    if accuracy <= 0.0 or step <= 0.0:
+        raise ValueError("Accuracy and step must be positive.")
+    candidates = [
+        PrecisionSettings(conv, defgrid, step)
+        for conv in SCF_NOISE
+        for defgrid in GRID_NOISE
+    ]
+    feasible = [s for s in candidates if s.error <= accuracy]
+    if not feasible:
+        return min(candidates, key=lambda s: (s.error, s.cost))
+    return min(feasible, key=lambda s: (s.cost, s.error))
+
+
+def reference_settings(
+    conv: str | None, defgrid: str | None, step: float
+) -> PrecisionSettings | None:
+    """
+    Settings of a configuration (e.g. the defaults) for comparison, or None
+    if they are not in the tables.
+    """
+
+    if conv not in SCF_NOISE or defgrid is None or not defgrid.isdigit():
+        return None
+    if int(defgrid) not in GRID_NOISE:
+        return None
+    return PrecisionSettings(str(conv), int(defgrid), step)
+
+
+def describe_precision(
+    settings: PrecisionSettings,
+    accuracy: float,
+    reference: PrecisionSettings | None = None,
+) -> str:
+    """
+    Summary of selected settings, their expected error and the estimated
+    time compared to the reference settings.
+    """
+
+    text = (
+        f"SCF settings for a derivative accuracy of {accuracy:.1e} with step "
+        f"{settings.step:.1e}: {settings.conv}, DefGrid{settings.defgrid} "
+        f"(expected error {settings.error:.1e})"
+    )
+    if reference is not None:
+        text += (
+            f", estimated single point time "
+            f"{100.0 * settings.cost / reference.cost:.0f}% of "
+            f"{reference.conv}/DefGrid{reference.defgrid}"
+        )
+    if settings.error > accuracy:
+        text += ". The target is out of reach with this step; increase the step"
+    return text + "."
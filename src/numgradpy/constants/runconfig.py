@@ -0,0 +1,203 @@
+"""
+Module containing the run configuration, which is loaded and validated
+once per run and then shared (read-only) with all single point calculations.
+
+Precedence (highest first):
+
+1. command line ('--set qvszp.mpi=4')
+2. environment ('NUMGRADPY_QVSZP_MPI=4', 'NUMGRADPY_ORCA_PATH=...')
+3. project file './.numgradpyrc' in the working directory
+4. user file '~/.numgradpyrc'
+5. built-in defaults
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+from .defaultargs import DefaultArguments, parse_config_file
+
+Section = Tuple[Tuple[str, str], ...]
+
+ENV_PREFIX = "NUMGRADPY_"
+"""Prefix of environment variables overriding configuration entries."""
+
+
+def _section(entries: Mapping[str, object]) -> Section:
+    return tuple((key, str(value)) for key, value in entries.items())
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """
+    Immutable configuration of a run.
+
+    The sections are stored as tuples of (key, value) string pairs, so that
+    the object is hashable and cheap to pickle when it is sent to workers.
+    """
+
+    qvszp: Section
+    orca: Section
+    sources: Tuple[str, ...] = ()
+
+    @classmethod
+    def load(
+        cls,
+        overrides: Sequence[str] = (),
+        environ: Mapping[str, str] | None = None,
+        projectdir: str | None = None,
+        home: str | None = None,
+    ) -> RunConfig:
+        """
+        Load and validate the configuration from all sources.
+
+        Parameters
+        ----------
+        overrides : Sequence[str]
+            Command line entries of the form 'section.key=value'.
+        environ : Mapping[str, str] | None
+            Environment (default: os.environ).
+        projectdir : str | None
+            Directory of the project file (default: working directory).
+        home : str | None
+            Directory of the user file (default: home directory).
+
+        Returns
+        -------
+        config : RunConfig
+            The merged configuration.
+        """
+
+        defaults = DefaultArguments()
+        sections: dict[str, dict[str, object]] = {
+            key: dict(value) for key, value in defaults.defargs.items()
+        }
+        sources: list[str] = []
+
+        # files, lowest precedence first
+        userfile = Path(home if home is not None else Path.home()) / ".numgradpyrc"
+        projectfile = Path(projectdir if projectdir is not None else ".") / (
+            ".numgradpyrc"
+        )
+        for rcfile in (userfile, projectfile):
+            if not rcfile.is_file():
+                continue
+            if sources and rcfile.resolve() == Path(sources[-1]).resolve():
+                continue
+            for program, entries in parse_config_file(rcfile).items():
+                sections[program].update(entries)
+            sources.append(str(rcfile))
+
+        # environment
+        environ = os.environ if environ is None else environ
+        for name, value in environ.items():
+            if not name.startswith(ENV_PREFIX):
+                continue
+            program, _, key = name[len(ENV_PREFIX) :].lower().partition("_")
+            if program in sections and key:
+                defaults.check_argument(program, key, value)
+                sections[program][key] = value
+                sources.append(f"${name}")
+
+        # command line
+        for entry in overrides:
+            name, sep, value = entry.partition("=")
+            program, dot, key = name.strip().lower().partition(".")
+            if not sep or not dot or program not in sections or not key:
+                raise ValueError(
+                    f"Invalid configuration entry '{entry}', \
+expected 'section.key=value' with section in {sorted(sections)}."
+                )
+            defaults.check_argument(program, key, value.strip())
+            sections[program][key] = value.strip()
+            sources.append("command line")
+
+        return cls(
+            qvszp=_section(sections["qvszp"]),
+            orca=_section(sections["orca"]),
+            sources=tuple(sources),
+        )
+
+    def get(self, program: str, key: str, default: str | None = None) -> str | None:
+        """
+        Return a single configuration entry.
+        """
+
+        for entrykey, value in getattr(self, program):
+            if entrykey == key:
+                return str(value)
+        return default
+
+    def qvszp_arglist(self, arguments: Sequence[str]) -> list[str]:
+        """
+        Merge the q-vSZP defaults with the arguments of a single calculation.
+
+        Arguments given for the calculation replace the default of the same
+        flag; the input sequence is not modified.
+
+        Parameters
+        ----------
+        arguments : Sequence[str]
+            Arguments of the calculation, e.g. ['--struc', 'eq.xyz'].
+
+        Returns
+        -------
+        arglist : list[str]
+            Complete argument list for the binary.
+        """
+
+        # group the arguments as flag -> values (numbers may be negative,
+        # so only tokens starting with '--' are flags)
+        given: dict[str, list[str]] = {}
+        order: list[str] = []
+        flag = ""
+        for token in arguments:
+            if token.startswith("--"):
+                flag = token
+                given[flag] = []
+                order.append(flag)
+            elif flag:
+                given[flag].append(token)
+            else:
+                raise ValueError(f"Argument '{token}' does not belong to a flag.")
+
+        arglist: list[str] = []
+        for key, value in self.qvszp:
+            flag = "--" + key
+            arglist.append(flag)
+            if flag in given:
+                arglist += given.pop(flag)
+            elif value != "None":
+                arglist.append(value)
+        for flag in order:
+            if flag in given:
+                arglist += [flag, *given[flag]]
+
+        return arglist
+
+
+_CURRENT: RunConfig | None = None
+
+
+def set_run_config(config: RunConfig) -> None:
+    """
+    Set the configuration of the current run (inherited by forked workers).
+    """
+
+    global _CURRENT  # pylint: disable=global-statement
+    _CURRENT = config
+
+
+def get_run_config() -> RunConfig:
+    """
+    Return the configuration of the current run, loading it on first use.
+    """
+
+    if _CURRENT is None:
+        set_run_config(RunConfig.load())
+    assert _CURRENT is not None
+    return _CURRENT
@@ -6,4 +6,5 @@ This module contains all external procedures that are required for the
 calculation of the gradient of a function.
 """
 
-from .singlepoint import sp_orca, sp_qvszp
+from .helpfcts import ExternalProgramError
+from .singlepoint import SCFConvergenceError, sp_orca, sp_orca_recover, sp_qvszp
@@ -0,0 +1,570 @@
+"""
+Module distributing the ORCA single points over worker agents on other
+hosts ('numgradpy agent').
+
+An agent connects to the coordinator (the AgentScheduler of a NumGradPy
+run) over TCP and registers with the number of single points it runs at
+the same time. The coordinator sends each task with its input files to the
+agent with the most free slots, and the agent returns the parsed energy
+together with the requested output files, which the coordinator writes to
+the working directory of the run. The tasks of an agent that disconnects
+or stops sending heartbeats are given to the remaining agents.
+
+Protocol: one JSON object per line in each direction, files are base64
+encoded.
+
+- agent: {"version": 1, "type": "register", "name": str, "capacity": int,
+  "token": str | None}, {"type": "heartbeat"} and {"type": "result",
+  "id": int, "success": bool, "energy": float | None, "timeout": bool,
+  "error": str, "files": {name: data}}
+- coordinator: {"type": "task", "id": int, "binary": str, "prefix": str,
+  "timeout": float | None, "files": {name: data}, "artifacts": [suffix]}
+  and {"type": "shutdown"}
+"""
+
+from __future__ import annotations
+
+import base64
+import hmac
+import ipaddress
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Tuple
+
+from ..constants import RunConfig, get_run_config
+from ..io import get_orca_energy
+from .helpfcts import ExternalProgramError
+from .jobs import orca_job
+from .scheduler import JobScheduler, _Job
+from .singlepoint import sp_orca_recover
+
+AGENT_PROTOCOL_VERSION = 1
+"""Version of the JSON protocol between coordinator and agents."""
+
+ARTIFACTS = (".out", "_property.txt", ".engrad")
+"""Output files of a single point that are returned to the coordinator."""
+
+Address = Tuple[str, int]
+
+
+def parse_address(address: str, host: str = "localhost") -> Address:
+    """
+    Split 'HOST:PORT' (or only 'PORT') into host and port.
+    """
+
+    name, _, port = address.rpartition(":")
+    try:
+        return (name or host, int(port))
+    except ValueError as exc:
+        raise ValueError(f"Invalid address '{address}', expected HOST:PORT.") from exc
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Whether 'host' is reachable only from this machine. An empty host
+    (all interfaces) and names that cannot be resolved are not.
+    """
+
+    if not host:
+        return False
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except OSError:
+        return False
+    return all(
+        ipaddress.ip_address(str(info[4][0]).split("%")[0]).is_loopback
+        for info in infos
+    )
+
+
+def _send(sock: socket.socket, lock: threading.Lock, message: dict[str, Any]) -> None:
+    data = json.dumps(message).encode("UTF-8") + b"\n"
+    with lock:
+        sock.sendall(data)
+
+
+def _encode(path: str) -> str:
+    with open(path, "rb") as file:
+        return base64.b64encode(file.read()).decode("ascii")
+
+
+def _decode(directory: str, files: dict[str, str]) -> None:
+    for name, data in files.items():
+        # only plain file names, nothing outside the directory
+        if os.path.basename(name) != name or name in ("", ".", ".."):
+            raise ValueError(f"Invalid file name '{name}'.")
+        with open(os.path.join(directory, name), "wb") as file:
+            file.write(base64.b64decode(data))
+
+
+@dataclass
+class _Agent:
+    """
+    Connection and running tasks of one registered agent.
+    """
+
+    name: str
+    capacity: int
+    sock: socket.socket
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    running: set[int] = field(default_factory=set)
+    alive: bool = True
+
+
+@dataclass
+class AgentResult:
+    """
+    Outcome of a single point returned by an agent.
+    """
+
+    workdir: str
+    energy: float | None
+    files: dict[str, str]
+
+
+class AgentScheduler(JobScheduler):
+    """
+    Scheduler running the ORCA single points ('orca_job') on remote agents
+    instead of local worker processes.
+
+    Retries, back-off and speculative copies work as for the local pool.
+    The capacity ('nprocs') is the sum of the slots of all registered
+    agents; jobs submitted while no agent is connected wait for one.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        token: str | None = None,
+        maxpending: int | None = None,
+        retries: int = 0,
+        backoff: float = 1.0,
+        speculate: float = 0.0,
+        artifacts: Sequence[str] = ARTIFACTS,
+        heartbeat: float = 60.0,
+    ) -> None:
+        """
+        Listen for agents.
+
+        Parameters
+        ----------
+        address : Address
+            Host and port to listen on (port 0: any free port, see
+            'address' afterwards).
+        token : str | None
+            Shared secret the agents have to register with; required unless
+            the host is a loopback address.
+        maxpending : int | None
+            Maximum number of jobs in flight (default: no limit, the jobs
+            wait in the coordinator until an agent has a free slot).
+        retries, backoff, speculate
+            As for JobScheduler.
+        artifacts : Sequence[str]
+            Suffixes of the output files that are returned by the agents.
+        heartbeat : float
+            Time in seconds without a message after which an agent counts
+            as lost.
+        """
+
+        if token is None and not is_loopback(address[0]):
+            raise ValueError(
+                f"Listening for agents on '{address[0] or '*'}' requires a token."
+            )
+        self.token = token
+        self.artifacts = tuple(artifacts)
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._agents: list[_Agent] = []
+        self._queue: deque[int] = deque()
+        self._tasks: dict[int, tuple[str, str, str, float | None]] = {}
+        self._server = socket.create_server(address)
+        self.address: Address = self._server.getsockname()[:2]
+        super().__init__(
+            1,
+            maxpending if maxpending is not None else sys.maxsize,
+            retries=retries,
+            backoff=backoff,
+            speculate=speculate,
+        )
+        self.stats["lost_agents"] = 0
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @classmethod
+    def configured(
+        cls,
+        address: Address,
+        token: str | None = None,
+        config: RunConfig | None = None,
+    ) -> AgentScheduler:
+        """
+        Listen for agents with the retry and straggler settings of the
+        'orca' section of the run configuration.
+        """
+
+        if config is None:
+            config = get_run_config()
+        return cls(
+            address,
+            token,
+            retries=int(str(config.get("orca", "retries", "2"))),
+            backoff=float(str(config.get("orca", "backoff", "1.0"))),
+            speculate=float(str(config.get("orca", "speculate", "3.0"))),
+        )
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of single points all connected agents run at the same time.
+        """
+
+        with self._lock:
+            return sum(agent.capacity for agent in self._agents)
+
+    def _authorized(self, token: object) -> bool:
+        """
+        Compare the token of a registration in constant time.
+        """
+
+        if self.token is None:
+            return token is None
+        return isinstance(token, str) and hmac.compare_digest(
+            token.encode("UTF-8"), self.token.encode("UTF-8")
+        )
+
+    def _start_workers(self) -> None:
+        return None
+
+    def _execute(self, jobid: int, job: _Job, kwds: dict[str, Any]) -> None:
+        if job.func is not orca_job:
+            raise ValueError("Agents only run ORCA single points ('orca_job').")
+        binaryname, calcname, workdir = job.args[:3]
+        timeout = job.args[3] if len(job.args) > 3 else None
+        with self._lock:
+            self._tasks[jobid] = (binaryname, calcname, workdir, timeout)
+            self._queue.append(jobid)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """
+        Send waiting tasks to the agents with the most free slots.
+        """
+
+        lost: list[_Agent] = []
+        while True:
+            # only the choice of the agent needs the lock: its slot is
+            # reserved, so that a lost agent requeues the task
+            with self._lock:
+                agents = [a for a in self._agents if len(a.running) < a.capacity]
+                if not self._queue or not agents:
+                    break
+                agent = max(agents, key=lambda a: a.capacity - len(a.running))
+                jobid = self._queue.popleft()
+                binaryname, calcname, workdir, timeout = self._tasks[jobid]
+                agent.running.add(jobid)
+            files = {}
+            for suffix in (".inp", ".gbw"):
+                path = os.path.join(workdir, calcname + suffix)
+                if os.path.exists(path):
+                    files[calcname + suffix] = _encode(path)
+            message = {
+                "type": "task",
+                "id": jobid,
+                "binary": binaryname,
+                "prefix": calcname,
+                "timeout": timeout,
+                "files": files,
+                "artifacts": list(self.artifacts),
+            }
+            try:
+                _send(agent.sock, agent.lock, message)
+            except OSError:
+                with self._lock:
+                    if agent.alive:
+                        lost.append(agent)
+                    self._remove(agent)
+        # their tasks have been sent to the remaining agents in the loop
+        for agent in lost:
+            self._report_lost(agent)
+
+    def _remove(self, agent: _Agent) -> None:
+        """
+        Unregister an agent and requeue its tasks (lock held by the caller).
+        """
+
+        if not agent.alive:
+            return
+        agent.alive = False
+        self._agents.remove(agent)
+        self.nprocs = max(1, sum(a.capacity for a in self._agents))
+        self.stats["lost_agents"] += 1
+        # the tasks of a lost agent are resent first
+        self._queue.extendleft(sorted(agent.running, reverse=True))
+        agent.running.clear()
+        try:
+            agent.sock.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _report_lost(agent: _Agent) -> None:
+        print(f"Lost agent '{agent.name}', its tasks are resubmitted.", flush=True)
+
+    def _accept(self) -> None:
+        """
+        Accept agents until the scheduler is closed.
+        """
+
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock: socket.socket) -> None:
+        """
+        Register one agent and receive its messages.
+        """
+
+        agent: _Agent | None = None
+        sock.settimeout(self.heartbeat)
+        try:
+            with sock.makefile("rb") as stream:
+                message = json.loads(stream.readline())
+                if (
+                    message.get("version") != AGENT_PROTOCOL_VERSION
+                    or message.get("type") != "register"
+                    or not self._authorized(message.get("token"))
+                    or int(message.get("capacity", 0)) < 1
+                ):
+                    sock.close()
+                    return
+                agent = _Agent(str(message.get("name")), int(message["capacity"]), sock)
+                with self._lock:
+                    if self._closed:
+                        sock.close()
+                        return
+                    self._agents.append(agent)
+                    self.nprocs = sum(a.capacity for a in self._agents)
+                self._dispatch()
+                for line in stream:
+                    message = json.loads(line)
+                    if message.get("type") == "result":
+                        self._receive(agent, message)
+                        self._dispatch()
+        except (OSError, ValueError):
+            pass
+        if agent is not None:
+            with self._lock:
+                closed = self._closed or not agent.alive
+                self._remove(agent)
+            if not closed:
+                self._report_lost(agent)
+                self._dispatch()
+
+    def _receive(self, agent: _Agent, message: dict[str, Any]) -> None:
+        """
+        Pass the result of a task on to 'next_done'.
+        """
+
+        jobid = int(message["id"])
+        with self._lock:
+            if jobid not in agent.running:
+                return
+            agent.running.discard(jobid)
+            workdir = self._tasks.pop(jobid)[2]
+        if message.get("success"):
+            energy = message.get("energy")
+            result: Any = AgentResult(
+                workdir, None if energy is None else float(energy), message["files"]
+            )
+            self._done.put((jobid, True, result))
+        elif message.get("timeout"):
+            self._done.put((jobid, False, TimeoutError(message.get("error", ""))))
+        else:
+            error = ExternalProgramError(f"{agent.name}: {message.get('error', '')}")
+            self._done.put((jobid, False, error))
+
+    def next_done(self, timeout: float | None = None) -> tuple[Any, bool, Any]:
+        """
+        Wait for the next finished job; the returned output files are
+        written to the working directory of the job.
+        """
+
+        key, success, result = super().next_done(timeout)
+        if success and isinstance(result, AgentResult):
+            _decode(result.workdir, result.files)
+            return key, True, True
+        return key, success, result
+
+    def report(self, since: dict[str, int] | None = None) -> str:
+        lost = self.stats["lost_agents"] - (since or {}).get("lost_agents", 0)
+        return super().report(since) + f", {lost} agents lost"
+
+    def close(self) -> None:
+        """
+        Stop listening and send the agents home.
+        """
+
+        with self._lock:
+            self._closed = True
+            agents = list(self._agents)
+        self._server.close()
+        for agent in agents:
+            try:
+                _send(agent.sock, agent.lock, {"type": "shutdown"})
+                agent.sock.close()
+            except OSError:
+                pass
+
+
+class WorkerAgent:
+    """
+    Worker agent running the single points of a coordinator in scratch
+    directories on its own host.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        capacity: int = 1,
+        scratch: str | None = None,
+        token: str | None = None,
+        name: str | None = None,
+        heartbeat: float = 10.0,
+    ) -> None:
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        address : Address
+            Host and port of the coordinator.
+        capacity : int
+            Number of single points that run at the same time.
+        scratch : str | None
+            Directory of the temporary task directories (default: system
+            temporary directory).
+        token : str | None
+            Shared secret of the coordinator.
+        name : str | None
+            Name in the messages of the coordinator (default: host:pid).
+        heartbeat : float
+            Interval of the heartbeat messages in seconds.
+        """
+
+        if capacity < 1:
+            raise ValueError("The capacity of an agent must be positive.")
+        self.address = address
+        self.capacity = capacity
+        self.scratch = scratch
+        self.token = token
+        self.name = (
+            name if name is not None else f"{socket.gethostname()}:{os.getpid()}"
+        )
+        self.heartbeat = heartbeat
+        self.ntasks = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self, connect_timeout: float = 0.0) -> None:
+        """
+        Connect to the coordinator and run its tasks until it sends the
+        agent home or the connection is lost.
+
+        Parameters
+        ----------
+        connect_timeout : float
+            Time in seconds during which refused connections are retried,
+            so that agents can be started before the coordinator.
+        """
+
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                sock = socket.create_connection(self.address)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+        with sock, sock.makefile("rb") as stream, ThreadPoolExecutor(
+            self.capacity
+        ) as pool:
+            _send(
+                sock,
+                self._lock,
+                {
+                    "version": AGENT_PROTOCOL_VERSION,
+                    "type": "register",
+                    "name": self.name,
+                    "capacity": self.capacity,
+                    "token": self.token,
+                },
+            )
+            beat = threading.Thread(target=self._beat, args=(sock,), daemon=True)
+            beat.start()
+            try:
+                for line in stream:
+                    message = json.loads(line)
+                    if message.get("type") == "shutdown":
+                        break
+                    if message.get("type") == "task":
+                        pool.submit(self._task, sock, message)
+            except OSError:
+                pass
+            finally:
+                self._stop.set()
+
+    def _beat(self, sock: socket.socket) -> None:
+        while not self._stop.wait(self.heartbeat):
+            try:
+                _send(sock, self._lock, {"type": "heartbeat"})
+            except OSError:
+                return
+
+    def _task(self, sock: socket.socket, message: dict[str, Any]) -> None:
+        """
+        Run one task in a temporary directory and send back its result.
+        """
+
+        prefix = str(message["prefix"])
+        taskdir = tempfile.mkdtemp(prefix=f"ngp_{prefix}_", dir=self.scratch)
+        result: dict[str, Any] = {"type": "result", "id": message["id"]}
+        try:
+            _decode(taskdir, message["files"])
+            sp_orca_recover(message["binary"], prefix, taskdir, message["timeout"])
+            result["energy"] = get_orca_energy(os.path.join(taskdir, prefix + ".out"))
+            result["files"] = {
+                name: _encode(os.path.join(taskdir, name))
+                for name in (prefix + suffix for suffix in message["artifacts"])
+                if os.path.exists(os.path.join(taskdir, name))
+            }
+            result["success"] = True
+        except Exception as exc:  # pylint: disable=broad-except
+            # reported to the coordinator, which retries the task
+            result.update(
+                success=False,
+                timeout=isinstance(exc, TimeoutError),
+                error=f"{type(exc).__name__}: {exc}",
+            )
+        finally:
+            shutil.rmtree(taskdir, ignore_errors=True)
+        with self._lock:
+            self.ntasks += 1
+        try:
+            _send(sock, self._lock, result)
+        except OSError:
+            pass
@@ -2,10 +2,19 @@
 Module that contains helper functions interacting with the OS and other processes.
 """
 
+from __future__ import annotations
+
 import errno
 import os
+import shutil
 import subprocess as sp
-import sys
+from collections.abc import Mapping
+
+
+class ExternalProgramError(RuntimeError):
+    """
+    Raised if an external program exits with a non-zero status.
+    """
 
 
 def silentremove(*args: str) -> bool:
@@ -19,34 +28,60 @@ def silentremove(*args: str) -> bool:
     return True
 
 
-def checkifinpath(executable: str) -> str:
-    # if output is empty, executable is not in PATH -> FileNotFoundError
-    try:
-        p = sp.run(["which", executable], stdout=sp.PIPE, stderr=sp.PIPE, check=True)
-    except sp.CalledProcessError as e:
-        raise FileNotFoundError(f"'{executable}' is not in PATH") from e
-
-    if p.stdout == b"":
+def checkifinpath(executable: str, env: Mapping[str, str] | None = None) -> str:
+    # search the PATH of the given environment (default: os.environ)
+    searchpath = None if env is None else env.get("PATH", os.defpath)
+    fullpath = shutil.which(executable, path=searchpath)
+    if fullpath is None:
         raise FileNotFoundError(f"'{executable}' is not in PATH")
-    else:
-        fullpath = p.stdout.decode("utf-8").strip()
 
     return fullpath
 
 
-def runexec(executable: str, outfile: str, errfile: str, arglist: list[str]) -> bool:
-    fpath = checkifinpath(executable)
+def runexec(
+    executable: str,
+    outfile: str,
+    errfile: str,
+    arglist: list[str],
+    workdir: str | None = None,
+    timeout: float | None = None,
+    env: Mapping[str, str] | None = None,
+) -> bool:
+    fpath = checkifinpath(executable, env)
+    # output files are relative to the working directory of the executable
+    if workdir is not None:
+        outfile = os.path.join(workdir, outfile)
+        errfile = os.path.join(workdir, errfile)
     with open(outfile, "w", encoding="UTF-8") as stdout_file, open(
         errfile, "w", encoding="UTF-8"
     ) as stderr_file:
         try:
             # inserting all entries of arglist as
             # arguments for the executable call in sp.run()
-            sp.run([fpath, *arglist], stdout=stdout_file, stderr=sp.PIPE, check=True)
+            sp.run(
+                [fpath, *arglist],
+                stdout=stdout_file,
+                stderr=sp.PIPE,
+                check=True,
+                cwd=workdir,
+                timeout=timeout,
+                env=None if env is None else dict(env),
+            )
+        except sp.TimeoutExpired as error:
+            # the process has been killed by sp.run
+            stderr_file.write(f"Wall-time limit of {timeout} s exceeded.\n")
+            raise TimeoutError(
+                f"'{executable}' exceeded the wall-time limit of {timeout} s."
+            ) from error
         except sp.CalledProcessError as error:
             print(f"An error occurred: {error}")
             print(f"Error output:\n{error.stderr.decode('utf-8')}")
             stderr_file.write(error.stderr.decode("utf-8"))
-            sys.exit(1)
+            # raised instead of exiting, so that worker processes survive
+            # and the failure of one job can be handled by the caller
+            raise ExternalProgramError(
+                f"'{executable}' failed with exit status {error.returncode} \
+(see '{errfile}')."
+            ) from error
     # return exit code of executable
     return True
@@ -0,0 +1,262 @@
+"""
+Module with the self-contained single point jobs that are executed by
+the worker processes of a JobScheduler.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from collections.abc import Mapping
+
+from ..constants import RunConfig, get_run_config
+from ..io import get_orca_dipolemoment, get_orca_energy, get_orca_polarizability
+from .retention import apply_retention, retention_settings
+from .singlepoint import POLARIZABILITY_BLOCK, add_orca_block, sp_orca_recover, sp_qvszp
+
+
+def orca_timeout(config: RunConfig | None = None) -> float | None:
+    """
+    Wall-time limit of an ORCA single point from the configuration
+    ('orca.timeout' in seconds) or None if there is no limit.
+    """
+
+    if config is None:
+        config = get_run_config()
+    timeout = config.get("orca", "timeout")
+    return None if timeout is None or float(timeout) <= 0.0 else float(timeout)
+
+
+def program_environment(
+    config: RunConfig | None = None, environ: Mapping[str, str] | None = None
+) -> dict[str, str]:
+    """
+    Environment of the external programs: a copy of 'environ' (default:
+    os.environ) with the configured ORCA directory ('orca.path') in front of
+    PATH and LD_LIBRARY_PATH. Neither the input nor os.environ is modified.
+    """
+
+    if config is None:
+        config = get_run_config()
+    env = dict(os.environ if environ is None else environ)
+    orcapath = config.get("orca", "path")
+    if orcapath is not None:
+        for name in ("PATH", "LD_LIBRARY_PATH"):
+            if not env.get(name, "").startswith(orcapath + os.pathsep):
+                env[name] = orcapath + os.pathsep + env.get(name, "")
+    return env
+
+
+def _stamp(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+PUBLISH_LOCK_TIMEOUT = 60.0
+"""Age in seconds after which a publication lock is taken as abandoned."""
+
+
+def publish_results(
+    scratch: str, calcname: str, workdir: str, stamp: tuple[int, int]
+) -> bool:
+    """
+    Move the output files of a calculation from its scratch directory to
+    'workdir' if no other copy has published them yet and the input (with
+    'stamp' as size and modification time) has not been replaced since.
+
+    Publication is serialised by a lock directory; the stamp of the
+    published input is kept in the hidden file '.<calcname>.published',
+    so that a copy finishing late neither overwrites the results of the
+    winning copy nor those of a later calculation with the same name.
+
+    Returns
+    -------
+    published : bool
+        True if the files of this copy were published.
+    """
+
+    lock = os.path.join(workdir, f".{calcname}.lock")
+    marker = os.path.join(workdir, f".{calcname}.published")
+    token = f"{stamp[0]} {stamp[1]}"
+    while True:
+        try:
+            os.mkdir(lock)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(lock).st_mtime > PUBLISH_LOCK_TIMEOUT:
+                    os.rmdir(lock)
+            except OSError:
+                pass
+            time.sleep(0.01)
+    try:
+        try:
+            current = _stamp(os.path.join(workdir, calcname + ".inp"))
+        except FileNotFoundError:
+            return False
+        if current != stamp:
+            return False
+        if os.path.exists(marker):
+            with open(marker, encoding="UTF-8") as f:
+                if f.read() == token:
+                    return False
+        for name in os.listdir(scratch):
+            if name.startswith(calcname) and name != calcname + ".inp":
+                os.replace(os.path.join(scratch, name), os.path.join(workdir, name))
+        with open(marker, "w", encoding="UTF-8") as f:
+            f.write(token)
+        return True
+    finally:
+        os.rmdir(lock)
+
+
+def orca_job(
+    binaryname: str,
+    calcname: str,
+    workdir: str,
+    timeout: float | None = None,
+    env: Mapping[str, str] | None = None,
+    copy: int = 0,
+) -> bool:
+    """
+    Run a prepared ORCA single point (input and guess in 'workdir').
+
+    Every copy of the job (the original and the speculative ones) runs in
+    a private scratch directory, and only the first copy to finish moves
+    its output files to 'workdir' (see 'publish_results'). A straggling
+    copy therefore never writes into 'workdir' while the results are read,
+    cleaned up or replaced by a later calculation with the same name.
+
+    Parameters
+    ----------
+    binaryname : str
+        Name of the ORCA binary.
+    calcname : str
+        Base name of the calculation.
+    workdir : str
+        Directory of the calculation.
+    timeout : float | None
+        Wall-time limit in seconds.
+    env : Mapping[str, str] | None
+        Environment of ORCA (default: that of this process).
+    copy : int
+        Number of the copy of the job (see JobScheduler).
+
+    Returns
+    -------
+    success : bool
+        True if the SCF converged (possibly after recovery steps).
+    """
+
+    scratch = os.path.join(workdir, f".{calcname}.copy{copy}")
+    inpfile = os.path.join(workdir, calcname + ".inp")
+    if copy == 0:
+        # results of an earlier calculation of the same input may be
+        # published again (e.g. after the retention policy removed them)
+        marker = os.path.join(workdir, f".{calcname}.published")
+        if os.path.exists(marker):
+            os.remove(marker)
+    try:
+        shutil.rmtree(scratch, ignore_errors=True)
+        os.makedirs(scratch)
+        stamp = _stamp(inpfile)
+        shutil.copy2(inpfile, scratch)
+        if os.path.exists(os.path.join(workdir, calcname + ".gbw")):
+            shutil.copy2(os.path.join(workdir, calcname + ".gbw"), scratch)
+        # failures of ORCA are retried with the recovery ladder; remaining
+        # errors are raised and handled by the scheduler
+        sp_orca_recover(binaryname, calcname, scratch, timeout, env)
+        publish_results(scratch, calcname, workdir, stamp)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return True
+
+
+def singlepoint_job(
+    binaryname: str,
+    arguments: list[str],
+    prefix: str,
+    workdir: str,
+    guess: str | None = None,
+    dipole: bool = False,
+    config: RunConfig | None = None,
+    cleanup: bool = False,
+    polarizability: bool = False,
+    env: Mapping[str, str] | None = None,
+) -> dict[str, object]:
+    """
+    Run the q-vSZP input generation and the ORCA single point for one
+    calculation in its working directory.
+
+    Parameters
+    ----------
+    binaryname : str
+        Name of the binary that generates the ORCA input (e.g. 'qvSZP').
+    arguments : list[str]
+        Arguments for the binary (structure file, field, ...). The output
+        name is set to 'prefix'.
+    prefix : str
+        Base name of all files of the calculation.
+    workdir : str
+        Directory in which the calculation is run.
+    guess : str | None
+        Prefix of a calculation in 'workdir' whose GBW file is used as
+        initial guess.
+    dipole : bool
+        Also parse the dipole moment from the ORCA property file.
+    config : RunConfig | None
+        Configuration of the run (default: the one loaded for this process).
+    cleanup : bool
+        Apply the retention policy of the configuration to the files of the
+        calculation once the results have been read.
+    polarizability : bool
+        Also request and parse the analytical (CP-SCF) polarizability.
+    env : Mapping[str, str] | None
+        Environment of the binaries (default: that of this process).
+
+    Returns
+    -------
+    result : dict[str, object]
+        'energy' in Hartree, 'dipole' (list of three floats or None) and,
+        if requested, 'alpha' (nested 3x3 list).
+    """
+
+    sp_qvszp(
+        binaryname,
+        list(arguments) + ["--outname", prefix],
+        prefix,
+        verbose=False,
+        workdir=workdir,
+        config=config,
+        env=env,
+    )
+    if guess is not None:
+        shutil.copy2(
+            os.path.join(workdir, guess + ".gbw"),
+            os.path.join(workdir, prefix + ".gbw"),
+        )
+    if polarizability:
+        add_orca_block(os.path.join(workdir, prefix + ".inp"), POLARIZABILITY_BLOCK)
+    sp_orca_recover(
+        "orca", prefix, workdir=workdir, timeout=orca_timeout(config), env=env
+    )
+
+    result: dict[str, object] = {
+        "energy": get_orca_energy(os.path.join(workdir, prefix + ".out")),
+        "dipole": None,
+    }
+    if dipole:
+        result["dipole"] = get_orca_dipolemoment(
+            os.path.join(workdir, prefix + "_property.txt")
+        ).tolist()
+    if polarizability:
+        result["alpha"] = get_orca_polarizability(
+            os.path.join(workdir, prefix + ".out")
+        ).tolist()
+    if cleanup:
+        policy, compression = retention_settings(config)
+        apply_retention(prefix, policy, workdir, compression, binaryname)
+
+    return result
@@ -0,0 +1,105 @@
+"""
+Retention policy for the files of finished single point calculations.
+
+The policy is applied to each calculation as soon as its results have been
+read, so that the scratch space does not grow with the number of
+displacements:
+
+- 'keep-all': all files are kept
+- 'keep-outputs-compressed': text files (input, output, properties, ...)
+  are compressed, binary scratch files (GBW, densities) are removed
+- 'keep-results-only': all files of the calculation are removed
+"""
+
+from __future__ import annotations
+
+import os
+
+from ..constants import RunConfig, get_run_config
+from ..io.compression import COMPRESSION_SUFFIXES, compress_file
+from .helpfcts import silentremove
+
+RETENTION_POLICIES = ("keep-all", "keep-outputs-compressed", "keep-results-only")
+
+TEXT_SUFFIXES = (
+    ".inp",
+    ".out",
+    ".err",
+    ".xyz",
+    "_property.txt",
+    ".engrad",
+)
+"""Text files of a calculation '<prefix><suffix>', which are compressed."""
+
+SCRATCH_SUFFIXES = (
+    ".gbw",
+    "_loose.gbw",
+    ".densities",
+    ".densitiesinfo",
+    ".tmp",
+    ".bibtex",
+    "_property.json",
+)
+"""Binary and scratch files of a calculation, which are never kept compressed."""
+
+
+def retention_settings(config: RunConfig | None = None) -> tuple[str, str]:
+    """
+    Retention policy and compression method from the 'orca' section of the
+    run configuration ('retention' and 'compression').
+    """
+
+    if config is None:
+        config = get_run_config()
+    return (
+        str(config.get("orca", "retention", "keep-all")),
+        str(config.get("orca", "compression", "gzip")),
+    )
+
+
+def apply_retention(
+    prefix: str,
+    policy: str,
+    workdir: str | None = None,
+    compression: str = "gzip",
+    binaryname: str | None = None,
+) -> None:
+    """
+    Apply a retention policy to the files of one finished calculation.
+
+    Parameters
+    ----------
+    prefix : str
+        Base name of the calculation.
+    policy : str
+        One of RETENTION_POLICIES.
+    workdir : str | None
+        Directory of the calculation (default: current directory).
+    compression : str
+        'gzip' or 'zstd' (requires the 'zstandard' package).
+    binaryname : str | None
+        Name of the binary that generated the input; its logs
+        '<binaryname>_<prefix>.out' and '.err' are handled as text files.
+    """
+
+    if policy not in RETENTION_POLICIES:
+        raise ValueError(f"Unknown retention policy '{policy}'.")
+    if policy == "keep-all":
+        return
+
+    base = os.path.join(workdir, prefix) if workdir is not None else prefix
+    silentremove(*(base + suffix for suffix in SCRATCH_SUFFIXES))
+    textfiles = [base + suffix for suffix in TEXT_SUFFIXES]
+    if binaryname is not None:
+        logbase = binaryname + "_" + prefix
+        if workdir is not None:
+            logbase = os.path.join(workdir, logbase)
+        textfiles += [logbase + ".out", logbase + ".err"]
+    for filename in textfiles:
+        if policy == "keep-results-only":
+            # also the files compressed by an earlier step
+            silentremove(
+                filename, *(filename + c for c in COMPRESSION_SUFFIXES.values())
+            )
+        elif os.path.exists(filename):
+            compress_file(filename, compression)
@@ -0,0 +1,381 @@
+"""
+Module providing a persistent worker pool with back-pressure, on which the
+single point calculations of many structures are scheduled.
+"""
+
+from __future__ import annotations
+
+import heapq
+import queue
+import statistics
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from multiprocessing import Pool
+from multiprocessing.pool import Pool as PoolType
+from multiprocessing.pool import ThreadPool
+from types import TracebackType
+from typing import Any
+
+from ..constants import RunConfig, get_run_config
+
+
+@dataclass
+class _Job:
+    """
+    Bookkeeping of one submitted job and its running copies.
+    """
+
+    key: Hashable
+    func: Callable[..., Any]
+    args: tuple[Any, ...]
+    speculative: bool
+    attempts: int = 0
+    running: int = 0
+    copies: int = 0
+    started: float = 0.0
+
+
+class JobScheduler:
+    """
+    Persistent pool of worker processes.
+
+    Jobs are submitted with a key and their results are collected in the
+    order of completion via 'next_done'. At most 'maxpending' jobs are
+    queued or running at the same time, so that callers can check 'full'
+    before generating more work (back-pressure).
+
+    Failed jobs are resubmitted up to 'retries' times with an exponential
+    back-off. If a worker is idle and a job of the flagged 'speculative'
+    ones runs longer than 'speculate' times the median run time of the
+    finished jobs, a second copy of it is started and the result of the
+    copy that finishes first is returned. Such jobs are called with the
+    keyword argument 'copy' (0 for the original, 1 for the second copy),
+    so that they can keep the files of the copies apart.
+    """
+
+    def __init__(
+        self,
+        nprocs: int,
+        maxpending: int | None = None,
+        retries: int = 0,
+        backoff: float = 1.0,
+        speculate: float = 0.0,
+    ) -> None:
+        """
+        Start the worker pool.
+
+        Parameters
+        ----------
+        nprocs : int
+            Number of worker processes.
+        maxpending : int | None
+            Maximum number of jobs in flight (default: 2 * nprocs).
+        retries : int
+            Number of times a failed job is resubmitted.
+        backoff : float
+            Delay in seconds before the first retry, doubled for each
+            further retry of the same job.
+        speculate : float
+            Run time (relative to the median of the finished jobs) after
+            which a second copy of a straggler is started (0: never).
+        """
+
+        if nprocs < 1:
+            raise ValueError("Number of worker processes must be positive.")
+
+        self.nprocs = nprocs
+        self.maxpending = maxpending if maxpending is not None else 2 * nprocs
+        self.retries = retries
+        self.backoff = backoff
+        self.speculate = speculate
+        self.pending = 0
+        self.stats = {
+            "jobs": 0,
+            "failed": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "speculative": 0,
+            "speculative_wins": 0,
+        }
+        self._done: queue.Queue[tuple[int, bool, Any]] = queue.Queue()
+        self._pool = self._start_workers()
+        # copies in flight: id -> (job, number of the copy)
+        self._jobs: dict[int, tuple[_Job, int]] = {}
+        self._nextid = 0
+        self._running = 0
+        self._delayed: list[tuple[float, int, _Job]] = []
+        self._durations: list[float] = []
+
+    @classmethod
+    def from_config(
+        cls,
+        nprocs: int,
+        maxpending: int | None = None,
+        config: RunConfig | None = None,
+    ) -> JobScheduler:
+        """
+        Start a worker pool with the retry and straggler settings of the
+        'orca' section of the run configuration ('retries', 'backoff' and
+        'speculate').
+        """
+
+        sched = cls(nprocs, maxpending)
+        sched.configure(config)
+        return sched
+
+    def configure(self, config: RunConfig | None = None) -> None:
+        """
+        Take over the retry and straggler settings of the 'orca' section of
+        a run configuration, e.g. those of the next request of a daemon.
+        """
+
+        if config is None:
+            config = get_run_config()
+        self.retries = int(str(config.get("orca", "retries", "2")))
+        self.backoff = float(str(config.get("orca", "backoff", "1.0")))
+        self.speculate = float(str(config.get("orca", "speculate", "3.0")))
+
+    def __enter__(self) -> JobScheduler:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def full(self) -> bool:
+        """
+        True if no further job should be submitted before one has finished.
+        """
+
+        return self.pending >= self.maxpending
+
+    def submit(
+        self,
+        key: Hashable,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        speculative: bool = False,
+    ) -> None:
+        """
+        Submit a job to the pool.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifier under which the result is returned.
+        func : Callable
+            Picklable (module-level) function executed by a worker.
+        args : tuple
+            Arguments of the function.
+        speculative : bool
+            Allow a second copy of the job if it straggles ('func' must
+            accept the keyword argument 'copy').
+        """
+
+        self.pending += 1
+        self.stats["jobs"] += 1
+        self._launch(_Job(key, func, args, speculative))
+
+    def _launch(self, job: _Job) -> None:
+        """
+        Start one copy of a job.
+        """
+
+        jobid = self._nextid
+        self._nextid += 1
+        self._jobs[jobid] = (job, job.copies)
+        kwds = {"copy": job.copies} if job.speculative else {}
+        if job.running == 0:
+            job.started = time.monotonic()
+        job.running += 1
+        job.copies += 1
+        self._running += 1
+        self._execute(jobid, job, kwds)
+
+    def _start_workers(self) -> PoolType | None:
+        """
+        Start the local worker processes.
+        """
+
+        return Pool(self.nprocs)
+
+    def _execute(self, jobid: int, job: _Job, kwds: dict[str, Any]) -> None:
+        """
+        Run one copy of a job; its outcome is put on the queue of finished
+        copies as (jobid, success, result).
+        """
+
+        assert self._pool is not None
+        self._pool.apply_async(
+            job.func,
+            job.args,
+            kwds,
+            callback=lambda result: self._done.put((jobid, True, result)),
+            error_callback=lambda error: self._done.put((jobid, False, error)),
+        )
+
+    def _straggler_limit(self) -> float | None:
+        """
+        Run time after which a job counts as a straggler (None if unknown).
+        """
+
+        if self.speculate <= 0.0 or len(self._durations) < self.nprocs:
+            return None
+        return self.speculate * statistics.median(self._durations)
+
+    def _start_stragglers(self) -> float | None:
+        """
+        Start second copies of stragglers on idle workers and return the
+        time until the next job becomes a straggler.
+        """
+
+        limit = self._straggler_limit()
+        if limit is None:
+            return None
+        now = time.monotonic()
+        wait: float | None = None
+        for job in {id(job): job for job, _ in self._jobs.values()}.values():
+            if not job.speculative or job.copies > 1 or job.running == 0:
+                continue
+            elapsed = now - job.started
+            if elapsed < limit:
+                remaining = limit - elapsed
+                wait = remaining if wait is None else min(wait, remaining)
+            elif self._running < self.nprocs:
+                self.stats["speculative"] += 1
+                self._launch(job)
+        return wait
+
+    def next_done(self, timeout: float | None = None) -> tuple[Hashable, bool, Any]:
+        """
+        Wait for the next finished job.
+
+        Parameters
+        ----------
+        timeout : float | None
+            Longest wait in seconds (default: no limit), after which
+            TimeoutError is raised if no job has finished.
+
+        Returns
+        -------
+        key : Hashable
+            Key the job was submitted with.
+        success : bool
+            False if the job raised an exception (after all retries).
+        result : Any
+            Return value of the job or the raised exception.
+        """
+
+        if self.pending == 0:
+            raise RuntimeError("No jobs are pending.")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # resubmit failed jobs whose back-off has expired
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, job = heapq.heappop(self._delayed)
+                self._launch(job)
+            waits = [self._delayed[0][0] - now] if self._delayed else []
+            if deadline is not None:
+                waits.append(deadline - now)
+            straggle = self._start_stragglers()
+            if straggle is not None:
+                waits.append(straggle)
+
+            try:
+                jobid, success, result = self._done.get(
+                    timeout=max(min(waits), 0.01) if waits else None
+                )
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        "No job has finished within the timeout."
+                    ) from None
+                continue
+
+            self._running -= 1
+            job, copy = self._jobs.pop(jobid)
+            if job.running == 0:
+                # a late copy of a job that has already been returned
+                continue
+            job.running -= 1
+
+            if success:
+                self._durations.append(time.monotonic() - job.started)
+                if copy > 0:
+                    self.stats["speculative_wins"] += 1
+                self._finish(job)
+                return job.key, True, result
+
+            if isinstance(result, TimeoutError):
+                self.stats["timeouts"] += 1
+            if job.running > 0:
+                # another copy of the job is still running
+                continue
+            if job.attempts < self.retries:
+                delay = self.backoff * 2**job.attempts
+                job.attempts += 1
+                job.copies = 0
+                self.stats["retries"] += 1
+                heapq.heappush(self._delayed, (time.monotonic() + delay, jobid, job))
+                continue
+            self.stats["failed"] += 1
+            self._finish(job)
+            return job.key, False, result
+
+    def _finish(self, job: _Job) -> None:
+        """
+        Return a job to the caller; results of other copies are ignored.
+        """
+
+        self.pending -= 1
+        job.running = 0
+
+    def report(self, since: dict[str, int] | None = None) -> str:
+        """
+        Summary of the job statistics for the run report.
+
+        Parameters
+        ----------
+        since : dict[str, int] | None
+            Copy of 'stats' taken earlier, to report only the jobs since
+            then (e.g. of one request to a daemon).
+        """
+
+        stats = {
+            key: value - (since or {}).get(key, 0) for key, value in self.stats.items()
+        }
+        return (
+            f"{stats['jobs']} jobs, {stats['failed']} failed, "
+            f"{stats['retries']} retries, {stats['timeouts']} timeouts, "
+            f"{stats['speculative']} speculative copies "
+            f"({stats['speculative_wins']} finished first)"
+        )
+
+    def close(self) -> None:
+        """
+        Stop the worker pool.
+        """
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+
+
+class ThreadJobScheduler(JobScheduler):
+    """
+    Scheduler running the jobs in threads of this process instead of
+    worker processes, for callers that must not fork (e.g. the library
+    interface). The work is done by the external programs, so threads
+    suffice.
+    """
+
+    def _start_workers(self) -> PoolType | None:
+        return ThreadPool(self.nprocs)
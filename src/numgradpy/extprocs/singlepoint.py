@@ -5,12 +5,52 @@ calculation, which is required for calculating the gradient of a function.
 
 from __future__ import annotations
 
-from ..constants import DefaultArguments
-from .helpfcts import runexec
+import os
+import re
+import shutil
+from collections.abc import Mapping
+
+import numpy as np
+import numpy.typing as npt
+
+from ..constants import RunConfig, get_run_config
+from ..io import Structure, get_orca_convergence
+from .helpfcts import ExternalProgramError, runexec
+
+RECOVERY_LADDER = ("guess", "damping", "loose-tight")
+"""Recovery steps tried in this order if an ORCA single point fails:
+another initial guess without the GBW file, damping (SlowConv) with more
+iterations, and a loose SCF whose orbitals start the original tight SCF."""
+
+GUESS_KEYWORDS = ("pmodel", "hueckel", "hcore", "patom", "pmodeldens")
+CONV_KEYWORDS = (
+    "sloppyscf",
+    "loosescf",
+    "normalscf",
+    "strongscf",
+    "tightscf",
+    "verytightscf",
+    "extremescf",
+)
+
+POLARIZABILITY_BLOCK = "%elprop\n Polar 1\nend"
+"""ORCA input block requesting the analytical (CP-SCF) static polarizability."""
+
+
+class SCFConvergenceError(RuntimeError):
+    """
+    Raised if a single point fails on all steps of the recovery ladder.
+    """
 
 
 def sp_qvszp(
-    binaryname: str, arguments: list[str], calcname: str, verbose: bool
+    binaryname: str,
+    arguments: list[str],
+    calcname: str,
+    verbose: bool,
+    workdir: str | None = None,
+    config: RunConfig | None = None,
+    env: Mapping[str, str] | None = None,
 ) -> int:
     """
     Proceeds the single point calculation itself.
@@ -19,6 +59,12 @@ def sp_qvszp(
     ----------
     binaryname : str
         Name of the binary that is used for the calculation.
+    workdir : str | None
+        Directory in which the binary is run (default: current directory).
+    config : RunConfig | None
+        Configuration of the run (default: the one loaded for this process).
+    env : Mapping[str, str] | None
+        Environment of the binary (default: that of this process).
 
     Returns
     -------
@@ -26,29 +72,15 @@ def sp_qvszp(
         Error code of the calculation.
     """
 
-    controlargs = DefaultArguments()
-    config = controlargs.get_config()
-
-    qvszp_default_args = config["qvszp"]
-    qvszp_arglist = create_arglist(qvszp_default_args)
-
-    # check if single members of the default arguments
-    # and the arguments from the command line
-    # are the same. If it is the case, take the command line arguments
-    # and delete the default arguments from the list.
-    for i in range(0, len(qvszp_arglist), 2):
-        for j in range(0, len(arguments), 2):
-            if qvszp_arglist[i] == arguments[j]:
-                qvszp_arglist[i + 1] = arguments[j + 1]
-                del arguments[j : j + 2]
-                break
-
-    bin_args = qvszp_arglist + arguments
+    # arguments of this calculation replace the configured defaults
+    if config is None:
+        config = get_run_config()
+    bin_args = config.qvszp_arglist(arguments)
 
     # run preparation of single point input
     outfile = binaryname + "_" + calcname + ".out"
     errfile = binaryname + "_" + calcname + ".err"
-    e = runexec(binaryname, outfile, errfile, bin_args)
+    e = runexec(binaryname, outfile, errfile, bin_args, workdir, env=env)
     if verbose:
         print("Arguments for ' ", binaryname, " : ", bin_args)
 
@@ -70,7 +102,100 @@ def create_arglist(argdict: dict[str, object]) -> list[str]:
     return arglist
 
 
-def sp_orca(binaryname: str, calcname: str) -> int:
+def structure_arglist(struc: Structure, efield: bool = True) -> list[str]:
+    """
+    Function that translates the metadata of a structure (charge,
+    multiplicity and, if requested, the external electric field)
+    into q-vSZP arguments.
+    """
+    arglist = []
+
+    if struc.charge is not None:
+        arglist += ["--chrg", str(struc.charge)]
+    if struc.multiplicity is not None:
+        arglist += ["--uhf", str(struc.multiplicity - 1)]
+    if efield and struc.efield is not None:
+        arglist += ["--efield", *[str(x) for x in struc.efield]]
+
+    return arglist
+
+
+def add_orca_keywords(inpfile: str, keywords: str) -> None:
+    """
+    Function that adds a line of simple input keywords (e.g. 'EnGrad')
+    to the top of an existing ORCA input file.
+    """
+    with open(inpfile, encoding="UTF-8") as file:
+        content = file.read()
+    with open(inpfile, "w", encoding="UTF-8") as file:
+        file.write("! " + keywords + "\n" + content)
+
+
+def add_orca_moread(inpfile: str, gbwfile: str) -> None:
+    """
+    Function that makes ORCA read the initial orbitals of an existing
+    input file from a GBW file (e.g. of the previous optimisation cycle).
+    """
+    with open(inpfile, encoding="UTF-8") as file:
+        content = file.read()
+    with open(inpfile, "w", encoding="UTF-8") as file:
+        file.write(f'! MORead\n%moinp "{gbwfile}"\n' + content)
+
+
+def add_orca_block(inpfile: str, block: str) -> None:
+    """
+    Function that adds an input block (e.g. '%elprop Polar 1 end') in
+    front of the coordinates of an existing ORCA input file.
+    """
+    with open(inpfile, encoding="UTF-8") as file:
+        content = file.read()
+    block = block.rstrip("\n") + "\n"
+    content, nsub = re.subn(
+        r"^\*", lambda _: block + "*", content, count=1, flags=re.MULTILINE
+    )
+    if nsub == 0:
+        content += block
+    with open(inpfile, "w", encoding="UTF-8") as file:
+        file.write(content)
+
+
+def write_orca_efield_input(
+    inpfile: str, outfile: str, efield: npt.NDArray[np.float64]
+) -> None:
+    """
+    Function that writes a copy of an existing ORCA input with another
+    external electric field, so that the basis set and all other settings
+    of the input are reused without running q-vSZP again.
+    """
+    with open(inpfile, encoding="UTF-8") as file:
+        content = file.read()
+    values = ", ".join(str(x) for x in efield)
+    content, nsub = re.subn(
+        r"^(\s*efield\b).*$",
+        lambda match: f"{match.group(1)} {values}",
+        content,
+        flags=re.IGNORECASE | re.MULTILINE,
+    )
+    if nsub == 0:
+        # no field yet: add it in front of the coordinates
+        content = re.sub(
+            r"^\*",
+            f"%scf\n efield {values}\nend\n*",
+            content,
+            count=1,
+            flags=re.MULTILINE,
+        )
+    with open(outfile, "w", encoding="UTF-8") as file:
+        file.write(content)
+
+
+def sp_orca(
+    binaryname: str,
+    calcname: str,
+    workdir: str | None = None,
+    timeout: float | None = None,
+    env: Mapping[str, str] | None = None,
+) -> int:
     """
     Proceeds the single point calculation itself.
 
@@ -78,6 +203,13 @@ def sp_orca(binaryname: str, calcname: str) -> int:
     ----------
     binaryname : str
         Name of the binary that is used for the calculation.
+    workdir : str | None
+        Directory in which the binary is run (default: current directory).
+    timeout : float | None
+        Wall-time limit in seconds, after which the binary is killed and
+        a TimeoutError is raised.
+    env : Mapping[str, str] | None
+        Environment of the binary (default: that of this process).
 
     Returns
     -------
@@ -88,6 +220,158 @@ def sp_orca(binaryname: str, calcname: str) -> int:
     # run preparation of single point input
     outfile = calcname + ".out"
     errfile = calcname + ".err"
-    e = runexec(binaryname, outfile, errfile, [calcname + ".inp"])
+    e = runexec(
+        binaryname, outfile, errfile, [calcname + ".inp"], workdir, timeout, env
+    )
 
     return e
+
+
+def _strip_moread(content: str) -> str:
+    """
+    Remove MORead requests from an ORCA input.
+    """
+
+    lines = [
+        line
+        for line in content.splitlines(keepends=True)
+        if not line.strip().lower().startswith("%moinp")
+    ]
+    return re.sub(r"\bMORead\b", "", "".join(lines), flags=re.IGNORECASE)
+
+
+def _replace_keywords(content: str, keywords: tuple[str, ...], new: str) -> str:
+    """
+    Replace the simple input keywords of one kind (e.g. the SCF
+    convergence) in the '!' lines of an ORCA input.
+    """
+
+    lines = []
+    for line in content.splitlines(keepends=True):
+        if line.lstrip().startswith("!"):
+            line = " ".join(
+                new if token.lower() in keywords else token for token in line.split()
+            ) + ("\n" if line.endswith("\n") else "")
+        lines.append(line)
+    return "".join(lines)
+
+
+def recovery_inputs(content: str, step: str, calcname: str) -> list[str]:
+    """
+    ORCA inputs of one step of the recovery ladder.
+
+    Parameters
+    ----------
+    content : str
+        Original ORCA input.
+    step : str
+        'default' or one of RECOVERY_LADDER.
+    calcname : str
+        Base name of the calculation.
+
+    Returns
+    -------
+    inputs : list[str]
+        Inputs that are run one after another (the orbitals of the first
+        start the second one for 'loose-tight').
+    """
+
+    if step == "default":
+        return [content]
+    if step == "guess":
+        keywords = {
+            token.lower()
+            for line in content.splitlines()
+            if line.lstrip().startswith("!")
+            for token in line.split()
+        }
+        guess = "Hueckel" if "pmodel" in keywords else "PModel"
+        stripped = _replace_keywords(_strip_moread(content), GUESS_KEYWORDS, guess)
+        return [f"! {guess} NoAutoStart\n" + stripped]
+    if step == "damping":
+        return ["! SlowConv\n%scf\n MaxIter 500\nend\n" + content]
+    if step == "loose-tight":
+        loose = _replace_keywords(content, CONV_KEYWORDS, "LooseSCF")
+        return [
+            "! LooseSCF SlowConv\n%scf\n MaxIter 500\nend\n" + loose,
+            f'! MORead\n%moinp "{calcname}_loose.gbw"\n' + _strip_moread(content),
+        ]
+    raise ValueError(f"Unknown recovery step '{step}'.")
+
+
+def sp_orca_recover(
+    binaryname: str,
+    calcname: str,
+    workdir: str | None = None,
+    timeout: float | None = None,
+    env: Mapping[str, str] | None = None,
+) -> str:
+    """
+    Run an ORCA single point and, if ORCA fails or the SCF does not
+    converge, retry it with the steps of the recovery ladder.
+
+    The original input is restored afterwards. Timeouts are not retried
+    here but passed on to the caller.
+
+    Parameters
+    ----------
+    binaryname : str
+        Name of the ORCA binary.
+    calcname : str
+        Base name of the calculation.
+    workdir : str | None
+        Directory of the calculation (default: current directory).
+    timeout : float | None
+        Wall-time limit of each ORCA run in seconds.
+    env : Mapping[str, str] | None
+        Environment of ORCA (default: that of this process).
+
+    Returns
+    -------
+    step : str
+        'default' or the recovery step that converged.
+    """
+
+    directory = workdir if workdir is not None else "."
+    inpfile = os.path.join(directory, calcname + ".inp")
+    outfile = os.path.join(directory, calcname + ".out")
+    with open(inpfile, encoding="UTF-8") as file:
+        original = file.read()
+
+    errors: list[str] = []
+    modified = False
+    try:
+        for step in ("default",) + RECOVERY_LADDER:
+            inputs = recovery_inputs(original, step, calcname)
+            try:
+                for stage, content in enumerate(inputs):
+                    if content != original:
+                        with open(inpfile, "w", encoding="UTF-8") as file:
+                            file.write(content)
+                        modified = True
+                    sp_orca(binaryname, calcname, workdir, timeout, env)
+                    if stage < len(inputs) - 1:
+                        if not get_orca_convergence(outfile):
+                            break
+                        shutil.copy2(
+                            os.path.join(directory, calcname + ".gbw"),
+                            os.path.join(directory, calcname + "_loose.gbw"),
+                        )
+            except ExternalProgramError as exc:
+                errors.append(f"{step}: {exc}")
+                continue
+            if get_orca_convergence(outfile):
+                if step != "default":
+                    print(f"SCF of '{calcname}' converged with recovery step '{step}'.")
+                return step
+            errors.append(f"{step}: SCF not converged")
+    finally:
+        if modified:
+            with open(inpfile, "w", encoding="UTF-8") as file:
+                file.write(original)
+
+    raise SCFConvergenceError(
+        f"Single point '{calcname}' failed on all recovery steps ("
+        + "; ".join(errors)
+        + ")."
+    )
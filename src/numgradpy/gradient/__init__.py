@@ -2,8 +2,23 @@
 Gradient procedures.
 """
 
+from .finitefield import FieldStencil, central_stencil
 from .gradients import (  # , electronic_gradient
+    PreparedDisplacements,
+    dipole_derivatives,
     dipole_gradient_numdiff,
+    directional_gradient,
+    displacement_gradient,
     efield_gradient,
+    field_derivatives,
+    field_point_prefixes,
+    field_stencil,
+    field_tensor,
+    gradient_components,
     nuclear_gradient,
+    polarizability_derivatives,
+    prepare_displacements,
+    seminumerical_hessian,
+    subspace_gradient,
 )
+from .vibrations import harmonic_analysis, ir_intensities, raman_activities
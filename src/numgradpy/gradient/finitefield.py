@@ -0,0 +1,150 @@
+"""
+Module with the finite-field stencils for derivatives of any order with
+respect to the external electric field.
+
+A derivative component is given by the field directions it is taken
+along, e.g. (0, 0, 2) for d^3/dF_x dF_x dF_z. Its stencil is the product
+of central-difference stencils along the involved directions, and the
+stencils of all requested components share one set of unique field
+points, so that every field vector is calculated only once.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from itertools import combinations_with_replacement, permutations
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+Offset = Tuple[int, int, int]
+
+
+def central_stencil(order: int) -> dict[int, float]:
+    """
+    Central-difference stencil of second-order accuracy for the derivative
+    of a given order along one direction.
+
+    Returns
+    -------
+    stencil : dict[int, float]
+        Weights per offset (in units of the step); the weighted sum has to
+        be divided by step**order.
+    """
+
+    if order < 0:
+        raise ValueError("The derivative order must not be negative.")
+    half = (order + 1) // 2
+    offsets = np.arange(-half, half + 1)
+    # Taylor conditions sum_o w_o o^q / q! = delta_(q, order)
+    taylor = np.array(
+        [
+            offsets.astype(np.float64) ** q / math.factorial(q)
+            for q in range(len(offsets))
+        ]
+    )
+    rhs = np.zeros((len(offsets)), dtype=np.float64)
+    rhs[order] = 1.0
+    weights = np.linalg.solve(taylor, rhs)
+    return {int(o): float(w) for o, w in zip(offsets, weights) if abs(w) > 1e-12}
+
+
+class FieldStencil:
+    """
+    Stencil matrix for a set of field derivative components.
+    """
+
+    def __init__(
+        self, order: int, components: Sequence[tuple[int, ...]] | None = None
+    ) -> None:
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        order : int
+            Derivative order.
+        components : Sequence[tuple[int, ...]] | None
+            Field directions of each component (default: all components that
+            are unique by the symmetry of the derivative).
+        """
+
+        self.order = order
+        if components is None:
+            components = list(combinations_with_replacement(range(3), order))
+        self.components = [tuple(sorted(c)) for c in components]
+        if any(len(c) != order for c in self.components):
+            raise ValueError(f"All components must have {order} field directions.")
+
+        stencils: list[dict[Offset, float]] = []
+        for component in self.components:
+            stencil: dict[Offset, float] = {(0, 0, 0): 1.0}
+            for j in range(3):
+                product: dict[Offset, float] = {}
+                for offset, w in stencil.items():
+                    for d, dw in central_stencil(component.count(j)).items():
+                        shifted = list(offset)
+                        shifted[j] += d
+                        product[(shifted[0], shifted[1], shifted[2])] = w * dw
+                stencil = product
+            stencils.append(stencil)
+
+        self.points: list[Offset] = sorted(
+            {offset for stencil in stencils for offset in stencil}
+        )
+        index = {offset: n for n, offset in enumerate(self.points)}
+        self.matrix = np.zeros((len(stencils), len(self.points)), dtype=np.float64)
+        for m, stencil in enumerate(stencils):
+            for offset, w in stencil.items():
+                self.matrix[m, index[offset]] = w
+
+    def fields(
+        self, step: float, base: npt.NDArray[np.float64] | None = None
+    ) -> npt.NDArray[np.float64]:
+        """
+        Field vectors of all points of shape (npoints, 3).
+        """
+
+        fields = step * np.array(self.points, dtype=np.float64).reshape(-1, 3)
+        return fields if base is None else fields + base
+
+    def derivatives(
+        self, values: npt.NDArray[np.float64], step: float
+    ) -> npt.NDArray[np.float64]:
+        """
+        Derivative components from the values at all points.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Values of shape (npoints, ...) in the order of 'points'.
+        step : float
+            Field step in atomic units.
+
+        Returns
+        -------
+        derivatives : np.ndarray
+            Derivatives of shape (ncomponents, ...).
+        """
+
+        return np.tensordot(self.matrix, values, axes=1) / step**self.order
+
+    def tensor(
+        self, values: npt.NDArray[np.float64], step: float
+    ) -> npt.NDArray[np.float64]:
+        """
+        Full symmetric derivative tensor of shape (3,) * order + (...) from
+        the values at all points (requires all unique components).
+        """
+
+        unique = set(combinations_with_replacement(range(3), self.order))
+        if not unique.issubset(self.components):
+            raise ValueError("The full tensor requires all unique components.")
+        derivatives = self.derivatives(values, step)
+        tensor = np.zeros((3,) * self.order + values.shape[1:], dtype=np.float64)
+        for component, derivative in zip(self.components, derivatives):
+            for perm in set(permutations(component)):
+                tensor[perm] = derivative
+        return tensor
@@ -4,16 +4,580 @@ Module in which the gradient functions are defined.
 
 from __future__ import annotations
 
-import copy
+import hashlib
+import os
+import queue
 import shutil
-from multiprocessing import Pool
+import time
+from collections import deque
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from types import TracebackType
 
 import numpy as np
 import numpy.typing as npt
 
-from ..extprocs.singlepoint import sp_orca as spo
+from ..extprocs.helpfcts import silentremove
+from ..extprocs.jobs import orca_job, orca_timeout, program_environment
+from ..extprocs.retention import apply_retention, retention_settings
+from ..extprocs.scheduler import JobScheduler
+from ..extprocs.singlepoint import add_orca_keywords
 from ..extprocs.singlepoint import sp_qvszp as spq
-from ..io import Structure, get_orca_dipolemoment, get_orca_energy
+from ..extprocs.singlepoint import structure_arglist, write_orca_efield_input
+from ..io import (
+    ResultsStore,
+    Structure,
+    get_orca_dipolemoment,
+    get_orca_energy,
+    get_orca_engrad,
+)
+from .finitefield import FieldStencil
+
+
+def optional_dipolemoment(propfile: str) -> npt.NDArray[np.float64] | None:
+    """
+    Dipole moment from an ORCA property file or None if it is not available.
+    """
+
+    try:
+        return get_orca_dipolemoment(propfile)
+    except (OSError, RuntimeError, IndexError, ValueError):
+        return None
+
+
+def read_singlepoint(prefix: str) -> tuple[float, npt.NDArray[np.float64] | None]:
+    """
+    Energy and (if available) dipole moment of a finished single point.
+    """
+
+    return get_orca_energy(prefix + ".out"), optional_dipolemoment(
+        prefix + "_property.txt"
+    )
+
+
+def run_orca_jobs(
+    prefixes: list[str],
+    collect: Callable[[int, str], None] | None = None,
+    scheduler: JobScheduler | None = None,
+    env: Mapping[str, str] | None = None,
+    release: Callable[[float | None], list[int]] | None = None,
+    binaryname: str | None = None,
+) -> None:
+    """
+    Run prepared ORCA single points (input and guess in the working
+    directory) on a worker pool.
+
+    The wall-time limit, the retries and the speculative copies of
+    stragglers are configured in the 'orca' section of the run
+    configuration. 'collect' is called with the index and the prefix of
+    each calculation in the order in which the calculations finish.
+    Failed calculations (after the recovery ladder and the retries) do not
+    stop the others; they are reported together at the end. The retention
+    policy of the configuration is applied to each calculation right after
+    'collect', which therefore has to read all results it needs. The
+    environment of ORCA ('env') is handed to the workers with each job
+    (default: that of this process with the configured 'orca.path').
+    The logs '<binaryname>_<prefix>.out/.err' of the binary that wrote
+    the inputs are retained like the ORCA outputs.
+
+    Each collected calculation is recorded in '.<prefix>.done' with the
+    digest of its input. A rerun (e.g. after failed calculations) collects
+    such calculations from their files instead of running them again, as
+    long as the input is the same. Therefore, files are only removed
+    ('keep-results-only') once all calculations have succeeded; until then
+    they are kept compressed.
+
+    If 'release' is given, the calculations start as their inputs become
+    ready: it is called with the longest wait in seconds (None: until at
+    least one is ready) and returns the indices of the calculations whose
+    inputs have been completed since the last call.
+    """
+
+    timeout = orca_timeout()
+    if env is None:
+        env = program_environment()
+    policy, compression = retention_settings()
+    interim = "keep-outputs-compressed" if policy == "keep-results-only" else policy
+    failed: list[str] = []
+    error: BaseException | None = None
+    # the workers of a shared pool may run in another directory
+    workdir = os.getcwd()
+
+    digests = [""] * len(prefixes)
+    todo: deque[int] = deque()
+
+    def take(indices: Sequence[int]) -> None:
+        for k in indices:
+            digests[k] = input_digest(os.path.join(workdir, prefixes[k] + ".inp"))
+            if not finished_before(prefixes[k], digests[k], workdir, collect, k):
+                todo.append(k)
+
+    nreleased = len(prefixes) if release is None else 0
+    take(range(nreleased))
+
+    with ExitStack() as stack:
+        sched = scheduler
+        while True:
+            if nreleased < len(prefixes):
+                assert release is not None
+                # wait for inputs only if there is nothing else to wait for
+                idle = not todo and (sched is None or sched.pending == 0)
+                released = release(None if idle else 0.0)
+                if idle and not released:
+                    raise RuntimeError(
+                        f"The inputs of {len(prefixes) - nreleased} single point \
+calculations were not prepared."
+                    )
+                nreleased += len(released)
+                take(released)
+            if sched is None:
+                if not todo:
+                    if nreleased < len(prefixes):
+                        continue
+                    break
+                sched = stack.enter_context(
+                    JobScheduler.from_config(6, maxpending=len(prefixes))
+                )
+            while todo and not sched.full:
+                k = todo.popleft()
+                sched.submit(
+                    k,
+                    orca_job,
+                    ("orca", prefixes[k], workdir, timeout, env),
+                    speculative=True,
+                )
+            if sched.pending == 0:
+                if nreleased < len(prefixes):
+                    continue
+                break
+            try:
+                # look for new inputs now and then while they are prepared
+                key, success, result = sched.next_done(
+                    0.05 if nreleased < len(prefixes) else None
+                )
+            except TimeoutError:
+                continue
+            k = int(key)  # type: ignore[call-overload]
+            if not success or not result:
+                # the other calculations are finished and kept
+                failed.append(prefixes[k])
+                error = result if isinstance(result, BaseException) else None
+                continue
+            if collect is not None:
+                collect(k, prefixes[k])
+            with open(
+                os.path.join(workdir, f".{prefixes[k]}.done"), "w", encoding="UTF-8"
+            ) as f:
+                f.write(digests[k])
+            # the results have been read, so the files can be cleaned up
+            apply_retention(prefixes[k], interim, workdir, compression, binaryname)
+
+    if not failed and policy != interim:
+        for prefix in prefixes:
+            apply_retention(prefix, policy, workdir, compression, binaryname)
+            silentremove(os.path.join(workdir, f".{prefix}.done"))
+
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(prefixes)} single point calculations failed \
+({', '.join(sorted(failed))}). Check the output files."
+        ) from error
+
+
+def input_digest(inpfile: str) -> str:
+    """
+    SHA-256 digest of an input file ('' if it does not exist).
+    """
+
+    if not os.path.exists(inpfile):
+        return ""
+    with open(inpfile, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def finished_before(
+    prefix: str,
+    digest: str,
+    workdir: str,
+    collect: Callable[[int, str], None] | None = None,
+    k: int = 0,
+) -> bool:
+    """
+    Collect a calculation that has been finished by an earlier run with the
+    same input (digest recorded in '.<prefix>.done'); False if it has to be
+    run (again), e.g. because its result files are missing or unreadable.
+    """
+
+    donefile = os.path.join(workdir, f".{prefix}.done")
+    if not digest or not os.path.exists(donefile):
+        return False
+    with open(donefile, encoding="UTF-8") as f:
+        if f.read() != digest:
+            return False
+    if collect is not None:
+        try:
+            collect(k, prefix)
+        except (OSError, RuntimeError, IndexError, ValueError):
+            return False
+    return True
+
+
+def field_prefixes(prefix: str) -> list[str]:
+    """
+    File prefixes '<prefix>_efield_<1..3>_<1..2>' of the six field points
+    of a displaced geometry.
+    """
+
+    return [f"{prefix}_efield_{j + 1}_{i + 1}" for j in range(3) for i in range(2)]
+
+
+def polarizability_collector(
+    struc: Structure,
+    fdiff: float,
+    polarizabilities: npt.NDArray[np.float64] | None,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+) -> Callable[[int, int, str], None] | None:
+    """
+    Collector of the field points of the nuclear displacements (see
+    'nuclear_displacements') that accumulates the polarizability of each
+    displaced geometry from central differences of the dipole moments.
+
+    'polarizabilities' (shape (6N, 3, 3), row j holding dmu/dF_j) is reset
+    to zero; None is returned if it is None, so that no field points are
+    calculated.
+    """
+
+    if polarizabilities is None:
+        return None
+    polarizabilities[:] = 0.0
+
+    def collect(k: int, m: int, prefix: str) -> None:
+        energy, dipole = read_singlepoint(prefix)
+        if dipole is None:
+            raise RuntimeError(f"Dipole moment not found for '{prefix}'.")
+        sign = 1.0 if m % 2 == 0 else -1.0
+        polarizabilities[k, m // 2] += sign * dipole / (2 * fdiff)
+        if store is not None:
+            efield = np.zeros((3), dtype=np.float64)
+            if struc.efield is not None:
+                efield += struc.efield
+            efield[m // 2] += sign * fdiff
+            store.add_singlepoint(
+                structure,
+                "nucfield",
+                energy,
+                atom=k // 6,
+                coordinate=(k % 6) // 2,
+                step=fdiff if k % 2 == 0 else -fdiff,
+                efield=efield,
+                dipole=dipole,
+            )
+
+    return collect
+
+
+def displacement_prefixes(nat: int) -> list[str]:
+    """
+    File prefixes 'numdiff_<atom>_<1..6>' of all 6N nuclear displacements,
+    where 2 * j + 1 is the positive and 2 * j + 2 the negative step along j.
+    """
+
+    return [
+        "numdiff_" + str(i + 1) + "_" + str(k + 1) for i in range(nat) for k in range(6)
+    ]
+
+
+def prepare_displacements(
+    struc: Structure,
+    fdiff: float,
+    binaryname: str,
+    verbose: bool,
+    keywords: str | None = None,
+    fields: bool = False,
+    subset: Sequence[int] | None = None,
+    ready: Callable[[int], None] | None = None,
+    env: Mapping[str, str] | None = None,
+) -> list[str]:
+    """
+    Write the displaced geometries and their ORCA inputs (q-vSZP).
+
+    Nothing of this depends on the start orbitals, so it can run (e.g. in
+    a thread, see 'PreparedDisplacements') while the calculation that
+    provides them is still running. The arguments are those of
+    'nuclear_displacements' ('fields' for a given 'fieldcollect'); 'ready'
+    is called with k as soon as all inputs of displacement k are written.
+    The binary runs in 'env' (default: the environment of this process with
+    the configured 'orca.path'), which a background thread has to be given
+    explicitly.
+
+    Returns
+    -------
+    prefixes : list[str]
+        File prefixes of all displacements.
+    """
+
+    if env is None:
+        env = program_environment()
+    prefixes = displacement_prefixes(struc.nat)
+    selected = list(range(len(prefixes))) if subset is None else sorted(set(subset))
+    if subset is None:
+        # generate all displaced geometries block-wise and write them in bulk
+        for first, block in struc.iter_displaced_coordinates(fdiff):
+            struc.write_xyz_batch(
+                [
+                    prefix + ".xyz"
+                    for prefix in prefixes[6 * first : 6 * first + len(block)]
+                ],
+                block,
+                verbose=verbose,
+            )
+    elif selected:
+        struc.write_xyz_batch(
+            [prefixes[k] + ".xyz" for k in selected],
+            np.array(
+                [
+                    struc.displaced_coordinates(fdiff, k // 6, k // 6 + 1)[k % 6]
+                    for k in selected
+                ]
+            ),
+            verbose=verbose,
+        )
+
+    for k in selected:
+        prefix = prefixes[k]
+        es = spq(
+            binaryname,
+            ["--struc", prefix + ".xyz", "--outname", prefix]
+            + structure_arglist(struc),
+            prefix,
+            verbose=verbose,
+            env=env,
+        )
+        if not es:
+            raise RuntimeError("Single point calculation failed.")
+        if fields:
+            for m, fieldprefix in enumerate(field_prefixes(prefix)):
+                efield = np.zeros((3), dtype=np.float64)
+                if struc.efield is not None:
+                    efield += struc.efield
+                efield[m // 2] += fdiff if m % 2 == 0 else -fdiff
+                write_orca_efield_input(prefix + ".inp", fieldprefix + ".inp", efield)
+        if keywords is not None:
+            add_orca_keywords(prefix + ".inp", keywords)
+        if ready is not None:
+            ready(k)
+
+    return prefixes
+
+
+class PreparedDisplacements:
+    """
+    Inputs of the nuclear displacements ('prepare_displacements') that are
+    written in a background thread, e.g. while the start orbitals are
+    calculated. The displacements whose inputs are complete are taken with
+    'ready', so that their single points start before all inputs exist.
+    Leaving the context stops the preparation early and waits for it.
+    """
+
+    def __init__(
+        self,
+        struc: Structure,
+        fdiff: float,
+        binaryname: str,
+        verbose: bool,
+        keywords: str | None = None,
+        fields: bool = False,
+        subset: Sequence[int] | None = None,
+        env: Mapping[str, str] | None = None,
+    ) -> None:
+        self._queue: queue.Queue[int] = queue.Queue()
+        self._stop = False
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.future = executor.submit(
+            prepare_displacements,
+            struc,
+            fdiff,
+            binaryname,
+            verbose,
+            keywords,
+            fields,
+            subset,
+            self._emit,
+            env,
+        )
+        # the thread ends with the preparation
+        executor.shutdown(wait=False)
+
+    def __enter__(self) -> PreparedDisplacements:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._stop = True
+        wait([self.future])
+
+    def _emit(self, k: int) -> None:
+        if self._stop:
+            raise RuntimeError("Preparation of the displacements stopped.")
+        self._queue.put(k)
+
+    def result(self) -> list[str]:
+        """
+        Wait for all inputs and return the prefixes of all displacements.
+        """
+
+        return self.future.result()
+
+    def ready(self, timeout: float | None = None) -> list[int]:
+        """
+        Displacements whose inputs have been completed since the last call.
+
+        Waits up to 'timeout' seconds (None: without limit) for the first
+        one; an empty list is returned once all have been taken. Errors of
+        the preparation are raised.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken: list[int] = []
+        while True:
+            # all inputs are queued before the preparation is done
+            done = self.future.done()
+            try:
+                while True:
+                    taken.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if taken:
+                return taken
+            if done:
+                self.future.result()
+                return taken
+            remaining = 0.05 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0.0:
+                return taken
+            try:
+                taken.append(self._queue.get(timeout=min(remaining, 0.05)))
+            except queue.Empty:
+                pass
+
+
+def nuclear_displacements(
+    struc: Structure,
+    fdiff: float,
+    startgbw: str,
+    binaryname: str,
+    verbose: bool,
+    collect: Callable[[int, str], None],
+    keywords: str | None = None,
+    scheduler: JobScheduler | None = None,
+    fieldcollect: Callable[[int, int, str], None] | None = None,
+    subset: Sequence[int] | None = None,
+    prepared: PreparedDisplacements | None = None,
+    env: Mapping[str, str] | None = None,
+) -> list[str]:
+    """
+    Run the single points of all 6N nuclear displacements of a structure.
+
+    Displacement k moves atom k // 6 along the Cartesian direction
+    (k % 6) // 2 by +fdiff (even k) or -fdiff (odd k). 'collect' is called
+    with k and the file prefix as soon as the ORCA run of k has finished.
+
+    Parameters
+    ----------
+    keywords : str | None
+        Additional ORCA simple input keywords (e.g. 'EnGrad').
+    scheduler : JobScheduler | None
+        Worker pool that is kept alive by the caller (e.g. across the cycles
+        of an optimisation); a temporary pool is started if None.
+    fieldcollect : Callable[[int, int, str], None] | None
+        If given, each displaced geometry is also calculated in the six
+        fields +-fdiff along x, y and z (field point m = 2 * j + i with
+        i = 0 for the positive field along j) in the same batch, reusing
+        the q-vSZP input of the geometry. 'fieldcollect' is called with k,
+        m and the file prefix of each finished field point.
+    subset : Sequence[int] | None
+        Indices k of the displacements that are calculated (default: all).
+    prepared : PreparedDisplacements | None
+        Preparation of the inputs with the same arguments, started while
+        the start orbitals were calculated; the single point of each
+        displacement starts as soon as its inputs are written. The inputs
+        are prepared here if None.
+    env : Mapping[str, str] | None
+        Environment of the binary and of ORCA (default: that of this
+        process with the configured 'orca.path').
+
+    Returns
+    -------
+    prefixes : list[str]
+        File prefixes 'numdiff_<atom>_<1..6>' of all displacements.
+    """
+
+    if prepared is None:
+        prefixes = prepare_displacements(
+            struc,
+            fdiff,
+            binaryname,
+            verbose,
+            keywords,
+            fieldcollect is not None,
+            subset,
+            env=env,
+        )
+    else:
+        prefixes = displacement_prefixes(struc.nat)
+
+    # the zero-field point and the field points of a geometry form one
+    # batch, so that the worker pool is never drained in between
+    selected = list(range(len(prefixes))) if subset is None else sorted(set(subset))
+    fieldpoints = range(6) if fieldcollect is not None else range(0)
+    jobs = [(k, m) for k in selected for m in [-1, *fieldpoints]]
+    jobprefixes = [
+        prefixes[k] if m < 0 else field_prefixes(prefixes[k])[m] for k, m in jobs
+    ]
+    jobindices: dict[int, list[int]] = {k: [] for k in selected}
+    for n, (k, _) in enumerate(jobs):
+        jobindices[k].append(n)
+
+    def start(indices: list[int]) -> list[int]:
+        # the start orbitals are available: copy them for the jobs
+        for n in indices:
+            shutil.copy2(startgbw + ".gbw", jobprefixes[n] + ".gbw")
+        return indices
+
+    def release(timeout: float | None) -> list[int]:
+        assert prepared is not None
+        return start(
+            [n for k in prepared.ready(timeout) for n in jobindices.get(k, [])]
+        )
+
+    def dispatch(n: int, prefix: str) -> None:
+        k, m = jobs[n]
+        if m < 0:
+            collect(k, prefix)
+        else:
+            assert fieldcollect is not None
+            fieldcollect(k, m, prefix)
+
+    if prepared is None:
+        start(list(range(len(jobs))))
+        run_orca_jobs(jobprefixes, dispatch, scheduler, env, binaryname=binaryname)
+    else:
+        run_orca_jobs(
+            jobprefixes,
+            dispatch,
+            scheduler,
+            env,
+            release=release,
+            binaryname=binaryname,
+        )
+
+    return prefixes
 
 
 def nuclear_gradient(
@@ -22,92 +586,91 @@ def nuclear_gradient(
     startgbw: str,
     binaryname: str,
     verbose: bool,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+    scheduler: JobScheduler | None = None,
+    dipoles: npt.NDArray[np.float64] | None = None,
+    polarizabilities: npt.NDArray[np.float64] | None = None,
+    prepared: PreparedDisplacements | None = None,
+    energies: npt.NDArray[np.float64] | None = None,
+    env: Mapping[str, str] | None = None,
 ) -> npt.NDArray[np.float64]:
-    # set up a numpy tensor for the gradient
-    gradient = np.zeros((struc.nat, 3), dtype=np.float64)
-    # numerical gradient calculation
-    smspoinput: list[tuple[str, str]] = []
-    # smspqinput: list[tuple[str, list[str], str]] = []
-    counter = 0
-    for i in range(struc.nat):
-        # smspqinput = []
-        smspoinput = []
-        prefix = "numdiff_" + str(i + 1) + "_"
-        for j in range(3):
-            # create structure object for positive perturbation
-            struc_mod = copy.deepcopy(struc)
-            struc_mod.modify_structure(i, j, fdiff, verbose=verbose)
-            if verbose:
-                struc_mod.print_xyz()
-            counter = 2 * (j + 1) - 1
-            tmpstrucfile = prefix + str(counter) + ".xyz"
-            struc_mod.write_xyz(tmpstrucfile, verbose=verbose)
-            es = spq(
-                binaryname,
-                ["--struc", tmpstrucfile, "--outname", prefix + str(counter)],
-                str(counter),
-                verbose=verbose,
-            )
-            if not es:
-                raise RuntimeError("Single point calculation failed.")
-            # create structure object for negative perturbation
-            struc_mod.modify_structure(i, j, -2 * fdiff, verbose=verbose)
-            if verbose:
-                struc_mod.print_xyz()
-            counter = 2 * (j + 1)
-            tmpstrucfile = prefix + str(counter) + ".xyz"
-            struc_mod.write_xyz(tmpstrucfile, verbose=verbose)
-            es = spq(
-                binaryname,
-                ["--struc", tmpstrucfile, "--outname", prefix + str(counter)],
-                str(counter),
-                verbose=verbose,
+    """
+    Nuclear gradient from central differences of the energies at the 6N
+    nuclear displacements.
+
+    If 'dipoles' (shape (6N, 3)) is given, it is filled with the dipole
+    moments of the displacements (NaN where none was found), from which
+    'dipole_derivatives' obtains dmu/dR without further single points.
+    If 'polarizabilities' (shape (6N, 3, 3)) is given, the six field points
+    of each displacement are added to the same batch and it is filled with
+    the polarizabilities of the displaced geometries, from which
+    'polarizability_derivatives' obtains dalpha/dR. 'prepared' is the background
+    preparation of the inputs (see 'nuclear_displacements'). If 'energies'
+    (shape (6N)) is given, only the displacements with NaN entries are
+    calculated (e.g. those not already run by 'gradient_components'), and
+    it is filled with their energies. 'env' is the environment of the
+    external programs (see 'nuclear_displacements').
+
+    Returns
+    -------
+    gradient : np.ndarray
+        Gradient of shape (N, 3) in Hartree/Bohr.
+    """
+
+    subset = None
+    if energies is None:
+        energies = np.zeros((6 * struc.nat), dtype=np.float64)
+    else:
+        subset = [int(k) for k in np.flatnonzero(np.isnan(energies))]
+
+    def collect(k: int, prefix: str) -> None:
+        energies[k], dipole = read_singlepoint(prefix)
+        if dipoles is not None:
+            dipoles[k] = np.nan if dipole is None else dipole
+        if store is not None:
+            store.add_singlepoint(
+                structure,
+                "nuclear",
+                energies[k],
+                atom=k // 6,
+                coordinate=(k % 6) // 2,
+                step=fdiff if k % 2 == 0 else -fdiff,
+                efield=struc.efield,
+                dipole=dipole,
             )
-            if not es:
-                raise RuntimeError("Single point calculation failed.")
-
-        if counter != 6:
-            raise RuntimeError("Something went wrong with the gradient calculation.")
-
-        # prepare arguments for single point calculations
-        for k in range(6):
-            prefix = "numdiff_" + str(i + 1) + "_" + str(k + 1)
-            # smspqinput.append(
-            #     (
-            #         "qvSZP",
-            #         ["--struc", prefix + ".xyz", "--outname", prefix],
-            #         str(k + 1),
-            #     )
-            # )
-            smspoinput.append(("orca", prefix))
-            # copy the existing GBW file to the new GBW file
-            shutil.copy2(startgbw + ".gbw", prefix + ".gbw")
-
-        # run single point calculations of qvSZP
-        # with Pool(6) as p:
-        #     e = p.starmap(spq, smspqinput)
-        #     if not all(e):
-        #         raise RuntimeError(
-        #             "Single point calculation failed. Check the output files."
-        #         )
-
-        # run single point calculations of ORCA
-        with Pool(6) as p:
-            el = p.starmap(spo, smspoinput)
-            if not all(el):
-                raise RuntimeError(
-                    "Single point calculation failed. Check the output files."
-                )
 
+    nuclear_displacements(
+        struc,
+        fdiff,
+        startgbw,
+        binaryname,
+        verbose,
+        collect,
+        scheduler=scheduler,
+        fieldcollect=polarizability_collector(
+            struc, fdiff, polarizabilities, store, structure
+        ),
+        subset=subset,
+        prepared=prepared,
+        env=env,
+    )
+
+    return displacement_gradient(energies, struc.nat, fdiff)
+
+
+def displacement_gradient(
+    energies: npt.NDArray[np.float64], nat: int, fdiff: float
+) -> npt.NDArray[np.float64]:
+    """
+    Nuclear gradient from central differences of the energies (shape (6N))
+    at the 6N nuclear displacements.
+    """
+
+    pairs = energies.reshape(nat, 3, 2)
+    gradient = (pairs[:, :, 0] - pairs[:, :, 1]) / (2 * fdiff)
+    for i in range(nat):
         for j in range(3):
-            counter = 2 * (j + 1) - 1
-            fname = "numdiff_" + str(i + 1) + "_" + str(counter) + ".out"
-            eplus = get_orca_energy(fname)
-            counter = 2 * (j + 1)
-            fname = "numdiff_" + str(i + 1) + "_" + str(counter) + ".out"
-            eminus = get_orca_energy(fname)
-            # gradient = (eplus - eminus) / (2 * fdiff)
-            gradient[i, j] = (eplus - eminus) / (2 * fdiff)
             print(
                 f"Gradient for atom {i + 1} and coordinate {j + 1}: \
 {gradient[i, j]:14.8f}"
@@ -116,181 +679,551 @@ def nuclear_gradient(
     return gradient
 
 
+def gradient_components(
+    struc: Structure,
+    components: Sequence[int],
+    fdiff: float,
+    startgbw: str,
+    binaryname: str,
+    verbose: bool,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+    scheduler: JobScheduler | None = None,
+    energies: npt.NDArray[np.float64] | None = None,
+    dipoles: npt.NDArray[np.float64] | None = None,
+    env: Mapping[str, str] | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Selected Cartesian components of the nuclear gradient from central
+    differences (two of the 6N displacements per component), e.g. to
+    spot-check an analytical gradient.
+
+    Parameters
+    ----------
+    components : Sequence[int]
+        Cartesian indices 3 * i + j (atom i, direction j).
+    energies : npt.NDArray[np.float64] | None
+        Array of shape (6N) that receives the energies of the calculated
+        displacements, so that 'nuclear_gradient' can reuse them.
+    dipoles : npt.NDArray[np.float64] | None
+        Array of shape (6N, 3) that receives their dipole moments.
+    env : Mapping[str, str] | None
+        Environment of the external programs (see 'nuclear_displacements').
+
+    Returns
+    -------
+    values : np.ndarray
+        Gradient components in Hartree/Bohr in the order of 'components'.
+    """
+
+    if energies is None:
+        energies = np.zeros((6 * struc.nat), dtype=np.float64)
+
+    def collect(k: int, prefix: str) -> None:
+        assert energies is not None
+        energies[k], dipole = read_singlepoint(prefix)
+        if dipoles is not None:
+            dipoles[k] = np.nan if dipole is None else dipole
+        if store is not None:
+            store.add_singlepoint(
+                structure,
+                "nuclear",
+                energies[k],
+                atom=k // 6,
+                coordinate=(k % 6) // 2,
+                step=fdiff if k % 2 == 0 else -fdiff,
+                efield=struc.efield,
+                dipole=dipole,
+            )
+
+    nuclear_displacements(
+        struc,
+        fdiff,
+        startgbw,
+        binaryname,
+        verbose,
+        collect,
+        scheduler=scheduler,
+        subset=[k for c in components for k in (2 * c, 2 * c + 1)],
+        env=env,
+    )
+
+    return np.array(
+        [(energies[2 * c] - energies[2 * c + 1]) / (2 * fdiff) for c in components],
+        dtype=np.float64,
+    )
+
+
+def directional_gradient(
+    struc: Structure,
+    directions: npt.NDArray[np.float64],
+    fdiff: float,
+    startgbw: str,
+    binaryname: str,
+    verbose: bool,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+    scheduler: JobScheduler | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Derivatives of the energy along k displacement vectors from 2k single
+    points instead of the 6N of the full gradient.
+
+    Parameters
+    ----------
+    directions : np.ndarray
+        Displacement vectors of shape (k, 3N) (normalised here).
+
+    Returns
+    -------
+    derivatives : np.ndarray
+        Projections g . v_i of the gradient on the normalised vectors in
+        Hartree/Bohr, shape (k,).
+    """
+
+    units = normalised_directions(directions, struc.nat)
+    prefixes = [
+        "dirdiff_" + str(i + 1) + "_" + str(s + 1)
+        for i in range(len(units))
+        for s in range(2)
+    ]
+    coordinates = np.array(
+        [
+            struc.coordinates + sign * fdiff * unit.reshape(struc.nat, 3)
+            for unit in units
+            for sign in (1.0, -1.0)
+        ]
+    ).reshape(-1, struc.nat, 3)
+    struc.write_xyz_batch(
+        [prefix + ".xyz" for prefix in prefixes], coordinates, verbose
+    )
+
+    for k, prefix in enumerate(prefixes):
+        es = spq(
+            binaryname,
+            ["--struc", prefix + ".xyz", "--outname", prefix]
+            + structure_arglist(struc),
+            prefix,
+            verbose=verbose,
+        )
+        if not es:
+            raise RuntimeError("Single point calculation failed.")
+        # copy the existing GBW file to the new GBW file
+        shutil.copy2(startgbw + ".gbw", prefix + ".gbw")
+
+    energies = np.zeros((len(prefixes)), dtype=np.float64)
+
+    def collect(k: int, prefix: str) -> None:
+        energies[k], dipole = read_singlepoint(prefix)
+        if store is not None:
+            store.add_singlepoint(
+                structure,
+                "direct",
+                energies[k],
+                coordinate=k // 2,
+                step=fdiff if k % 2 == 0 else -fdiff,
+                efield=struc.efield,
+                dipole=dipole,
+            )
+
+    run_orca_jobs(prefixes, collect, scheduler, binaryname=binaryname)
+
+    pairs = energies.reshape(-1, 2)
+    return (pairs[:, 0] - pairs[:, 1]) / (2 * fdiff)
+
+
+def normalised_directions(
+    directions: npt.NDArray[np.float64], nat: int
+) -> npt.NDArray[np.float64]:
+    """
+    Displacement vectors of shape (k, 3N) scaled to unit length.
+    """
+
+    vectors = np.asarray(directions, dtype=np.float64).reshape(-1, 3 * nat)
+    norms = np.linalg.norm(vectors, axis=1)
+    if np.any(norms == 0.0):
+        raise ValueError("Displacement vectors must not be zero.")
+    return vectors / norms[:, np.newaxis]
+
+
+def subspace_gradient(
+    directions: npt.NDArray[np.float64],
+    derivatives: npt.NDArray[np.float64],
+    nat: int,
+) -> npt.NDArray[np.float64]:
+    """
+    Gradient reconstructed in the space spanned by the displacement
+    vectors from the derivatives along them (exact if the gradient lies in
+    that space; the vectors need not be orthogonal).
+
+    Returns
+    -------
+    gradient : np.ndarray
+        Gradient of shape (N, 3) in Hartree/Bohr.
+    """
+
+    units = normalised_directions(directions, nat)
+    return (np.linalg.pinv(units) @ derivatives).reshape(nat, 3)
+
+
+def seminumerical_hessian(
+    struc: Structure,
+    fdiff: float,
+    startgbw: str,
+    binaryname: str,
+    verbose: bool,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+    scheduler: JobScheduler | None = None,
+    dipoles: npt.NDArray[np.float64] | None = None,
+    polarizabilities: npt.NDArray[np.float64] | None = None,
+    prepared: PreparedDisplacements | None = None,
+    energies: npt.NDArray[np.float64] | None = None,
+    env: Mapping[str, str] | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Semi-numerical Hessian from central differences of analytical ORCA
+    gradients (EnGrad) at the 6N nuclear displacements.
+
+    'dipoles' and 'polarizabilities' are filled with the dipole moments and
+    polarizabilities of the displacements as in 'nuclear_gradient', and
+    'energies' (shape (6N)) with their energies, from which
+    'displacement_gradient' obtains the gradient. The inputs of a
+    background preparation 'prepared' need the keyword 'EnGrad'. 'env' is
+    the environment of the external programs (see 'nuclear_displacements').
+
+    Returns
+    -------
+    hessian : np.ndarray
+        Symmetrised Hessian of shape (3N, 3N) in Hartree/Bohr^2.
+    """
+
+    ncart = 3 * struc.nat
+    gradients = np.zeros((6 * struc.nat, ncart), dtype=np.float64)
+
+    def collect(k: int, prefix: str) -> None:
+        energy, gradient = get_orca_engrad(prefix + ".engrad")
+        gradients[k] = gradient.ravel()
+        if energies is not None:
+            energies[k] = energy
+        dipole = optional_dipolemoment(prefix + "_property.txt")
+        if dipoles is not None:
+            dipoles[k] = np.nan if dipole is None else dipole
+        if store is not None:
+            store.add_singlepoint(
+                structure,
+                "engrad",
+                energy,
+                atom=k // 6,
+                coordinate=(k % 6) // 2,
+                step=fdiff if k % 2 == 0 else -fdiff,
+                efield=struc.efield,
+                dipole=dipole,
+            )
+
+    nuclear_displacements(
+        struc,
+        fdiff,
+        startgbw,
+        binaryname,
+        verbose,
+        collect,
+        keywords="EnGrad",
+        scheduler=scheduler,
+        fieldcollect=polarizability_collector(
+            struc, fdiff, polarizabilities, store, structure
+        ),
+        prepared=prepared,
+        env=env,
+    )
+
+    # column 3 * i + j holds the derivative of the gradient along (i, j)
+    pairs = gradients.reshape(ncart, 2, ncart)
+    hessian = ((pairs[:, 0, :] - pairs[:, 1, :]) / (2 * fdiff)).T
+    if verbose:
+        asym = np.max(np.abs(hessian - hessian.T)) if ncart > 0 else 0.0
+        print(f"Maximum asymmetry of the semi-numerical Hessian: {asym:.3e}")
+
+    return 0.5 * (hessian + hessian.T)
+
+
+def dipole_derivatives(
+    dipoles: npt.NDArray[np.float64], fdiff: float
+) -> npt.NDArray[np.float64] | None:
+    """
+    Cartesian dipole derivatives from the dipole moments of the 6N nuclear
+    displacements (as filled by 'nuclear_gradient').
+
+    Parameters
+    ----------
+    dipoles : np.ndarray
+        Dipole moments of shape (6N, 3) in the order of the displacements.
+    fdiff : float
+        Displacement step in Bohr.
+
+    Returns
+    -------
+    dipgrad : np.ndarray | None
+        Derivatives dmu/dR of shape (3N, 3), row 3 * i + j holding the
+        derivative along coordinate j of atom i, or None if a dipole moment
+        is missing.
+    """
+
+    if np.isnan(dipoles).any():
+        return None
+    pairs = dipoles.reshape(-1, 2, 3)
+    return (pairs[:, 0, :] - pairs[:, 1, :]) / (2 * fdiff)
+
+
+def polarizability_derivatives(
+    polarizabilities: npt.NDArray[np.float64], fdiff: float
+) -> npt.NDArray[np.float64]:
+    """
+    Cartesian polarizability derivatives from the polarizabilities of the
+    6N nuclear displacements (as filled by 'nuclear_gradient').
+
+    Parameters
+    ----------
+    polarizabilities : np.ndarray
+        Polarizabilities of shape (6N, 3, 3) in the order of the
+        displacements.
+    fdiff : float
+        Displacement step in Bohr.
+
+    Returns
+    -------
+    dalpha : np.ndarray
+        Derivatives dalpha/dR of shape (3N, 3, 3), entry 3 * i + j holding
+        the derivative along coordinate j of atom i.
+    """
+
+    pairs = polarizabilities.reshape(-1, 2, 3, 3)
+    return (pairs[:, 0] - pairs[:, 1]) / (2 * fdiff)
+
+
 def efield_gradient(
     strucfile: str,
     fdiff: float,
     startgbw: str,
     verbose: bool,
-    extefield: npt.NDArray[np.float64] = np.zeros((3), dtype=np.float64),
+    extefield: npt.NDArray[np.float64] | None = None,
+    qvszpargs: list[str] | None = None,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+    scheduler: JobScheduler | None = None,
 ) -> npt.NDArray[np.float64]:
-    # set up a numpy tensor for the electric field gradient -> dipole moment
-    if verbose:
+    """
+    Dipole moment from first derivatives of the energy with respect to the
+    field (six field points) at 'extefield' (default: zero).
+    """
+
+    if verbose and extefield is not None:
         print("External electric field:")
         print(f"{extefield[0]:10.6f} {extefield[1]:10.6f} {extefield[2]:10.6f}")
-    dipole = np.zeros((3), dtype=np.float64)
-    smspoinput: list[tuple[str, str]] = []
-    for j in range(3):
-        for i in range(2):
-            efield = copy.deepcopy(extefield)
-            if i == 0:
-                efield[j] = efield[j] + fdiff
-            else:
-                efield[j] = efield[j] - fdiff
-            if verbose:
-                print("Effective electric field for dipole moment calculation:")
-                print(f"{efield[0]:10.6f} {efield[1]:10.6f} {efield[2]:10.6f}")
-            es = spq(
-                "qvSZP",
-                [
-                    "--struc",
-                    strucfile,
-                    "--outname",
-                    "efielddiff_" + str(j + 1) + "_" + str(i + 1),
-                    "--efield",
-                    str(efield[0]),
-                    str(efield[1]),
-                    str(efield[2]),
-                ],
-                str(2 * j + i + 1),
-                verbose=verbose,
-            )
-            if not es:
-                raise RuntimeError("Single point calculation failed.")
-            smspoinput.append(
-                (
-                    "orca",
-                    "efielddiff_" + str(j + 1) + "_" + str(i + 1),
-                )
-            )
-            # copy the existing GBW file to the new GBW file
-            shutil.copy2(
-                startgbw + ".gbw",
-                "efielddiff_" + str(j + 1) + "_" + str(i + 1) + ".gbw",
-            )
+    return field_derivatives(
+        strucfile,
+        fdiff,
+        startgbw,
+        verbose,
+        1,
+        source="energy",
+        extefield=extefield,
+        qvszpargs=qvszpargs,
+        store=store,
+        structure=structure,
+        scheduler=scheduler,
+    )
 
-    # run single point calculations of ORCA
-    with Pool(6) as p:
-        el = p.starmap(spo, smspoinput)
-        if not all(el):
-            raise RuntimeError(
-                "Single point calculation failed. Check the output files."
-            )
 
-    for j in range(3):
-        fname = "efielddiff_" + str(j + 1) + "_1.out"
-        eplus = get_orca_energy(fname)
-        fname = "efielddiff_" + str(j + 1) + "_2.out"
-        eminus = get_orca_energy(fname)
-        dipole[j] = -(eplus - eminus) / (
-            2 * fdiff
-        )  # minus sign because of the definition of the dipole moment
+def field_stencil(order: int, source: str) -> FieldStencil:
+    """
+    Stencil of the response tensor of a given order from the energies or
+    the dipole moments (see 'field_derivatives').
+    """
 
-    return dipole
+    if source not in ("dipole", "energy"):
+        raise ValueError(f"Unknown source '{source}' of the field derivatives.")
+    return FieldStencil(order - 1 if source == "dipole" else order)
 
 
-def dipole_gradient_numdiff(
+def field_point_prefixes(stencil: FieldStencil) -> list[str]:
+    """
+    File prefixes 'efield_<+i>_<+j>_<+k>' of the points of a field stencil.
+    """
+
+    return [
+        "efield_" + "_".join(f"{o:+d}" for o in offset) for offset in stencil.points
+    ]
+
+
+def field_tensor(
+    stencil: FieldStencil,
+    source: str,
+    values: npt.NDArray[np.float64],
+    fdiff: float,
+) -> npt.NDArray[np.float64]:
+    """
+    Response tensor from the energies (shape (npoints)) or the dipole
+    moments (shape (npoints, 3)) at the points of 'field_stencil'.
+    """
+
+    if source == "energy":
+        return -stencil.tensor(values, fdiff)
+    # derivative directions first, the dipole component is moved to the front
+    return np.moveaxis(stencil.tensor(values, fdiff), -1, 0)
+
+
+def field_derivatives(
     strucfile: str,
     fdiff: float,
     startgbw: str,
     verbose: bool,
+    order: int,
+    source: str = "dipole",
+    extefield: npt.NDArray[np.float64] | None = None,
+    qvszpargs: list[str] | None = None,
+    store: ResultsStore | None = None,
+    structure: int = 0,
+    scheduler: JobScheduler | None = None,
+    zeropoint: str | None = None,
 ) -> npt.NDArray[np.float64]:
-    dipmomdiff = 0.5 * fdiff
-    # set up a numpy tensor for the electric field gradient -> dipole moment
-    alpha = np.zeros((3, 3), dtype=np.float64)
-    for j in range(3):
-        extefield = np.zeros((3), dtype=np.float64)
-        extefield[j] = fdiff
-        dipplus = efield_gradient(strucfile, dipmomdiff, startgbw, verbose, extefield)
-        if verbose:
-            print(
-                f"Dipole moment for effective electric field \
-{fdiff} in direction {j + 1}:"
-            )
-            print(f"{dipplus[0]:10.6f} {dipplus[1]:10.6f} {dipplus[2]:10.6f}")
-        extefield[j] = -fdiff
-        dipminus = efield_gradient(strucfile, dipmomdiff, startgbw, verbose, extefield)
+    """
+    Electric response tensor of a given order from finite fields.
+
+    The unique field vectors of the stencils of all tensor components are
+    calculated in one batch. With the expansion
+    E(F) = E0 - mu F - 1/2 alpha F^2 - 1/6 beta F^3 - 1/24 gamma F^4,
+    order 1 gives mu, 2 alpha, 3 beta and 4 gamma, either as the negative
+    order-th derivative of the energy or as the (order - 1)-th derivative
+    of the dipole moment, which needs fewer and less sensitive points.
+
+    Parameters
+    ----------
+    order : int
+        Order of the response (1 to 4, or higher).
+    source : str
+        'dipole' or 'energy'.
+    extefield : np.ndarray | None
+        Field at which the derivatives are taken (default: zero).
+    zeropoint : str | None
+        Prefix of a finished single point at 'extefield' (e.g. the
+        equilibrium calculation) that is used instead of recalculating
+        the point without additional field.
+
+    Returns
+    -------
+    tensor : np.ndarray
+        Symmetric tensor of shape (3,) * order in atomic units.
+    """
+
+    stencil = field_stencil(order, source)
+    fields = stencil.fields(fdiff, extefield)
+    prefixes = field_point_prefixes(stencil)
+
+    results: dict[int, tuple[float, npt.NDArray[np.float64] | None]] = {}
+    for k, (offset, prefix) in enumerate(zip(stencil.points, prefixes)):
+        if zeropoint is not None and offset == (0, 0, 0):
+            results[k] = read_singlepoint(zeropoint)
+            continue
         if verbose:
-            print(
-                f"Dipole moment for effective electric field \
-{-fdiff} in direction {j + 1}:"
+            print(f"Electric field of point {prefix}:")
+            print(f"{fields[k, 0]:10.6f} {fields[k, 1]:10.6f} {fields[k, 2]:10.6f}")
+        es = spq(
+            "qvSZP",
+            ["--struc", strucfile, "--outname", prefix, "--efield"]
+            + [str(x) for x in fields[k]]
+            + (qvszpargs or []),
+            prefix,
+            verbose=verbose,
+        )
+        if not es:
+            raise RuntimeError("Single point calculation failed.")
+        # copy the existing GBW file to the new GBW file
+        shutil.copy2(startgbw + ".gbw", prefix + ".gbw")
+
+    todo = [k for k in range(len(prefixes)) if k not in results]
+
+    def collect(n: int, prefix: str) -> None:
+        k = todo[n]
+        results[k] = read_singlepoint(prefix)
+        if store is not None:
+            store.add_singlepoint(
+                structure,
+                "field",
+                results[k][0],
+                step=fdiff,
+                efield=fields[k],
+                dipole=results[k][1],
             )
-            print(f"{dipminus[0]:10.6f} {dipminus[1]:10.6f} {dipminus[2]:10.6f}")
-        alpha[j, :] = (dipplus - dipminus) / (2 * fdiff)
 
-    return alpha
+    run_orca_jobs([prefixes[k] for k in todo], collect, scheduler, binaryname="qvSZP")
 
+    if source == "energy":
+        energies = np.array([results[k][0] for k in range(len(prefixes))])
+        return field_tensor(stencil, source, energies, fdiff)
 
-def dipole_gradient_analytical(
+    dipoles = []
+    for k, prefix in enumerate(prefixes):
+        dipole = results[k][1]
+        if dipole is None:
+            raise RuntimeError(f"Dipole moment not found for '{prefix}'.")
+        dipoles.append(dipole)
+    return field_tensor(stencil, source, np.array(dipoles), fdiff)
+
+
+def dipole_gradient_numdiff(
     strucfile: str,
     fdiff: float,
     startgbw: str,
     verbose: bool,
+    qvszpargs: list[str] | None = None,
+    store: ResultsStore | None = None,
+    scheduler: JobScheduler | None = None,
+    extefield: npt.NDArray[np.float64] | None = None,
 ) -> npt.NDArray[np.float64]:
-    smspoinput: list[tuple[str, str]] = []
-    alpha = np.zeros((3, 3), dtype=np.float64)
-    for j in range(3):
-        for i in range(2):
-            efield = np.zeros((3), dtype=np.float64)
-            if i == 0:
-                efield[j] = efield[j] + fdiff
-            else:
-                efield[j] = efield[j] - fdiff
-            if verbose:
-                print("Effective electric field for polarizability calculation:")
-                print(f"{efield[0]:10.6f} {efield[1]:10.6f} {efield[2]:10.6f}")
-            es = spq(
-                "qvSZP",
-                [
-                    "--struc",
-                    strucfile,
-                    "--outname",
-                    "efielddiff_" + str(j + 1) + "_" + str(i + 1),
-                    "--efield",
-                    str(efield[0]),
-                    str(efield[1]),
-                    str(efield[2]),
-                ],
-                str(2 * j + i + 1),
-                verbose=verbose,
-            )
-            if not es:
-                raise RuntimeError("Single point calculation failed.")
-            smspoinput.append(
-                (
-                    "orca",
-                    "efielddiff_" + str(j + 1) + "_" + str(i + 1),
-                )
-            )
-            # copy the existing GBW file to the new GBW file
-            shutil.copy2(
-                startgbw + ".gbw",
-                "efielddiff_" + str(j + 1) + "_" + str(i + 1) + ".gbw",
-            )
-    with Pool(6) as p:
-        el = p.starmap(spo, smspoinput)
-        if not all(el):
-            raise RuntimeError(
-                "Single point calculation failed. Check the output files."
-            )
+    """
+    Polarizability from second derivatives of the energy with respect to
+    the field (19 unique field points) at 'extefield' (default: zero).
+    """
 
-    for j in range(3):
-        fname = "efielddiff_" + str(j + 1) + "_1_property.txt"
-        dipplus = get_orca_dipolemoment(fname)
-        if verbose:
-            print(
-                f"Dipole moment for effective electric field \
-{fdiff} in direction {j + 1}:"
-            )
-            print(f"{dipplus[0]:10.6f} {dipplus[1]:10.6f} {dipplus[2]:10.6f}")
-        fname = "efielddiff_" + str(j + 1) + "_2_property.txt"
-        dipminus = get_orca_dipolemoment(fname)
-        if verbose:
-            print(
-                f"Dipole moment for effective electric field \
-{-fdiff} in direction {j + 1}:"
-            )
-            print(f"{dipminus[0]:10.6f} {dipminus[1]:10.6f} {dipminus[2]:10.6f}")
+    return field_derivatives(
+        strucfile,
+        fdiff,
+        startgbw,
+        verbose,
+        2,
+        source="energy",
+        extefield=extefield,
+        qvszpargs=qvszpargs,
+        store=store,
+        scheduler=scheduler,
+    )
 
-        alpha[j, :] = (dipplus - dipminus) / (2 * fdiff)
 
-    return alpha
+def dipole_gradient_analytical(
+    strucfile: str,
+    fdiff: float,
+    startgbw: str,
+    verbose: bool,
+    qvszpargs: list[str] | None = None,
+    store: ResultsStore | None = None,
+    scheduler: JobScheduler | None = None,
+    extefield: npt.NDArray[np.float64] | None = None,
+) -> npt.NDArray[np.float64]:
+    """
+    Polarizability from first derivatives of the dipole moment with respect
+    to the field (six field points) at 'extefield' (default: zero).
+    """
+
+    return field_derivatives(
+        strucfile,
+        fdiff,
+        startgbw,
+        verbose,
+        2,
+        source="dipole",
+        extefield=extefield,
+        qvszpargs=qvszpargs,
+        store=store,
+        scheduler=scheduler,
+    )
@@ -0,0 +1,391 @@
+"""
+Single points of whole structures (equilibrium point, nuclear and field
+displacements) on one worker pool, shared by the batch mode and the
+library interface.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any, Tuple, cast
+
+import numpy as np
+
+from ..constants import RunConfig
+from ..extprocs.jobs import singlepoint_job
+from ..extprocs.scheduler import JobScheduler
+from ..extprocs.singlepoint import structure_arglist
+from ..io import ResultsStore, Structure
+from .gradients import (
+    dipole_derivatives,
+    displacement_prefixes,
+    field_point_prefixes,
+    field_stencil,
+    field_tensor,
+)
+
+TaskKey = Tuple[int, str, int]
+Task = Tuple[TaskKey, Tuple[Any, ...]]
+
+
+class StructureRun:
+    """
+    Bookkeeping of all single points of one structure.
+
+    The equilibrium single point is scheduled first. Once it has finished,
+    the nuclear displacements (gradient) and the field displacements
+    (dipole moment and polarizability share the same six field points) are
+    released, all of them starting from the equilibrium GBW file.
+    """
+
+    prefix_eq = "eq"
+
+    def __init__(
+        self,
+        index: int,
+        label: str,
+        struc: Structure,
+        workdir: str,
+        binary: str,
+        step: float,
+        config: RunConfig,
+        env: Mapping[str, str] | None = None,
+        gradient: bool = True,
+        dipole: str | None = None,
+        alpha: str | None = None,
+        dipgrad: bool = True,
+    ) -> None:
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        index : int
+            Number of the structure, part of the keys of its tasks.
+        label : str
+            Name of the structure in the output.
+        struc : Structure
+            Structure.
+        workdir : str
+            Directory of all files of the structure.
+        binary : str
+            Name of the binary that generates the ORCA inputs.
+        step : float
+            Finite-difference step of the nuclear displacements (Bohr) and
+            of the field points (a.u.).
+        config : RunConfig
+            Configuration sent along with every single point.
+        env : Mapping[str, str] | None
+            Environment of the external programs.
+        gradient : bool
+            Run the 6N nuclear displacements.
+        dipole : str | None
+            Dipole moment from the SCF ('property'), from finite fields
+            ('finitefield') or both ('check').
+        alpha : str | None
+            Polarizability from finite fields ('analytical') or CP-SCF
+            ('cpscf').
+        dipgrad : bool
+            Read the dipole moments of the nuclear displacements, which give
+            the dipole derivatives.
+        """
+
+        self.index = index
+        self.label = label
+        self.struc = struc
+        self.workdir = workdir
+        self.binary = binary
+        self.step = step
+        self.config = config
+        self.env = env
+        self.gradient = gradient
+        self.dipole = dipole
+        self.alpha = alpha
+        self.dipgrad = dipgrad
+        self.starttime = time.time()
+        self.outstanding = 0
+        self.error: str | None = None
+
+        self.eq_energy: float | None = None
+        self.eq_dipole: list[float] | None = None
+        self.eq_alpha: list[list[float]] | None = None
+        self.disp_energies = np.full((6 * struc.nat), np.nan, dtype=np.float64)
+        self.disp_dipoles = np.full((6 * struc.nat, 3), np.nan, dtype=np.float64)
+        # the dipole moment (from the energies) and the polarizability (from
+        # the dipole moments) share the six points of one field stencil
+        self.stencil = field_stencil(1, "energy")
+        npoints = len(self.stencil.points)
+        self.field_energies = np.full((npoints), np.nan, dtype=np.float64)
+        self.field_dipoles = np.full((npoints, 3), np.nan, dtype=np.float64)
+
+    @property
+    def fields(self) -> bool:
+        return bool(
+            self.dipole in ("finitefield", "check")
+            or (self.alpha and self.alpha != "cpscf")
+        )
+
+    @property
+    def complete(self) -> bool:
+        return self.outstanding == 0
+
+    def _task(
+        self,
+        kind: str,
+        k: int,
+        prefix: str,
+        arguments: list[str],
+        guess: str | None,
+        dipole: bool,
+    ) -> Task:
+        self.outstanding += 1
+        return (
+            (self.index, kind, k),
+            (
+                self.binary,
+                arguments,
+                prefix,
+                self.workdir,
+                guess,
+                dipole,
+                self.config,
+                # the equilibrium files are the guess of all other points
+                kind != "eq",
+                kind == "eq" and self.alpha == "cpscf",
+                self.env,
+            ),
+        )
+
+    def start(self) -> list[Task]:
+        """
+        Prepare the working directory and return the equilibrium task.
+        """
+
+        os.makedirs(self.workdir, exist_ok=True)
+        self.struc.write_xyz(
+            os.path.join(self.workdir, self.prefix_eq + ".xyz"), verbose=False
+        )
+        return [
+            self._task(
+                "eq",
+                0,
+                self.prefix_eq,
+                ["--struc", self.prefix_eq + ".xyz"] + structure_arglist(self.struc),
+                None,
+                # the SCF dipole moment needs no further single points
+                self.dipole in ("property", "check"),
+            )
+        ]
+
+    def displacement_tasks(self) -> list[Task]:
+        """
+        Write all displaced geometries and return their tasks.
+        """
+
+        struc = self.struc
+        prefixes = displacement_prefixes(struc.nat)
+        for first, block in struc.iter_displaced_coordinates(self.step):
+            struc.write_xyz_batch(
+                [
+                    os.path.join(self.workdir, prefix + ".xyz")
+                    for prefix in prefixes[6 * first : 6 * first + len(block)]
+                ],
+                block,
+                verbose=False,
+            )
+        return [
+            self._task(
+                "disp",
+                k,
+                prefix,
+                ["--struc", prefix + ".xyz"] + structure_arglist(struc),
+                self.prefix_eq,
+                # read for the dipole derivatives, which come for free
+                self.dipgrad,
+            )
+            for k, prefix in enumerate(prefixes)
+        ]
+
+    def field_tasks(self) -> list[Task]:
+        """
+        Return the tasks of the six field-perturbed single points.
+        """
+
+        fields = self.stencil.fields(self.step, self.struc.efield)
+        return [
+            self._task(
+                "field",
+                k,
+                prefix,
+                ["--struc", self.prefix_eq + ".xyz", "--efield"]
+                + [str(x) for x in fields[k]]
+                + structure_arglist(self.struc, efield=False),
+                self.prefix_eq,
+                bool(self.alpha) and self.alpha != "cpscf",
+            )
+            for k, prefix in enumerate(field_point_prefixes(self.stencil))
+        ]
+
+    def record(self, kind: str, k: int, success: bool, result: Any) -> list[Task]:
+        """
+        Store the result of a finished task and return follow-up tasks.
+        """
+
+        self.outstanding -= 1
+        if not success:
+            if self.error is None:
+                self.error = str(result)
+            return []
+        if self.error is not None:
+            return []
+
+        if kind == "eq":
+            self.eq_energy = float(result["energy"])
+            self.eq_dipole = result["dipole"]
+            self.eq_alpha = result.get("alpha")
+            tasks: list[Task] = []
+            if self.gradient:
+                tasks += self.displacement_tasks()
+            if self.fields:
+                tasks += self.field_tasks()
+            return tasks
+        if kind == "disp":
+            self.disp_energies[k] = result["energy"]
+            if result["dipole"] is not None:
+                self.disp_dipoles[k] = result["dipole"]
+        elif kind == "field":
+            self.field_energies[k] = result["energy"]
+            if result["dipole"] is not None:
+                self.field_dipoles[k] = result["dipole"]
+        return []
+
+    def store_result(self, store: ResultsStore, kind: str, k: int, result: Any) -> None:
+        """
+        Append the result of a finished task to a results store.
+        """
+
+        fdiff = self.step
+        base = self.struc.efield
+        dipole = None if result["dipole"] is None else np.array(result["dipole"])
+        if kind == "eq":
+            store.add_singlepoint(self.index, "eq", result["energy"], efield=base)
+        elif kind == "disp":
+            store.add_singlepoint(
+                self.index,
+                "nuclear",
+                result["energy"],
+                atom=k // 6,
+                coordinate=(k % 6) // 2,
+                step=fdiff if k % 2 == 0 else -fdiff,
+                efield=base,
+                dipole=dipole,
+            )
+        elif kind == "field":
+            store.add_singlepoint(
+                self.index,
+                "field",
+                result["energy"],
+                step=fdiff,
+                efield=self.stencil.fields(fdiff, base)[k],
+                dipole=dipole,
+            )
+
+    def summary(self) -> dict[str, object]:
+        """
+        Assemble the derivatives and return the record of this structure.
+        """
+
+        fdiff = self.step
+        record: dict[str, object] = {
+            "index": self.index,
+            "structure": self.label,
+            "nat": self.struc.nat,
+            "atoms": self.struc.atoms,
+            "energy": self.eq_energy,
+            "time": time.time() - self.starttime,
+        }
+        if self.error is not None:
+            record["error"] = self.error
+            return record
+
+        if self.gradient:
+            energies = self.disp_energies.reshape(self.struc.nat, 3, 2)
+            gradient = (energies[:, :, 0] - energies[:, :, 1]) / (2 * fdiff)
+            record["gradient"] = gradient.tolist()
+            dipgrad = dipole_derivatives(self.disp_dipoles, fdiff)
+            if dipgrad is not None:
+                record["dipgrad"] = dipgrad.tolist()
+        if self.dipole in ("finitefield", "check"):
+            dipole = field_tensor(self.stencil, "energy", self.field_energies, fdiff)
+            record["dipole"] = dipole.tolist()
+        if self.dipole in ("property", "check"):
+            if "dipole" in record:
+                record["dipolefield"] = record["dipole"]
+            record["dipole"] = self.eq_dipole
+        if self.alpha == "cpscf":
+            record["alpha"] = self.eq_alpha
+        elif self.alpha:
+            alpha = field_tensor(self.stencil, "dipole", self.field_dipoles, fdiff)
+            record["alpha"] = alpha.tolist()
+        return record
+
+
+def run_structures(
+    sched: JobScheduler,
+    runs: Iterator[StructureRun],
+    finished: Callable[[StructureRun], None],
+    maxactive: int,
+    store: ResultsStore | None = None,
+) -> None:
+    """
+    Run the single points of many structures on one worker pool.
+
+    The tasks of running structures are submitted before new structures
+    are started, at most 'maxactive' structures run at the same time, and
+    the structures are taken lazily from 'runs'. The not yet submitted
+    tasks of a failed structure are dropped. 'finished' is called with
+    each structure once all of its single points are done.
+    """
+
+    exhausted = False
+    active: dict[int, StructureRun] = {}
+    ready: deque[Task] = deque()
+    while True:
+        # tasks of running structures first, then new structures
+        while not sched.full:
+            if ready:
+                taskkey, jobargs = ready.popleft()
+                sched.submit(taskkey, singlepoint_job, jobargs)
+            elif not exhausted and len(active) < maxactive:
+                try:
+                    run = next(runs)
+                except StopIteration:
+                    exhausted = True
+                    continue
+                active[run.index] = run
+                ready.extend(run.start())
+                if store is not None:
+                    store.add_structure(run.index, run.struc)
+            else:
+                break
+        if sched.pending == 0:
+            break
+
+        key, success, result = sched.next_done()
+        index, kind, k = cast(TaskKey, key)
+        run = active[index]
+        tasks = run.record(kind, k, success, result)
+        if store is not None and success:
+            run.store_result(store, kind, k, result)
+        ready.extend(tasks)
+        if run.error is not None:
+            # drop the not yet submitted tasks of a failed structure
+            nready = len(ready)
+            ready = deque(task for task in ready if task[0][0] != index)
+            run.outstanding -= nready - len(ready)
+        if run.complete:
+            del active[index]
+            finished(run)
@@ -0,0 +1,158 @@
+"""
+Module for the harmonic vibrational analysis of a Hessian.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from ..constants import (
+    AMU2AU,
+    ATOMIC_MASS,
+    ATOMIC_NUMBER,
+    AU2A4AMU,
+    AU2KMMOL,
+    AU2WAVENUMBER,
+)
+from ..io import Structure
+
+
+def atomic_masses(struc: Structure) -> npt.NDArray[np.float64]:
+    """
+    Masses of all atoms of a structure in electron masses.
+    """
+
+    try:
+        masses = [ATOMIC_MASS[ATOMIC_NUMBER[atom.capitalize()]] for atom in struc.atoms]
+    except KeyError as exc:
+        raise ValueError(f"No atomic mass available for element {exc}.") from exc
+    return np.array(masses, dtype=np.float64) * AMU2AU
+
+
+def rigid_body_modes(
+    struc: Structure, masses: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Orthonormal translation and rotation vectors in mass-weighted coordinates.
+
+    Returns
+    -------
+    vectors : np.ndarray
+        Array of shape (3N, 5 or 6) for (linear) molecules.
+    """
+
+    sqrtm = np.sqrt(masses)
+    com = (masses[:, np.newaxis] * struc.coordinates).sum(axis=0) / masses.sum()
+    rel = struc.coordinates - com
+
+    vectors = []
+    for a in range(3):
+        axis = np.zeros((3), dtype=np.float64)
+        axis[a] = 1.0
+        vectors.append((sqrtm[:, np.newaxis] * axis).ravel())
+        vectors.append((sqrtm[:, np.newaxis] * np.cross(axis, rel)).ravel())
+
+    # orthonormalise and drop the rotation about the axis of linear molecules
+    u, sigma, _ = np.linalg.svd(np.array(vectors).T, full_matrices=False)
+    return u[:, sigma > 1e-6 * sigma.max()]
+
+
+def harmonic_analysis(
+    hessian: npt.NDArray[np.float64], struc: Structure
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """
+    Harmonic frequencies and normal modes of a Cartesian Hessian.
+
+    Translations and rotations are projected out, so that 3N - 6 (3N - 5)
+    vibrational modes are returned.
+
+    Parameters
+    ----------
+    hessian : np.ndarray
+        Cartesian Hessian of shape (3N, 3N) in Hartree/Bohr^2.
+    struc : Structure
+        Structure at which the Hessian was calculated.
+
+    Returns
+    -------
+    frequencies : np.ndarray
+        Harmonic wavenumbers in cm^-1 (imaginary ones as negative numbers).
+    modes : np.ndarray
+        Cartesian displacements per mass-weighted normal coordinate,
+        dx/dQ, of shape (3N, nmodes) in atomic units.
+    """
+
+    masses = atomic_masses(struc)
+    invsqrtm = np.repeat(1.0 / np.sqrt(masses), 3)
+    hess_mw = hessian * np.outer(invsqrtm, invsqrtm)
+
+    # orthonormal basis of the internal (vibrational) space
+    ncart = 3 * struc.nat
+    rigid = rigid_body_modes(struc, masses)
+    projector = np.eye(ncart) - rigid @ rigid.T
+    pvals, pvecs = np.linalg.eigh(projector)
+    internal = pvecs[:, pvals > 0.5]
+
+    eigvals, eigvecs = np.linalg.eigh(internal.T @ hess_mw @ internal)
+    frequencies = np.sign(eigvals) * np.sqrt(np.abs(eigvals)) * AU2WAVENUMBER
+    modes = invsqrtm[:, np.newaxis] * (internal @ eigvecs)
+
+    return frequencies, modes
+
+
+def ir_intensities(
+    dipgrad: npt.NDArray[np.float64], modes: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    IR intensities of the normal modes in the double-harmonic approximation.
+
+    Parameters
+    ----------
+    dipgrad : np.ndarray
+        Cartesian dipole derivatives dmu/dR of shape (3N, 3) in atomic units.
+    modes : np.ndarray
+        Normal modes dx/dQ of shape (3N, nmodes) from 'harmonic_analysis'.
+
+    Returns
+    -------
+    intensities : np.ndarray
+        IR intensities in km/mol.
+    """
+
+    dmudq = modes.T @ dipgrad
+    return np.sum(dmudq**2, axis=1) * AU2KMMOL
+
+
+def raman_activities(
+    dalpha: npt.NDArray[np.float64], modes: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Raman activities of the normal modes, 45 a'^2 + 7 g'^2 with the mean
+    polarizability derivative a' and the anisotropy g'.
+
+    Parameters
+    ----------
+    dalpha : np.ndarray
+        Cartesian polarizability derivatives dalpha/dR of shape (3N, 3, 3)
+        in atomic units.
+    modes : np.ndarray
+        Normal modes dx/dQ of shape (3N, nmodes) from 'harmonic_analysis'.
+
+    Returns
+    -------
+    activities : np.ndarray
+        Raman activities in Angstrom^4/amu.
+    """
+
+    # symmetrise the numerical derivatives: alpha_ij = dmu_j/dF_i
+    dalphadq = np.einsum("cp,cij->pij", modes, dalpha)
+    dalphadq = 0.5 * (dalphadq + dalphadq.transpose(0, 2, 1))
+    mean = np.trace(dalphadq, axis1=1, axis2=2) / 3.0
+    diag = np.diagonal(dalphadq, axis1=1, axis2=2)
+    aniso = 0.5 * (
+        (diag[:, 0] - diag[:, 1]) ** 2
+        + (diag[:, 1] - diag[:, 2]) ** 2
+        + (diag[:, 2] - diag[:, 0]) ** 2
+    ) + 3.0 * (dalphadq[:, 0, 1] ** 2 + dalphadq[:, 1, 2] ** 2 + dalphadq[:, 2, 0] ** 2)
+    return (45.0 * mean**2 + 7.0 * aniso) * AU2A4AMU
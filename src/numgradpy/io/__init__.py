@@ -6,11 +6,26 @@ This module contains all external procedures that are required for the
 calculation of the gradient of a function.
 """
 
-from .parser import get_orca_dipolemoment, get_orca_energy
-from .structure import Structure
+from .parser import (
+    get_orca_convergence,
+    get_orca_dipolemoment,
+    get_orca_energy,
+    get_orca_engrad,
+    get_orca_polarizability,
+    get_orca_scf_iterations,
+    read_displacement_vectors,
+)
+from .results import ResultsReader, ResultsStore
+from .structure import Structure, detect_format
+from .trajectory import XYZTrajectory
 from .write_output import (
     write_dipole,
+    write_directional_derivatives,
+    write_hyperpolarizability,
     write_polarizability,
+    write_tm_dipgrad,
     write_tm_energy,
     write_tm_gradient,
+    write_tm_hessian,
+    write_tm_vibspectrum,
 )
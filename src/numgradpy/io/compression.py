@@ -0,0 +1,105 @@
+"""
+Transparent reading and writing of compressed text files.
+
+Kept outputs of single points may be compressed with gzip or, if the
+optional 'zstandard' package is installed, with zstd. Readers open
+'<name>', '<name>.gz' or '<name>.zst', whichever exists.
+"""
+
+from __future__ import annotations
+
+import gzip
+import importlib
+import io
+import os
+import shutil
+from typing import IO, Any
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+"""File name suffixes of the supported compression methods."""
+
+
+def _zstandard() -> Any:
+    """
+    Import the optional 'zstandard' package.
+    """
+
+    try:
+        return importlib.import_module("zstandard")
+    except ImportError as exc:
+        raise ImportError(
+            "zstd compression requires the 'zstandard' package \
+(pip install numgradpy[zstd])."
+        ) from exc
+
+
+def compressed_name(filename: str) -> str | None:
+    """
+    Name of the existing (plain or compressed) version of a file or None.
+    """
+
+    for suffix in ("",) + tuple(COMPRESSION_SUFFIXES.values()):
+        if os.path.exists(filename + suffix):
+            return filename + suffix
+    return None
+
+
+def open_text(filename: str) -> IO[str]:
+    """
+    Open a text file for reading, which may be compressed.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the uncompressed file. If it does not exist, the gzip
+        ('.gz') and zstd ('.zst') versions are tried.
+
+    Returns
+    -------
+    file : IO[str]
+        File object in text mode.
+    """
+
+    name = compressed_name(filename)
+    if name is None:
+        raise FileNotFoundError(f"File '{filename}' not found (also not compressed).")
+    if name.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        return gzip.open(name, "rt", encoding="UTF-8")
+    if name.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        reader = _zstandard().ZstdDecompressor().stream_reader(open(name, "rb"))
+        return io.TextIOWrapper(reader, encoding="UTF-8")
+    return open(name, encoding="UTF-8")
+
+
+def compress_file(filename: str, method: str = "gzip") -> str:
+    """
+    Compress a file and remove the original.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    method : str
+        'gzip' or 'zstd'.
+
+    Returns
+    -------
+    compressed : str
+        Name of the compressed file.
+    """
+
+    if method not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Compression method '{method}' not supported.")
+    compressed = filename + COMPRESSION_SUFFIXES[method]
+    # written under a temporary name, so that readers never see a partial file
+    partial = compressed + ".part"
+    with open(filename, "rb") as src:
+        if method == "gzip":
+            with gzip.open(partial, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            with open(partial, "wb") as raw:
+                _zstandard().ZstdCompressor().copy_stream(src, raw)
+    os.replace(partial, compressed)
+    os.remove(filename)
+    return compressed
@@ -1,12 +1,19 @@
 """
 Module to parse outputs from ORCA into NumGradPy's internal data structures.
+
+All output files may also be gzip- or zstd-compressed ('<name>.gz',
+'<name>.zst').
 """
 
 from __future__ import annotations
 
+import re
+
 import numpy as np
 import numpy.typing as npt
 
+from .compression import open_text
+
 
 def get_orca_energy(outfile: str) -> float:
     """
@@ -23,7 +30,7 @@ def get_orca_energy(outfile: str) -> float:
         Energy in Hartree.
     """
 
-    with open(outfile, encoding="UTF-8") as f:
+    with open_text(outfile) as f:
         lines = f.readlines()
     energy = 0.0
     energyfound = False
@@ -53,7 +60,7 @@ def get_orca_dipolemoment(outfile: str) -> npt.NDArray[np.float64]:
     """
     dipolemom: npt.NDArray[np.float64] = np.zeros((), dtype=np.float64)
 
-    with open(outfile, encoding="UTF-8") as f:
+    with open_text(outfile) as f:
         lines = f.readlines()
     dipolemomentfound = False
     for line in lines:
@@ -80,3 +87,171 @@ def get_orca_dipolemoment(outfile: str) -> npt.NDArray[np.float64]:
         raise RuntimeError("Dipole moment not found in ORCA output file.")
 
     return dipolemom
+
+
+def get_orca_polarizability(outfile: str) -> npt.NDArray[np.float64]:
+    """
+    Get the analytical (CP-SCF) static polarizability from an ORCA output
+    file of a calculation with '%elprop Polar 1 end'.
+
+    Parameters
+    ----------
+    outfile : str
+        Name of the ORCA output file.
+
+    Returns
+    -------
+    polarizability : npt.NDArray[np.float64]
+        Raw Cartesian polarizability tensor of shape (3, 3) in atomic units.
+    """
+
+    with open_text(outfile) as f:
+        lines = f.readlines()
+
+    # the last tensor of the output is taken (e.g. after recovery steps)
+    polarizability = None
+    for i, line in enumerate(lines):
+        if "THE POLARIZABILITY TENSOR" not in line:
+            continue
+        for j in range(i + 1, min(i + 8, len(lines))):
+            if "raw cartesian tensor" in lines[j].lower():
+                try:
+                    polarizability = np.array(
+                        [
+                            [float(x) for x in lines[j + k].split()[:3]]
+                            for k in (1, 2, 3)
+                        ],
+                        dtype=np.float64,
+                    )
+                except (IndexError, ValueError) as exc:
+                    raise RuntimeError(
+                        "Polarizability tensor in ORCA output file is incomplete."
+                    ) from exc
+                break
+    if polarizability is None or polarizability.shape != (3, 3):
+        raise RuntimeError("Polarizability not found in ORCA output file.")
+
+    return polarizability
+
+
+def get_orca_engrad(engradfile: str) -> tuple[float, npt.NDArray[np.float64]]:
+    """
+    Get the energy and the analytical gradient from an ORCA '.engrad' file.
+
+    Parameters
+    ----------
+    engradfile : str
+        Name of the ORCA '.engrad' file.
+
+    Returns
+    -------
+    energy : float
+        Energy in Hartree.
+    gradient : npt.NDArray[np.float64]
+        Gradient of shape (nat, 3) in Hartree/Bohr.
+    """
+
+    with open_text(engradfile) as f:
+        # all data lines, the comment lines start with '#'
+        values = [line.split() for line in f if line.strip() and line[0] != "#"]
+
+    try:
+        nat = int(values[0][0])
+        energy = float(values[1][0])
+        gradient = np.array(
+            [float(value[0]) for value in values[2 : 2 + 3 * nat]], dtype=np.float64
+        )
+    except (IndexError, ValueError) as exc:
+        raise RuntimeError("Gradient not found in ORCA engrad file.") from exc
+    if len(gradient) != 3 * nat:
+        raise RuntimeError("Gradient not found in ORCA engrad file.")
+
+    return energy, gradient.reshape(nat, 3)
+
+
+def get_orca_scf_iterations(outfile: str) -> int | None:
+    """
+    Get the number of SCF iterations from an ORCA output file.
+
+    Parameters
+    ----------
+    outfile : str
+        Name of the ORCA output file.
+
+    Returns
+    -------
+    iterations : int | None
+        Number of iterations of the last converged SCF or None if the
+        output does not contain it.
+    """
+
+    pattern = re.compile(r"SCF CONVERGED AFTER\s+(\d+)\s+CYCLES")
+    iterations = None
+    with open_text(outfile) as f:
+        for line in f:
+            match = pattern.search(line)
+            if match is not None:
+                iterations = int(match.group(1))
+
+    return iterations
+
+
+def get_orca_convergence(outfile: str) -> bool:
+    """
+    Check whether an ORCA single point finished with a converged SCF.
+
+    Parameters
+    ----------
+    outfile : str
+        Name of the ORCA output file.
+
+    Returns
+    -------
+    converged : bool
+        True if the output contains a final energy and no message about
+        an unconverged SCF.
+    """
+
+    try:
+        with open_text(outfile) as f:
+            content = f.read()
+    except OSError:
+        return False
+
+    return (
+        "FINAL SINGLE POINT ENERGY" in content
+        and "SCF NOT CONVERGED" not in content
+        and "The SCF did not converge" not in content
+    )
+
+
+def read_displacement_vectors(filename: str, nat: int) -> npt.NDArray[np.float64]:
+    """
+    Read displacement vectors (e.g. a reaction coordinate or normal modes)
+    from a NumPy '.npy' file or a text file.
+
+    A text file holds 3N numbers per vector, either in one row or as N
+    rows of x, y and z; lines starting with '#' are ignored.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    nat : int
+        Number of atoms of the structure.
+
+    Returns
+    -------
+    vectors : npt.NDArray[np.float64]
+        Vectors of shape (k, 3N) in atomic units.
+    """
+
+    if filename.endswith(".npy"):
+        values = np.load(filename)
+    else:
+        values = np.loadtxt(filename, dtype=np.float64, ndmin=2)
+    if values.size == 0 or values.size % (3 * nat) != 0:
+        raise ValueError(
+            f"'{filename}' does not contain vectors of {3 * nat} components."
+        )
+    return np.asarray(values, dtype=np.float64).reshape(-1, 3 * nat)
@@ -0,0 +1,334 @@
+"""
+Append-only binary store for the results of a run or a batch.
+
+A store is a directory holding fixed-size binary records. Records are
+appended and flushed as soon as a result is available, and all files can
+be mapped into memory without copying when the store is read back:
+
+- 'singlepoints.bin': one SINGLEPOINT_DTYPE record per single point
+- 'structures.bin': one STRUCTURE_DTYPE record per geometry, pointing to
+  'atoms.bin' (atomic numbers) and 'coordinates.bin' (Bohr)
+- 'tensors.bin': one TENSOR_DTYPE record per final tensor, pointing to
+  'tensordata.bin'
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from types import TracebackType
+from typing import Any, BinaryIO
+
+import numpy as np
+import numpy.typing as npt
+
+from ..constants import ATOMIC_NUMBER, PSE
+from .structure import Structure
+
+STORE_VERSION = 1
+"""Version of the store layout."""
+
+SINGLEPOINT_DTYPE = np.dtype(
+    [
+        ("structure", np.int64),
+        ("kind", "S8"),
+        ("atom", np.int32),
+        ("coordinate", np.int32),
+        ("step", np.float64),
+        ("efield", np.float64, (3,)),
+        ("energy", np.float64),
+        ("dipole", np.float64, (3,)),
+    ]
+)
+"""Record of a single point: 'kind' is e.g. b'eq', b'nuclear' or b'field';
+'atom'/'coordinate' are -1 and 'dipole' is NaN if not applicable."""
+
+STRUCTURE_DTYPE = np.dtype(
+    [
+        ("structure", np.int64),
+        ("nat", np.int64),
+        ("offset", np.int64),
+        ("charge", np.int32),
+        ("multiplicity", np.int32),
+    ]
+)
+"""Record of a geometry: 'offset' is the index of its first atom."""
+
+TENSOR_DTYPE = np.dtype(
+    [
+        ("structure", np.int64),
+        ("name", "S16"),
+        ("offset", np.int64),
+        ("shape", np.int64, (3,)),
+        ("ndim", np.int32),
+    ]
+)
+"""Record of a final tensor: 'offset' is the index of its first element."""
+
+FILES = {
+    "singlepoints": ("singlepoints.bin", SINGLEPOINT_DTYPE),
+    "structures": ("structures.bin", STRUCTURE_DTYPE),
+    "atoms": ("atoms.bin", np.dtype(np.int32)),
+    "coordinates": ("coordinates.bin", np.dtype(np.float64)),
+    "tensors": ("tensors.bin", TENSOR_DTYPE),
+    "tensordata": ("tensordata.bin", np.dtype(np.float64)),
+}
+
+
+def _count(path: str, dtype: np.dtype[Any]) -> int:
+    """
+    Number of complete records in a file (a partially written last record
+    of an interrupted run is ignored).
+    """
+
+    if not os.path.exists(path):
+        return 0
+    return os.path.getsize(path) // dtype.itemsize
+
+
+class ResultsStore:
+    """
+    Writer of a results store directory. Existing stores are appended to.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open (or create) the store.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store.
+        """
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        header = os.path.join(path, "header.json")
+        if os.path.exists(header):
+            with open(header, encoding="UTF-8") as file:
+                if json.load(file).get("version") != STORE_VERSION:
+                    raise ValueError(f"Unsupported results store version in '{path}'.")
+        else:
+            with open(header, "w", encoding="UTF-8") as file:
+                json.dump({"version": STORE_VERSION}, file)
+
+        self._files: dict[str, BinaryIO] = {}
+        self._counts: dict[str, int] = {}
+        for key, (fname, dtype) in FILES.items():
+            fullname = os.path.join(path, fname)
+            self._counts[key] = _count(fullname, dtype)
+            # cut off incomplete records before appending
+            if os.path.exists(fullname):
+                os.truncate(fullname, self._counts[key] * dtype.itemsize)
+            self._files[key] = open(fullname, "ab")  # pylint: disable=R1732
+
+    def __enter__(self) -> ResultsStore:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close all files of the store.
+        """
+
+        for file in self._files.values():
+            file.close()
+        self._files = {}
+
+    def _append(self, key: str, data: npt.NDArray[Any]) -> int:
+        """
+        Append records to one of the files and return the index of the first.
+        """
+
+        first = self._counts[key]
+        file = self._files[key]
+        file.write(np.ascontiguousarray(data, dtype=FILES[key][1]).tobytes())
+        file.flush()
+        self._counts[key] += len(data)
+        return first
+
+    def add_singlepoint(
+        self,
+        structure: int,
+        kind: str,
+        energy: float,
+        atom: int = -1,
+        coordinate: int = -1,
+        step: float = 0.0,
+        efield: npt.NDArray[np.float64] | None = None,
+        dipole: npt.NDArray[np.float64] | None = None,
+    ) -> None:
+        """
+        Append the result of one single point.
+
+        Parameters
+        ----------
+        structure : int
+            Index of the structure (0 for single runs).
+        kind : str
+            Type of the single point ('eq', 'nuclear', 'field', ...).
+        energy : float
+            Energy in Hartree.
+        atom : int
+            Displaced atom (-1 if none).
+        coordinate : int
+            Displaced Cartesian coordinate (-1 if none).
+        step : float
+            Signed displacement in Bohr (nuclear) or a.u. (field).
+        efield : np.ndarray | None
+            External electric field of the calculation.
+        dipole : np.ndarray | None
+            Dipole moment in a.u. if available.
+        """
+
+        record = np.zeros((1), dtype=SINGLEPOINT_DTYPE)
+        record["structure"] = structure
+        record["kind"] = kind.encode("ascii")
+        record["atom"] = atom
+        record["coordinate"] = coordinate
+        record["step"] = step
+        record["efield"] = 0.0 if efield is None else efield
+        record["energy"] = energy
+        record["dipole"] = np.nan if dipole is None else dipole
+        self._append("singlepoints", record)
+
+    def add_structure(self, structure: int, struc: Structure) -> None:
+        """
+        Append a geometry.
+
+        Parameters
+        ----------
+        structure : int
+            Index of the structure.
+        struc : Structure
+            Geometry in atomic units.
+        """
+
+        record = np.zeros((1), dtype=STRUCTURE_DTYPE)
+        record["structure"] = structure
+        record["nat"] = struc.nat
+        record["offset"] = self._counts["atoms"]
+        record["charge"] = 0 if struc.charge is None else struc.charge
+        record["multiplicity"] = 0 if struc.multiplicity is None else struc.multiplicity
+        self._append(
+            "atoms",
+            np.array([ATOMIC_NUMBER[atom.capitalize()] for atom in struc.atoms]),
+        )
+        self._append("coordinates", struc.coordinates.ravel())
+        self._append("structures", record)
+
+    def add_tensor(
+        self, structure: int, name: str, tensor: npt.NDArray[np.float64]
+    ) -> None:
+        """
+        Append a final tensor (e.g. 'gradient', 'dipole', 'alpha').
+
+        Parameters
+        ----------
+        structure : int
+            Index of the structure.
+        name : str
+            Name of the tensor (at most 16 characters).
+        tensor : np.ndarray
+            Tensor with up to three dimensions.
+        """
+
+        if tensor.ndim > 3 or len(name) > 16:
+            raise ValueError("Tensors are limited to three dimensions and 16 chars.")
+        record = np.zeros((1), dtype=TENSOR_DTYPE)
+        record["structure"] = structure
+        record["name"] = name.encode("ascii")
+        record["offset"] = self._counts["tensordata"]
+        record["shape"][0, : tensor.ndim] = tensor.shape
+        record["ndim"] = tensor.ndim
+        self._append("tensordata", np.asarray(tensor, dtype=np.float64).ravel())
+        self._append("tensors", record)
+
+
+class ResultsReader:
+    """
+    Zero-copy reader of a results store based on memory maps.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map all files of the store into memory (read-only).
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store.
+        """
+
+        self.path = path
+        with open(os.path.join(path, "header.json"), encoding="UTF-8") as file:
+            if json.load(file).get("version") != STORE_VERSION:
+                raise ValueError(f"Unsupported results store version in '{path}'.")
+
+        self.arrays: dict[str, npt.NDArray[Any]] = {}
+        for key, (fname, dtype) in FILES.items():
+            fullname = os.path.join(path, fname)
+            count = _count(fullname, dtype)
+            if count == 0:
+                self.arrays[key] = np.zeros((0), dtype=dtype)
+            else:
+                self.arrays[key] = np.memmap(
+                    fullname, dtype=dtype, mode="r", shape=(count,)
+                )
+
+    @property
+    def singlepoints(self) -> npt.NDArray[Any]:
+        """
+        All single point records (structured array).
+        """
+
+        return self.arrays["singlepoints"]
+
+    def structure(self, structure: int) -> Structure:
+        """
+        Return the (last stored) geometry of a structure.
+        """
+
+        records = self.arrays["structures"]
+        matches = np.flatnonzero(records["structure"] == structure)
+        if len(matches) == 0:
+            raise KeyError(f"No geometry stored for structure {structure}.")
+        record = records[matches[-1]]
+        first, nat = int(record["offset"]), int(record["nat"])
+
+        struc = Structure()
+        struc.set_structure(
+            [PSE[int(z)] for z in self.arrays["atoms"][first : first + nat]],
+            np.array(self.arrays["coordinates"][3 * first : 3 * (first + nat)]),
+        )
+        if record["charge"] != 0 or record["multiplicity"] != 0:
+            struc.charge = int(record["charge"])
+            struc.multiplicity = int(record["multiplicity"]) or None
+        struc.filename = self.path
+        return struc
+
+    def tensor(self, structure: int, name: str) -> npt.NDArray[np.float64]:
+        """
+        Return a read-only view of the (last stored) tensor of a structure.
+        """
+
+        records = self.arrays["tensors"]
+        matches = np.flatnonzero(
+            (records["structure"] == structure)
+            & (records["name"] == name.encode("ascii"))
+        )
+        if len(matches) == 0:
+            raise KeyError(f"No tensor '{name}' stored for structure {structure}.")
+        record = records[matches[-1]]
+        shape = tuple(int(n) for n in record["shape"][: int(record["ndim"])])
+        first = int(record["offset"])
+        size = int(np.prod(shape, dtype=np.int64))
+        data = self.arrays["tensordata"][first : first + size]
+        return data.reshape(shape)
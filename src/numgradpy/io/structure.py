@@ -1,22 +1,168 @@
 """
 Define a class for storing, reading and writing the structure of a molecule.
-First, we implement only the XYZ file format.
+Supported are (extended) XYZ files and Turbomole 'coord' files.
 """
 
 from __future__ import annotations
 
+import os
+import shlex
+from collections.abc import Iterator, Sequence
+
 import numpy as np
 import numpy.typing as npt
 
 from ..constants import AA2AU
 
 
+def format_from_name(filename: str) -> str | None:
+    """
+    Derive the structure format from the file name alone.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the structure file.
+
+    Returns
+    -------
+    fmt : str | None
+        'coord', 'xyz' or None if the name is not conclusive.
+    """
+
+    basename = os.path.basename(filename)
+    suffix = os.path.splitext(basename)[1].lower()
+    if basename == "coord" or suffix in (".coord", ".tmol"):
+        return "coord"
+    if suffix in (".xyz", ".extxyz"):
+        return "xyz"
+    return None
+
+
+def detect_format(filename: str) -> str:
+    """
+    Detect the format of a structure file.
+
+    Files called 'coord' (or with suffix '.coord'/'.tmol') and files starting
+    with a '$coord' data group are Turbomole files, everything else is
+    treated as (extended) XYZ.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the structure file.
+
+    Returns
+    -------
+    fmt : str
+        Either 'coord' or 'xyz'.
+    """
+
+    fmt = format_from_name(filename)
+    if fmt is not None:
+        return fmt
+
+    with open(filename, encoding="UTF-8") as file:
+        for line in file:
+            if line.strip():
+                return "coord" if line.lstrip().startswith("$coord") else "xyz"
+
+    raise ValueError(f"Structure file '{filename}' is empty.")
+
+
+def parse_atom_block(
+    lines: Sequence[str], nat: int
+) -> tuple[list[str], npt.NDArray[np.float64]]:
+    """
+    Parse a block of 'symbol x y z' lines in one vectorised step.
+
+    Parameters
+    ----------
+    lines : Sequence[str]
+        Lines of the block (empty lines are ignored).
+    nat : int
+        Expected number of atoms.
+
+    Returns
+    -------
+    atoms : list[str]
+        Atom symbols as given in the block.
+    coordinates : np.ndarray
+        Coordinates of shape (nat, 3) in the unit of the block.
+    """
+
+    lines = [line for line in lines if line.strip()]
+    if len(lines) != nat:
+        raise ValueError("Number of atoms does not match number of coordinates.")
+    if nat == 0:
+        return [], np.zeros((0, 3), dtype=np.float64)
+
+    # split the whole block at once if all lines have the same number of
+    # columns, otherwise fall back to splitting line by line
+    tokens = " ".join(lines).split()
+    ncol = len(lines[0].split())
+    if ncol >= 4 and len(tokens) == nat * ncol:
+        table = np.array(tokens, dtype=str).reshape(nat, ncol)[:, :4]
+    else:
+        rows = [line.split()[:4] for line in lines]
+        if any(len(row) != 4 for row in rows):
+            raise ValueError("Atom lines must contain a symbol and three coordinates.")
+        table = np.array(rows, dtype=str)
+
+    return table[:, 0].tolist(), table[:, 1:].astype(np.float64)
+
+
+def parse_xyz_comment(comment: str) -> dict[str, str]:
+    """
+    Parse the key=value pairs of an extended XYZ comment line.
+
+    Parameters
+    ----------
+    comment : str
+        Second line of an XYZ file.
+
+    Returns
+    -------
+    info : dict[str, str]
+        Lower-case keys and their (unquoted) values. Tokens without '='
+        are ignored, so plain comment lines give an empty dictionary.
+    """
+
+    try:
+        tokens = shlex.split(comment)
+    except ValueError:
+        return {}
+
+    info: dict[str, str] = {}
+    for token in tokens:
+        if "=" in token:
+            key, value = token.split("=", 1)
+            info[key.strip().lower()] = value.strip()
+    return info
+
+
 class Structure:
     """
     Define a class for storing, reading and writing the structure of a molecule.
-    First, we implement only the XYZ file format.
+    Supported are (extended) XYZ files and Turbomole 'coord' files.
+
+    The coordinates are kept as one C-contiguous (nat, 3) array in atomic
+    units, so that displaced geometries can be generated as a whole block.
+    Charge, multiplicity and an external electric field are optional
+    metadata (None if not given), read from and written to extended XYZ.
     """
 
+    __slots__ = (
+        "filename",
+        "filetype",
+        "nat",
+        "atoms",
+        "coordinates",
+        "charge",
+        "multiplicity",
+        "efield",
+    )
+
     def __init__(self) -> None:
         """
         Initialize the Structure class.
@@ -35,11 +181,45 @@ class Structure:
         self.filetype: str = ""
         self.nat: int = 0
         self.atoms: list[str] = []
-        self.coordinates: npt.NDArray[np.float64] = np.zeros((), dtype=np.float64)
+        self.coordinates: npt.NDArray[np.float64] = np.zeros((0, 3), dtype=np.float64)
+        self.charge: int | None = None
+        self.multiplicity: int | None = None
+        self.efield: npt.NDArray[np.float64] | None = None
+
+    def read(
+        self, filename: str, fmt: str | None = None
+    ) -> tuple[int, list[str], npt.NDArray[np.float64]]:
+        """
+        Read the structure from a file with automatic format detection.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the structure file.
+        fmt : str | None
+            Enforce a format ('xyz' or 'coord') instead of detecting it.
+
+        Returns
+        -------
+        nat : int
+            Number of atoms.
+        atoms : list[str]
+            List of all atoms in the structure.
+        coordinates : np.ndarray
+            Array of all coordinates in the structure in atomic units.
+        """
+
+        if fmt is None:
+            fmt = detect_format(filename)
+        if fmt == "xyz":
+            return self.read_xyz(filename)
+        if fmt == "coord":
+            return self.read_coord(filename)
+        raise ValueError(f"Structure format '{fmt}' not supported.")
 
     def read_xyz(self, filename: str) -> tuple[int, list[str], npt.NDArray[np.float64]]:
         """
-        Read the structure from an XYZ file.
+        Read the structure from an (extended) XYZ file.
 
         Returns
         -------
@@ -49,27 +229,136 @@ class Structure:
             Array of all coordinates in the structure.
         """
         self.filename = filename
-        self.filetype = self.filename.split(".")[-1]
+        # the format is chosen by 'read', also for files without the suffix
+        self.filetype = "xyz"
+        # nothing is kept from a structure read before
+        self.charge = None
+        self.multiplicity = None
+        self.efield = None
+
+        with open(self.filename, encoding="UTF-8") as file:
+            lines = file.readlines()
 
-        if self.filetype != "xyz":
-            raise ValueError("Filetype not supported.")
+        nat = int(lines[0].split()[0])
+        atoms, coordinates = parse_atom_block(lines[2:], nat)
+        self.set_metadata(parse_xyz_comment(lines[1] if len(lines) > 1 else ""))
 
-        coordinates: list[list[float]] = []
+        # convert the whole coordinates array to atomic units
+        self.set_structure(atoms, coordinates * AA2AU)
+        return self.nat, self.atoms, self.coordinates
+
+    def read_coord(
+        self, filename: str
+    ) -> tuple[int, list[str], npt.NDArray[np.float64]]:
+        """
+        Read the structure from a Turbomole 'coord' file.
+
+        The coordinates are already given in atomic units and are taken
+        over without any conversion. Options of the '$coord' line (e.g.
+        'natoms=3') and trailing flags of the atom lines (e.g. 'f' for
+        frozen atoms) are ignored; fractional coordinates ('frac') are not
+        supported.
+
+        Returns
+        -------
+        nat : int
+            Number of atoms.
+        atoms : list[str]
+            List of all atoms in the structure.
+        coordinates : np.ndarray
+            Array of all coordinates in the structure.
+        """
+        self.filename = filename
+        self.filetype = "coord"
+        # a coord file carries no charge, multiplicity or field
+        self.charge = None
+        self.multiplicity = None
+        self.efield = None
 
         with open(self.filename, encoding="UTF-8") as file:
             lines = file.readlines()
 
-        self.nat = int(lines[0].split()[0])
-        for line in lines[2:]:
-            self.atoms.append(line.split()[0])
-            coordinates.append([float(x) for x in line.split()[1:]])
+        block: list[str] = []
+        incoord = False
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith("$"):
+                if incoord:
+                    break
+                if stripped.split()[0] == "$coord":
+                    if "frac" in stripped.split()[1:]:
+                        raise ValueError(
+                            f"Fractional coordinates in '{filename}' are not "
+                            "supported."
+                        )
+                    incoord = True
+                continue
+            if incoord and stripped and not stripped.startswith("#"):
+                block.append(stripped)
+
+        if not block:
+            raise ValueError(f"No '$coord' data group found in '{filename}'.")
+
+        # rows are 'x y z symbol [f]' -> reorder to 'symbol x y z'
+        rows = [line.split() for line in block]
+        atoms, coordinates = parse_atom_block(
+            [" ".join(row[3:4] + row[:3]) for row in rows], len(rows)
+        )
+
+        self.set_structure([atom.capitalize() for atom in atoms], coordinates)
+        return self.nat, self.atoms, self.coordinates
 
-        if len(coordinates) != self.nat:
-            raise ValueError("Number of atoms does not match number of coordinates.")
+    def set_metadata(self, info: dict[str, str]) -> None:
+        """
+        Set charge, multiplicity and electric field from key=value pairs.
 
-        # convert the whole coordinates array to atomic units
-        self.coordinates = np.array(coordinates) * AA2AU
-        return self.nat, self.atoms, self.coordinates
+        Parameters
+        ----------
+        info : dict[str, str]
+            Keys as parsed by 'parse_xyz_comment'. Recognised are 'charge'
+            ('chrg'), 'multiplicity' ('mult') and 'efield' ('field'), the
+            latter as three numbers separated by spaces or commas.
+
+        Returns
+        -------
+        None
+        """
+
+        for key in ("charge", "chrg"):
+            if key in info:
+                self.charge = int(info[key])
+        for key in ("multiplicity", "mult"):
+            if key in info:
+                self.multiplicity = int(info[key])
+                if self.multiplicity < 1:
+                    raise ValueError("Multiplicity must be a positive integer.")
+        for key in ("efield", "field"):
+            if key in info:
+                efield = np.array(info[key].replace(",", " ").split(), dtype=float)
+                if efield.shape != (3,):
+                    raise ValueError("Electric field must have three components.")
+                self.efield = efield
+
+    def xyz_comment(self) -> str:
+        """
+        Build the extended XYZ comment line holding the metadata.
+
+        Returns
+        -------
+        comment : str
+            Space-separated key=value pairs, empty if no metadata is set.
+        """
+
+        info: list[str] = []
+        if self.charge is not None:
+            info.append(f"charge={self.charge}")
+        if self.multiplicity is not None:
+            info.append(f"multiplicity={self.multiplicity}")
+        if self.efield is not None:
+            info.append(
+                'efield="' + " ".join(repr(x) for x in self.efield.tolist()) + '"'
+            )
+        return " ".join(info)
 
     # function that sets up an instance of the Structure class with given
     # atoms and coordinates
@@ -92,7 +381,28 @@ class Structure:
         """
         self.nat = len(atoms)
         self.atoms = atoms
-        self.coordinates = coordinates
+        self.coordinates = np.ascontiguousarray(coordinates, dtype=np.float64).reshape(
+            self.nat, 3
+        )
+
+    def copy(self) -> Structure:
+        """
+        Return an independent copy of the structure.
+
+        Returns
+        -------
+        struc : Structure
+            New structure with its own coordinate array.
+        """
+
+        struc = Structure()
+        struc.filename = self.filename
+        struc.filetype = self.filetype
+        struc.set_structure(list(self.atoms), self.coordinates.copy())
+        struc.charge = self.charge
+        struc.multiplicity = self.multiplicity
+        struc.efield = None if self.efield is None else self.efield.copy()
+        return struc
 
     def write_xyz(self, newfilename: str, verbose: bool) -> None:
         """
@@ -110,19 +420,112 @@ class Structure:
         None
         """
 
+        self.write_xyz_batch([newfilename], self.coordinates[np.newaxis], verbose)
+
+    def xyz_template(self) -> str:
+        """
+        Build a %-format template for an XYZ file of this structure.
+
+        The template contains the atom symbols and one '%20.14f' field per
+        Cartesian coordinate, so that a whole geometry is formatted with a
+        single '%' operation on the flattened coordinate array.
+
+        Returns
+        -------
+        template : str
+            Format template of the complete XYZ file.
+        """
+
+        atomlines = "".join(
+            f"{atom:2s} %20.14f %20.14f %20.14f\n" for atom in self.atoms
+        )
+        comment = self.xyz_comment().replace("%", "%%")
+        return f"{len(self.atoms)}\n{comment}\n" + atomlines
+
+    def write_coord(self, newfilename: str, verbose: bool) -> None:
+        """
+        Write the structure to a Turbomole 'coord' file in atomic units.
+
+        Parameters
+        ----------
+        newfilename : str
+            Name of the new file.
+
+        Returns
+        -------
+        None
+        """
+
         if verbose:
             print(f"Writing structure to {newfilename}.")
 
+        template = "".join(
+            f"%20.14f %20.14f %20.14f      {atom.lower()}\n" for atom in self.atoms
+        )
         with open(newfilename, "w", encoding="UTF-8") as file:
-            file.write(f"{len(self.atoms)}\n\n")
-            # write the structure to the file
-            # and use the ndarray data type for the coordinates
-            # NOTE: self.coordinates is a numpy array
-            for atom, coordinate in zip(self.atoms, self.coordinates):
-                file.write(
-                    f"{atom:2s} {(coordinate[0] / AA2AU ):20.14f}\
- {(coordinate[1] / AA2AU ):20.14f} {(coordinate[2] / AA2AU ):20.14f}\n"
-                )
+            file.write(
+                "$coord\n"
+                + template % tuple(self.coordinates.ravel().tolist())
+                + "$end\n"
+            )
+
+    def write(self, newfilename: str, verbose: bool, fmt: str | None = None) -> None:
+        """
+        Write the structure in the format given by 'fmt' or the file name.
+
+        Parameters
+        ----------
+        newfilename : str
+            Name of the new file.
+        fmt : str | None
+            Either 'xyz' or 'coord'. Detected from the name if not given.
+
+        Returns
+        -------
+        None
+        """
+
+        if fmt is None:
+            fmt = format_from_name(newfilename) or "xyz"
+        if fmt == "xyz":
+            self.write_xyz(newfilename, verbose)
+        elif fmt == "coord":
+            self.write_coord(newfilename, verbose)
+        else:
+            raise ValueError(f"Structure format '{fmt}' not supported.")
+
+    def write_xyz_batch(
+        self,
+        filenames: Sequence[str],
+        coordinates: npt.NDArray[np.float64],
+        verbose: bool,
+    ) -> None:
+        """
+        Write several geometries of this structure to XYZ files in bulk.
+
+        Parameters
+        ----------
+        filenames : Sequence[str]
+            One file name per geometry.
+        coordinates : np.ndarray
+            Coordinates of shape (len(filenames), nat, 3) in atomic units.
+
+        Returns
+        -------
+        None
+        """
+
+        if coordinates.shape != (len(filenames), self.nat, 3):
+            raise ValueError("Shape of coordinates does not match the file list.")
+
+        template = self.xyz_template()
+        # convert all geometries at once and format each file in a single step
+        values = (coordinates / AA2AU).reshape(len(filenames), -1).tolist()
+        for newfilename, geometry in zip(filenames, values):
+            if verbose:
+                print(f"Writing structure to {newfilename}.")
+            with open(newfilename, "w", encoding="UTF-8") as file:
+                file.write(template % tuple(geometry))
 
     def get_atoms(self) -> list[str]:
         """
@@ -193,6 +596,73 @@ class Structure:
         # check if the atom index is valid
         if atom < 0 or atom > self.nat:
             raise ValueError("Atom index out of bounds.")
-        self.coordinates[atom][coordinate] = self.coordinates[atom][coordinate] + value
+        self.coordinates[atom, coordinate] += value
 
         return None
+
+    def displaced_coordinates(
+        self, fdiff: float, first: int = 0, last: int | None = None
+    ) -> npt.NDArray[np.float64]:
+        """
+        Generate the displaced geometries for a central finite difference.
+
+        For every atom i in [first, last) and every Cartesian direction j,
+        two geometries are generated: index 6 * i + 2 * j holds the
+        positive and index 6 * i + 2 * j + 1 the negative displacement
+        (relative to 'first').
+
+        Parameters
+        ----------
+        fdiff : float
+            Finite difference step in atomic units.
+        first : int
+            Index of the first atom to be displaced.
+        last : int | None
+            Index after the last atom to be displaced (default: all atoms).
+
+        Returns
+        -------
+        coordinates : np.ndarray
+            Array of shape (6 * (last - first), nat, 3).
+        """
+
+        if last is None:
+            last = self.nat
+        if first < 0 or last > self.nat or first > last:
+            raise ValueError("Atom index out of bounds.")
+
+        ndisp = 6 * (last - first)
+        displaced = np.empty((ndisp, self.nat, 3), dtype=np.float64)
+        displaced[:] = self.coordinates
+        idx = np.arange(ndisp)
+        displaced[idx, first + idx // 6, (idx % 6) // 2] += np.where(
+            idx % 2 == 0, fdiff, -fdiff
+        )
+        return displaced
+
+    def iter_displaced_coordinates(
+        self, fdiff: float, maxbytes: int = 2**26
+    ) -> Iterator[tuple[int, npt.NDArray[np.float64]]]:
+        """
+        Stream the displaced geometries in blocks of limited memory size.
+
+        Parameters
+        ----------
+        fdiff : float
+            Finite difference step in atomic units.
+        maxbytes : int
+            Approximate upper limit for the size of a single block.
+
+        Yields
+        ------
+        first : int
+            Index of the first atom displaced in the block.
+        coordinates : np.ndarray
+            Block of displaced geometries, see 'displaced_coordinates'.
+        """
+
+        chunk = max(1, maxbytes // max(1, 6 * self.coordinates.nbytes))
+        for first in range(0, self.nat, chunk):
+            yield first, self.displaced_coordinates(
+                fdiff, first, min(first + chunk, self.nat)
+            )
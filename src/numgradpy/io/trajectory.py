@@ -0,0 +1,240 @@
+"""
+Random access to the frames of (large) multi-frame XYZ files.
+
+The byte offsets of all frames are determined once by a chunked, vectorised
+scan for line breaks and stored in an index file next to the trajectory.
+Single frames are then sliced directly out of a memory-mapped buffer, so
+looking up one frame does not require reading the whole trajectory.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from collections.abc import Iterator
+from types import TracebackType
+
+import numpy as np
+import numpy.typing as npt
+
+from ..constants import AA2AU
+from .structure import Structure, parse_atom_block, parse_xyz_comment
+
+INDEX_VERSION = 1
+"""Version of the index file layout."""
+
+INDEX_SUFFIX = ".idx.npy"
+"""Suffix appended to the trajectory file name for the cached index."""
+
+SCAN_CHUNK = 2**26
+"""Number of bytes scanned for line breaks at once while indexing."""
+
+
+def build_xyz_index(buffer: mmap.mmap | bytes) -> npt.NDArray[np.int64]:
+    """
+    Determine the byte offsets of all frames in a multi-frame XYZ buffer.
+
+    Parameters
+    ----------
+    buffer : mmap.mmap | bytes
+        Content of the trajectory file.
+
+    Returns
+    -------
+    offsets : np.ndarray
+        Array of length nframes + 1; frame i spans the bytes
+        offsets[i]:offsets[i + 1].
+    """
+
+    size = len(buffer)
+    offsets: list[int] = []
+    # line number of the next frame header and start of the line before it
+    target = 0
+    prevnl = -1
+    base = 0  # number of line breaks in all previous chunks
+    for chunkstart in range(0, max(size, 1), SCAN_CHUNK):
+        count = min(SCAN_CHUNK, size - chunkstart)
+        chunk = np.frombuffer(buffer, dtype=np.uint8, count=count, offset=chunkstart)
+        newlines = np.flatnonzero(chunk == 10) + chunkstart
+        if chunkstart + count >= size and size > 0 and buffer[size - 1] != 10:
+            # treat the end of the file as the end of the last line
+            newlines = np.append(newlines, size)
+
+        # process all headers whose line is complete in this chunk
+        while target < base + len(newlines):
+            if target == 0:
+                start = 0
+            elif target - 1 >= base:
+                start = int(newlines[target - 1 - base]) + 1
+            else:
+                start = prevnl + 1
+            header = bytes(buffer[start : int(newlines[target - base])]).split()
+            if not header:
+                # trailing empty lines terminate the trajectory
+                target = -1
+                break
+            offsets.append(start)
+            target += int(header[0]) + 2
+
+        if target < 0:
+            break
+        base += len(newlines)
+        if len(newlines) > 0:
+            prevnl = int(newlines[-1])
+
+    if target > base:
+        raise ValueError("Last frame of the trajectory is incomplete.")
+
+    if not offsets:
+        return np.zeros((1), dtype=np.int64)
+    if target < 0:
+        end = start
+    elif target == 0:
+        end = 0
+    else:
+        end = min(prevnl + 1, size)
+    return np.array(offsets + [end], dtype=np.int64)
+
+
+class XYZTrajectory:
+    """
+    Random access to the frames of a multi-frame XYZ file.
+    """
+
+    def __init__(self, filename: str, cache: bool = True) -> None:
+        """
+        Open the trajectory and load or build its frame index.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the multi-frame XYZ file.
+        cache : bool
+            Read and write the index file '<filename>.idx.npy'.
+        """
+
+        self.filename = filename
+        self.indexfile = filename + INDEX_SUFFIX
+        with open(filename, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self._mm: mmap.mmap | None = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if stat.st_size > 0
+                else None
+            )
+        self._stamp = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+
+        offsets = self._load_index() if cache else None
+        if offsets is None:
+            offsets = build_xyz_index(self._mm if self._mm is not None else b"")
+            if cache:
+                self._save_index(offsets)
+        self.offsets: npt.NDArray[np.int64] = offsets
+
+    def _load_index(self) -> npt.NDArray[np.int64] | None:
+        """
+        Load the cached index if it belongs to the current file content.
+        """
+
+        try:
+            data = np.load(self.indexfile)
+        except (OSError, ValueError):
+            return None
+        if data.ndim != 1 or len(data) < 4 or tuple(data[:3]) != self._stamp:
+            return None
+        return data[3:].astype(np.int64)
+
+    def _save_index(self, offsets: npt.NDArray[np.int64]) -> None:
+        """
+        Store the index next to the trajectory (silently skipped if the
+        directory is not writable).
+        """
+
+        data = np.concatenate([np.array(self._stamp, dtype=np.int64), offsets])
+        try:
+            with open(self.indexfile, "wb") as file:
+                np.save(file, data)
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Structure:
+        return self.read_frame(index)
+
+    def __iter__(self) -> Iterator[Structure]:
+        for index in range(len(self)):
+            yield self.read_frame(index)
+
+    def __enter__(self) -> XYZTrajectory:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the memory-mapped buffer.
+        """
+
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def frame_text(self, index: int) -> str:
+        """
+        Return the raw text of a single frame.
+
+        Parameters
+        ----------
+        index : int
+            Index of the frame (negative values count from the end).
+
+        Returns
+        -------
+        text : str
+            Complete XYZ block of the frame.
+        """
+
+        nframes = len(self)
+        if index < 0:
+            index += nframes
+        if index < 0 or index >= nframes:
+            raise IndexError("Frame index out of range.")
+        if self._mm is None:
+            raise ValueError("Trajectory file has been closed.")
+
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self._mm[start:end].decode("UTF-8")
+
+    def read_frame(self, index: int) -> Structure:
+        """
+        Read a single frame into a Structure object.
+
+        Parameters
+        ----------
+        index : int
+            Index of the frame (negative values count from the end).
+
+        Returns
+        -------
+        struc : Structure
+            Structure of the frame in atomic units.
+        """
+
+        lines = self.frame_text(index).splitlines()
+        nat = int(lines[0].split()[0])
+        atoms, coordinates = parse_atom_block(lines[2 : 2 + nat], nat)
+
+        struc = Structure()
+        struc.filename = self.filename
+        struc.filetype = "xyz"
+        struc.set_metadata(parse_xyz_comment(lines[1]))
+        struc.set_structure(atoms, coordinates * AA2AU)
+        return struc
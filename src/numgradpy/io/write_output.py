@@ -4,12 +4,68 @@ Module to write energy and gradient to a file.
 
 from __future__ import annotations
 
+import os
+import re
+
 import numpy as np
 import numpy.typing as npt
 
 from ..io import Structure
 
 
+def format_block(
+    values: npt.ArrayLike, rowformat: str, labels: list[str] | None = None
+) -> str:
+    """
+    Format a two-dimensional block of numbers with one format operation.
+
+    Parameters
+    ----------
+    values : npt.ArrayLike
+        Block of shape (rows, columns).
+    rowformat : str
+        %-format of one row (with one more field if 'labels' are given).
+    labels : list[str] | None
+        Label at the end of every row, e.g. the element symbols.
+
+    Returns
+    -------
+    block : str
+        Formatted rows, each terminated by a newline.
+    """
+
+    block = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if block.size == 0:
+        return ""
+    if labels is not None:
+        block = np.column_stack((block.astype(object), labels))
+    return ((rowformat + "\n") * block.shape[0]) % tuple(block.ravel().tolist())
+
+
+def write_atomic(text: str, outfile: str) -> None:
+    """
+    Write a file under a temporary name and rename it, so that readers
+    (e.g. an external optimiser) never see a partially written file.
+
+    Parameters
+    ----------
+    text : str
+        Full content of the file.
+    outfile : str
+        Name of the output file.
+    """
+
+    partial = outfile + ".part"
+    try:
+        with open(partial, "w", encoding="UTF-8") as f:
+            f.write(text)
+        os.replace(partial, outfile)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
 def write_tm_energy(energy: float, outfile: str) -> None:
     """
     Write the energy to a file.
@@ -22,15 +78,29 @@ def write_tm_energy(energy: float, outfile: str) -> None:
         Name of the output file.
     """
 
-    with open(outfile, "w", encoding="UTF-8") as f:
-        print("$energy      SCF               SCFKIN            SCFPOT", file=f)
-        print(f"     1 {energy:.12f}", file=f)
-        print("$end", file=f)
+    write_atomic(
+        "$energy      SCF               SCFKIN            SCFPOT\n"
+        f"     1 {energy:.12f}\n"
+        "$end\n",
+        outfile,
+    )
+
+
+def gradient_cycles(text: str) -> int:
+    """
+    Number of cycles in the '$grad' group of a Turbomole gradient file.
+    """
+
+    return len(re.findall(r"^\s*cycle\s*=", text, flags=re.MULTILINE))
 
 
 def write_tm_gradient(
-    gradient: npt.NDArray[np.float64], sp_energy: float, struc: Structure, outfile: str
-) -> None:
+    gradient: npt.NDArray[np.float64],
+    sp_energy: float,
+    struc: Structure,
+    outfile: str,
+    append: bool = False,
+) -> int:
     """
     Write the gradient to a file.
 
@@ -44,34 +114,44 @@ def write_tm_gradient(
         Structure object.
     outfile : str
         Name of the output file.
+    append : bool
+        Keep the cycles of an existing file and add this one as the next
+        cycle, as Turbomole-style optimisers expect.
+
+    Returns
+    -------
+    cycle : int
+        Number of the written cycle.
     """
 
+    previous = ""
+    if append and os.path.exists(outfile):
+        with open(outfile, encoding="UTF-8") as f:
+            previous = f.read()
+        if "$grad" not in previous:
+            previous = ""
+        # the new cycle goes before the closing '$end'
+        previous = re.sub(r"^\$end\b.*\Z", "", previous, flags=re.MULTILINE | re.S)
+    cycle = gradient_cycles(previous) + 1
+    if not previous:
+        previous = "$grad        cartesian gradients\n"
+
     # calculate |dE/dxyz| of the gradient (norm of the gradient)
     # as a single number for the full gradient
     norm = np.linalg.norm(gradient)
 
-    with open(outfile, "w", encoding="UTF-8") as f:
-        print("$grad        cartesian gradients", file=f)
-        print(
-            f"  cycle = 1   SCF energy = {sp_energy:16.10f} \
-|dE/dxyz| = {norm:16.10f}",
-            file=f,
+    write_atomic(
+        previous
+        + f"  cycle = {cycle}   SCF energy = {sp_energy:16.10f} \
+|dE/dxyz| = {norm:16.10f}\n"
+        + format_block(
+            struc.coordinates[: struc.nat], "%18.12f %18.12f %18.12f %s", struc.atoms
         )
-        for i in range(struc.nat):
-            print(
-                f"{struc.coordinates[i, 0]:18.12f} \
-{struc.coordinates[i, 1]:18.12f} \
-{struc.coordinates[i, 2]:18.12f} {struc.atoms[i]}",
-                file=f,
-            )
-        for i in range(gradient.shape[0]):
-            print(
-                f"{gradient[i, 0]:18.12f} \
-{gradient[i, 1]:18.12f} \
-{gradient[i, 2]:18.12f}",
-                file=f,
-            )
-        print("$end", file=f)
+        + format_block(gradient, "%18.12f %18.12f %18.12f")
+        + "$end\n",
+        outfile,
+    )
+    return cycle
 
 
 def write_dipole(dipole: npt.NDArray[np.float64], outfile: str) -> None:
@@ -86,12 +166,7 @@ def write_dipole(dipole: npt.NDArray[np.float64], outfile: str) -> None:
         Name of the output file.
     """
 
-    with open(outfile, "w", encoding="UTF-8") as f:
-        print("$dipole", file=f)
-        print(
-            f"{dipole[0]:18.12f} {dipole[1]:18.12f} {dipole[2]:18.12f}",
-            file=f,
-        )
+    write_atomic("$dipole\n" + format_block(dipole, "%18.12f %18.12f %18.12f"), outfile)
 
 
 def write_polarizability(polarizability: npt.NDArray[np.float64], outfile: str) -> None:
@@ -106,23 +181,133 @@ def write_polarizability(polarizability: npt.NDArray[np.float64], outfile: str)
         Name of the output file.
     """
 
-    with open(outfile, "w", encoding="UTF-8") as f:
-        print("$polarizability", file=f)
-        print(
-            f"{polarizability[0,0]:18.12f} \
-{polarizability[0,1]:18.12f} \
-{polarizability[0,2]:18.12f}",
-            file=f,
-        )
-        print(
-            f"{polarizability[1,0]:18.12f} \
-{polarizability[1,1]:18.12f} \
-{polarizability[1,2]:18.12f}",
-            file=f,
-        )
-        print(
-            f"{polarizability[2,0]:18.12f} \
-{polarizability[2,1]:18.12f} \
-{polarizability[2,2]:18.12f}",
-            file=f,
+    write_atomic(
+        "$polarizability\n" + format_block(polarizability, "%18.12f %18.12f %18.12f"),
+        outfile,
+    )
+
+
+def write_directional_derivatives(
+    derivatives: npt.NDArray[np.float64], outfile: str
+) -> None:
+    """
+    Write the energy derivatives along displacement vectors to a file.
+
+    Parameters
+    ----------
+    derivatives : npt.NDArray[np.float64]
+        Derivatives along the normalised vectors in Hartree/Bohr.
+    outfile : str
+        Name of the output file.
+    """
+
+    indices = np.arange(1, derivatives.shape[0] + 1)
+    write_atomic(
+        "$dirgrad          directional derivatives\n"
+        + format_block(np.column_stack((indices, derivatives)), "%6d %20.10f")
+        + "$end\n",
+        outfile,
+    )
+
+
+def write_hyperpolarizability(
+    tensor: npt.NDArray[np.float64], outfile: str, name: str = "beta"
+) -> None:
+    """
+    Write a hyperpolarizability tensor to a file.
+
+    Parameters
+    ----------
+    tensor : npt.NDArray[np.float64]
+        Tensor of shape (3, 3, 3) (beta) or (3, 3, 3, 3) (gamma) in atomic
+        units, written with three values per line in C order.
+    outfile : str
+        Name of the output file.
+    name : str
+        Name of the tensor in the header.
+    """
+
+    write_atomic(
+        f"$hyperpolarizability {name}\n"
+        + format_block(tensor.reshape(-1, 3), "%18.12f %18.12f %18.12f"),
+        outfile,
+    )
+
+
+def write_tm_hessian(hessian: npt.NDArray[np.float64], outfile: str) -> None:
+    """
+    Write the Cartesian Hessian to a file in Turbomole format.
+
+    Parameters
+    ----------
+    hessian : npt.NDArray[np.float64]
+        Hessian of shape (3N, 3N) in Hartree/Bohr^2.
+    outfile : str
+        Name of the output file.
+    """
+
+    # five entries per line, labelled with row and line number; the row
+    # number is inserted in front of the entries of every line
+    nrows, ncols = hessian.shape
+    starts = np.arange(0, ncols, 5)
+    rowformat = "\n".join(
+        f"%4d{k // 5 + 1:3d}" + "%15.10f" * min(5, ncols - k) for k in starts
+    )
+    labelled = np.insert(hessian, starts, np.arange(1, nrows + 1)[:, None], axis=1)
+    write_atomic("$hessian\n" + format_block(labelled, rowformat) + "$end\n", outfile)
+
+
+def write_tm_dipgrad(dipgrad: npt.NDArray[np.float64], outfile: str) -> None:
+    """
+    Write the Cartesian dipole derivatives to a file in Turbomole format.
+
+    Parameters
+    ----------
+    dipgrad : npt.NDArray[np.float64]
+        Derivatives dmu/dR of shape (3N, 3) in atomic units, one line per
+        Cartesian coordinate with the x, y and z components of the dipole.
+    outfile : str
+        Name of the output file.
+    """
+
+    write_atomic(
+        "$dipgrad          cartesian dipole gradients\n"
+        + format_block(dipgrad, "%20.10f%20.10f%20.10f")
+        + "$end\n",
+        outfile,
+    )
+
+
+def write_tm_vibspectrum(
+    frequencies: npt.NDArray[np.float64],
+    outfile: str,
+    irintensities: npt.NDArray[np.float64] | None = None,
+) -> None:
+    """
+    Write harmonic frequencies to a file in Turbomole 'vibspectrum' format.
+
+    Parameters
+    ----------
+    frequencies : npt.NDArray[np.float64]
+        Wavenumbers of the vibrational modes in cm^-1.
+    outfile : str
+        Name of the output file.
+    irintensities : npt.NDArray[np.float64] | None
+        IR intensities in km/mol (written as zero if not given).
+    """
+
+    if irintensities is None:
+        irintensities = np.zeros_like(frequencies)
+
+    modes = np.arange(1, frequencies.shape[0] + 1)
+    write_atomic(
+        "$vibrational spectrum\n"
+        "#  mode     symmetry     wave number   IR intensity\n"
+        "#                         cm**(-1)        km/mol\n"
+        + format_block(
+            np.column_stack((modes, frequencies, irintensities)),
+            "%6d        a%18.2f%16.5f",
         )
+        + "$end\n",
+        outfile,
+    )
@@ -0,0 +1,9 @@
+"""
+Geometry optimisation
+=====================
+
+This module contains the optimisation algorithms that are used by the
+'optimize' subcommand.
+"""
+
+from .rfo import ConvergenceCriteria, RFOptimizer
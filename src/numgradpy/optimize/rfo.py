@@ -0,0 +1,152 @@
+"""
+Rational function optimisation (RFO) in Cartesian coordinates with a
+BFGS update of the Hessian, which is kept between the steps.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+
+@dataclass(frozen=True)
+class ConvergenceCriteria:
+    """
+    Convergence thresholds in atomic units (defaults as in ORCA).
+    """
+
+    energy: float = 5e-6
+    rmsgrad: float = 1e-4
+    maxgrad: float = 3e-4
+    rmsstep: float = 2e-3
+    maxstep: float = 4e-3
+
+
+class RFOptimizer:
+    """
+    Rational function optimiser with BFGS Hessian update and trust radius.
+    """
+
+    def __init__(
+        self,
+        ncart: int,
+        trustradius: float = 0.3,
+        hessian: npt.NDArray[np.float64] | None = None,
+        criteria: ConvergenceCriteria | None = None,
+    ) -> None:
+        """
+        Set up the optimiser.
+
+        Parameters
+        ----------
+        ncart : int
+            Number of Cartesian coordinates (3N).
+        trustradius : float
+            Maximum norm of a step in Bohr.
+        hessian : np.ndarray | None
+            Initial Hessian (default: 0.5 * identity in Hartree/Bohr^2).
+        criteria : ConvergenceCriteria | None
+            Convergence thresholds.
+        """
+
+        self.trustradius = trustradius
+        self.hessian = 0.5 * np.eye(ncart) if hessian is None else hessian.copy()
+        self.criteria = criteria if criteria is not None else ConvergenceCriteria()
+        self.coords: npt.NDArray[np.float64] | None = None
+        self.gradient: npt.NDArray[np.float64] | None = None
+        self.energy: float | None = None
+        self.laststep = np.zeros((ncart), dtype=np.float64)
+
+    def update_hessian(
+        self, coords: npt.NDArray[np.float64], gradient: npt.NDArray[np.float64]
+    ) -> None:
+        """
+        BFGS update with the change of coordinates and gradient since the
+        previous step (skipped if the curvature condition is violated).
+        """
+
+        if self.coords is None or self.gradient is None:
+            return
+        s = coords - self.coords
+        y = gradient - self.gradient
+        sy = s @ y
+        hs = self.hessian @ s
+        shs = s @ hs
+        if sy > 1e-10 and shs > 1e-10:
+            self.hessian += np.outer(y, y) / sy - np.outer(hs, hs) / shs
+
+    def step(
+        self,
+        coords: npt.NDArray[np.float64],
+        energy: float,
+        gradient: npt.NDArray[np.float64],
+    ) -> npt.NDArray[np.float64]:
+        """
+        Take one optimisation step.
+
+        Parameters
+        ----------
+        coords : np.ndarray
+            Current coordinates in Bohr (any shape, flattened internally).
+        energy : float
+            Current energy in Hartree.
+        gradient : np.ndarray
+            Current gradient in Hartree/Bohr (same shape as coords).
+
+        Returns
+        -------
+        newcoords : np.ndarray
+            Coordinates of the next step (same shape as coords).
+        """
+
+        x = coords.ravel().astype(np.float64)
+        g = gradient.ravel().astype(np.float64)
+        self.update_hessian(x, g)
+
+        # lowest eigenvector of the augmented Hessian gives the RFO step
+        n = len(x)
+        augmented = np.zeros((n + 1, n + 1), dtype=np.float64)
+        augmented[:n, :n] = self.hessian
+        augmented[:n, n] = g
+        augmented[n, :n] = g
+        _, eigvecs = np.linalg.eigh(augmented)
+        vec = eigvecs[:, 0]
+        if abs(vec[n]) > 1e-8:
+            dx = vec[:n] / vec[n]
+        else:
+            dx = -g
+        norm = np.linalg.norm(dx)
+        if norm > self.trustradius:
+            dx *= self.trustradius / norm
+
+        self.coords, self.gradient = x, g
+        self.laststep = dx
+        self.energy = energy
+        return (x + dx).reshape(coords.shape)
+
+    def converged(
+        self, energychange: float | None, gradient: npt.NDArray[np.float64]
+    ) -> bool:
+        """
+        Check the convergence with the energy change of the last step, the
+        current gradient and the step that was taken last.
+        """
+
+        crit = self.criteria
+        g = gradient.ravel()
+        if len(g) == 0:
+            return True
+        gradok = (
+            np.sqrt(np.mean(g**2)) < crit.rmsgrad and np.max(np.abs(g)) < crit.maxgrad
+        )
+        stepok = (
+            np.sqrt(np.mean(self.laststep**2)) < crit.rmsstep
+            and np.max(np.abs(self.laststep)) < crit.maxstep
+        )
+        energyok = energychange is not None and abs(energychange) < crit.energy
+        # a very small gradient is sufficient on its own
+        return bool(
+            (gradok and (stepok or energyok)) or np.max(np.abs(g)) < 0.1 * crit.maxgrad
+        )
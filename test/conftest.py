@@ -2,9 +2,126 @@
 Setup for pytest.
 """
 
-import numpy as np
+from __future__ import annotations
+
+import os
+import stat
+import sys
+from pathlib import Path
 
-# import pytest
+import numpy as np
+import pytest
 
 np.random.seed(0)
 np.set_printoptions(precision=16)
+
+
+FAKE_QVSZP = """\
+import sys
+
+args = sys.argv[1:]
+struc = args[args.index("--struc") + 1]
+outname = args[args.index("--outname") + 1]
+efield = ["0.0", "0.0", "0.0"]
+if "--efield" in args:
+    i = args.index("--efield")
+    efield = args[i + 1 : i + 4]
+with open(struc, encoding="UTF-8") as f:
+    lines = f.readlines()
+nat = int(lines[0].split()[0])
+with open(outname + ".inp", "w", encoding="UTF-8") as f:
+    f.write("! fake\\n")
+    f.write("%scf\\n efield " + ", ".join(efield) + "\\nend\\n")
+    f.write("* xyz 0 1\\n")
+    f.writelines(lines[2 : 2 + nat])
+    f.write("*\\n")
+print("fake qvSZP", " ".join(args))
+"""
+
+FAKE_ORCA = """\
+import sys
+
+import numpy as np
+
+AA2AU = 1.8897261246204404
+inp = sys.argv[1]
+base = inp[: -len(".inp")]
+with open(inp, encoding="UTF-8") as f:
+    lines = f.readlines()
+efield = np.zeros(3)
+coords = []
+atoms = []
+inxyz = False
+for line in lines:
+    if line.strip().startswith("efield"):
+        efield = np.array(line.split("efield")[1].replace(",", " ").split(), float)
+    elif line.startswith("* xyz"):
+        inxyz = True
+    elif line.startswith("*"):
+        inxyz = False
+    elif inxyz:
+        if line.split()[0] == "X":
+            sys.exit("fake ORCA cannot handle dummy atoms")
+        atoms.append(line.split()[0])
+        coords.append([float(x) for x in line.split()[1:4]])
+coords = np.array(coords) * AA2AU
+# helium atoms need damping to converge
+keywords = " ".join(line for line in lines if line.startswith("!"))
+if "He" in atoms and "SlowConv" not in keywords:
+    print("SCF NOT CONVERGED AFTER 125 CYCLES")
+    sys.exit(0)
+# E(R, F) = 0.1 |R|^2 - F . d0(R) - 0.5 * ALPHA * |F|^2 with d0 = 0.05 * sum(R)
+dip0 = 0.05 * coords.sum(axis=0)
+energy = 0.1 * (coords**2).sum() - efield @ dip0 - 0.5 * 2.0 * efield @ efield
+dipole = dip0 + 2.0 * efield
+print("FINAL SINGLE POINT ENERGY     %.14f" % energy)
+if any(line.strip().lower().startswith("polar") for line in lines):
+    print("THE POLARIZABILITY TENSOR")
+    print("-------------------------")
+    print("The raw cartesian tensor (atomic units):")
+    for row in 2.0 * np.eye(3):
+        print("  %12.6f %12.6f %12.6f" % tuple(row))
+with open(base + "_property.txt", "w", encoding="UTF-8") as f:
+    f.write("Total Dipole moment\\n\\n")
+    for i, x in enumerate(dipole):
+        f.write("%d %.14f\\n" % (i, x))
+if any(line.startswith("!") and "EnGrad" in line for line in lines):
+    gradient = 0.2 * coords - 0.05 * efield
+    with open(base + ".engrad", "w", encoding="UTF-8") as f:
+        f.write("#\\n# Number of atoms\\n#\\n %d\\n" % len(coords))
+        f.write("#\\n# The current total energy in Eh\\n#\\n %.12f\\n" % energy)
+        f.write("#\\n# The current gradient in Eh/bohr\\n#\\n")
+        f.writelines(" %.12f\\n" % x for x in gradient.ravel())
+        f.write("#\\n# The atomic numbers and current coordinates in Bohr\\n#\\n")
+open(base + ".gbw", "a", encoding="UTF-8").close()
+"""
+
+
+@pytest.fixture
+def fake_binaries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    Provide fake 'qvSZP' and 'orca' executables with an analytical model
+    energy E(R, F) = 0.1 |R|^2 - F . 0.05 sum(R) - |F|^2 in a temporary
+    working directory. The fake ORCA writes the dipole moment to the
+    property file and, for 'EnGrad' inputs, the gradient to '.engrad'.
+    With '%elprop Polar 1', the polarizability is printed to the output.
+    Inputs with dummy atoms (X) fail, and the SCF of inputs with helium
+    atoms only converges with 'SlowConv'.
+    """
+
+    if sys.platform == "win32":
+        pytest.skip("The fake executables are scripts with a shebang line.")
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    for name, source in (("qvSZP", FAKE_QVSZP), ("orca", FAKE_ORCA)):
+        exe = bindir / name
+        exe.write_text(f"#!{sys.executable}\n" + source, encoding="UTF-8")
+        exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.setenv("PATH", str(bindir) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("LD_LIBRARY_PATH", os.environ.get("LD_LIBRARY_PATH", ""))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(workdir)
+    return workdir
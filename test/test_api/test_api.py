@@ -0,0 +1,115 @@
+"""
+Test the re-entrant library interface with fake binaries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import numgradpy
+from numgradpy import (
+    GradientEngine,
+    GradientSettings,
+    compute_gradient,
+    compute_gradient_async,
+)
+from numgradpy.constants import AA2AU
+from numgradpy.io import Structure
+
+
+def test_compute_gradient(
+    fake_binaries: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+    environ = dict(os.environ)
+    # neither the PATH nor the working directory of the process are used
+    monkeypatch.setenv("PATH", os.defpath)
+    monkeypatch.chdir(tmp_path)
+
+    settings = GradientSettings(
+        str(tmp_path / "calc"), step=1e-3, nprocs=3, environ=environ
+    )
+    result = compute_gradient(str(fake_binaries / "h2.xyz"), settings)
+
+    assert pytest.approx(0.2 * coords, abs=1e-6) == result.gradient
+    assert pytest.approx(0.1 * (coords**2).sum(), abs=1e-10) == result.energy
+    assert result.dipole is not None and result.dipgrad is not None
+    assert pytest.approx(0.05 * coords.sum(axis=0), abs=1e-8) == result.dipole
+    expected = np.tile(0.05 * np.eye(3), (2, 1))
+    assert pytest.approx(expected, abs=1e-6) == result.dipgrad
+    assert (tmp_path / "calc" / "numdiff_2_6.xyz").exists()
+    assert not (tmp_path / "eq.xyz").exists()
+    assert os.getcwd() == str(tmp_path)
+    assert os.environ["PATH"] == os.defpath
+
+
+def test_concurrent_calculations(fake_binaries: Path, tmp_path: Path) -> None:
+    strucs = []
+    for n in range(3):
+        struc = Structure()
+        (fake_binaries / f"h2_{n}.xyz").write_text(
+            f"2\n\nH 0.0 0.0 0.{n}\nH 0.0 0.2 0.84\n"
+        )
+        struc.read(str(fake_binaries / f"h2_{n}.xyz"))
+        strucs.append(struc)
+
+    async def run_all() -> list[np.ndarray]:
+        results = await asyncio.gather(
+            *[
+                compute_gradient_async(
+                    struc,
+                    GradientSettings(str(tmp_path / f"calc{n}"), step=1e-3, nprocs=2),
+                )
+                for n, struc in enumerate(strucs)
+            ]
+        )
+        return [result.gradient for result in results]
+
+    for struc, gradient in zip(strucs, asyncio.run(run_all())):
+        assert pytest.approx(0.2 * struc.coordinates, abs=1e-6) == gradient
+
+
+def test_engine_images(fake_binaries: Path, tmp_path: Path) -> None:
+    strucs = []
+    for n in range(2):
+        (fake_binaries / f"h2_{n}.xyz").write_text(
+            f"2\n\nH 0.0 0.0 0.{n + 1}\nH 0.0 0.2 0.84\n"
+        )
+        struc = Structure()
+        struc.read(str(fake_binaries / f"h2_{n}.xyz"))
+        strucs.append(struc)
+
+    settings = GradientSettings(str(tmp_path / "band"), step=1e-3, nprocs=4)
+    with GradientEngine(settings) as engine:
+        results = engine.compute(strucs, polarizability=True)
+        for struc, result in zip(strucs, results):
+            assert pytest.approx(0.2 * struc.coordinates, abs=1e-6) == result.gradient
+            assert pytest.approx(2.0 * np.eye(3)) == result.alpha
+        assert [os.path.basename(r.workdir) for r in results] == ["000", "001"]
+
+        # the next step of an image starts from its orbitals
+        again = engine.compute(strucs[:1], labels=["001"])
+        assert again[0].workdir == results[1].workdir
+        assert again[0].alpha is None
+        assert (tmp_path / "band" / "001" / "eq.gbw").exists()
+
+
+def test_lazy_import() -> None:
+    # the command line does not pay for the import of the library interface
+    code = (
+        "import sys, numgradpy; "
+        "assert 'numgradpy.api' not in sys.modules and 'numpy' not in sys.modules; "
+        "numgradpy.GradientSettings; "
+        "assert 'numgradpy.api' in sys.modules"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(numgradpy.__file__))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
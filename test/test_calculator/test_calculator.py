@@ -0,0 +1,95 @@
+"""
+Test the ASE calculator with fake binaries (requires the optional 'ase').
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy import GradientSettings
+from numgradpy.constants import AA2AU, AU2EV
+
+ase = pytest.importorskip("ase")
+
+# pylint: disable-next=wrong-import-position
+from numgradpy.calculator import NumGradPyCalculator  # noqa: E402
+
+
+def test_calculator(fake_binaries: Path, tmp_path: Path) -> None:
+    atoms = ase.Atoms("H2", positions=[[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]])
+    calc = NumGradPyCalculator(GradientSettings(str(tmp_path / "calc"), step=1e-3))
+    atoms.calc = calc
+
+    coords = atoms.get_positions() * AA2AU
+    forces = atoms.get_forces()
+    assert pytest.approx(-0.2 * coords * AU2EV * AA2AU, abs=1e-4) == forces
+    assert (
+        pytest.approx(0.1 * (coords**2).sum() * AU2EV) == atoms.get_potential_energy()
+    )
+    assert pytest.approx(0.05 * coords.sum(axis=0) / AA2AU) == atoms.get_dipole_moment()
+    alpha = calc.get_property("polarizability", atoms)
+    assert pytest.approx(2.0 * np.eye(3) / AA2AU**2 / AU2EV) == alpha
+
+    # a moved geometry is recalculated in the same directory
+    atoms.positions[0, 2] += 0.05
+    assert (
+        pytest.approx(-0.2 * atoms.get_positions() * AA2AU * AU2EV * AA2AU, abs=1e-4)
+        == atoms.get_forces()
+    )
+    calc.close()
+
+
+def test_requested_properties(fake_binaries: Path, tmp_path: Path) -> None:
+    atoms = ase.Atoms("H2", positions=[[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]])
+    workdir = tmp_path / "calc"
+    calc = NumGradPyCalculator(
+        GradientSettings(str(workdir), step=1e-3), polarizability=True
+    )
+    atoms.calc = calc
+
+    # the energy needs no displacements
+    coords = atoms.get_positions() * AA2AU
+    assert (
+        pytest.approx(0.1 * (coords**2).sum() * AU2EV) == atoms.get_potential_energy()
+    )
+    assert not list(workdir.glob("numdiff_*"))
+
+    # the polarizability comes with the forces, without another calculation
+    atoms.get_forces()
+    assert list(workdir.glob("numdiff_*.out"))
+    stamp = (workdir / "eq.out").stat().st_mtime_ns
+    alpha = calc.get_property("polarizability", atoms)
+    assert pytest.approx(2.0 * np.eye(3) / AA2AU**2 / AU2EV) == alpha
+    assert (workdir / "eq.out").stat().st_mtime_ns == stamp
+    calc.close()
+
+    # without the parameter, forces come without the CP-SCF
+    atoms.calc = NumGradPyCalculator(GradientSettings(str(tmp_path / "forces")))
+    atoms.get_forces()
+    assert "Polar" not in (tmp_path / "forces" / "eq.inp").read_text()
+    atoms.calc.close()
+
+
+def test_band(fake_binaries: Path, tmp_path: Path) -> None:
+    images = [
+        ase.Atoms("H2", positions=[[0.0, 0.0, 0.1 * n], [0.0, 0.2, 0.84]])
+        for n in range(3)
+    ]
+    engine = NumGradPyCalculator.attach_band(
+        images, GradientSettings(str(tmp_path / "band"), step=1e-3)
+    )
+
+    images[0].get_forces()
+    # all images were calculated with the first request
+    for n, atoms in enumerate(images):
+        assert "forces" in atoms.calc.results
+        assert (tmp_path / "band" / f"{n:03d}" / "eq.out").exists()
+    for atoms in images:
+        coords = atoms.get_positions() * AA2AU
+        assert (
+            pytest.approx(-0.2 * coords * AU2EV * AA2AU, abs=1e-4) == atoms.get_forces()
+        )
+    engine.close()
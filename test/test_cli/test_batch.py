@@ -0,0 +1,100 @@
+"""
+Test the batch subcommand with fake binaries.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.cli import console_entry_point
+from numgradpy.constants import AA2AU
+from numgradpy.io import ResultsStore
+
+
+def test_batch_trajectory(fake_binaries: Path) -> None:
+    frames = []
+    for shift in (0.0, 0.5, 1.0):
+        frames.append(f"2\n\nH 0.0 0.0 {shift}\nH 0.0 0.0 {shift + 0.74}\n")
+    (fake_binaries / "traj.xyz").write_text("".join(frames), encoding="UTF-8")
+
+    console_entry_point(
+        ["batch", "-b", "qvSZP", "-i", "traj.xyz", "-g", "-d", "-a", "-n", "2"]
+        + ["-f", "1e-3", "--maxstructures", "2"]
+    )
+
+    lines = (fake_binaries / "numgradpy_batch.jsonl").read_text().splitlines()
+    records = sorted((json.loads(line) for line in lines), key=lambda r: r["index"])
+    assert len(records) == 3
+    for record, shift in zip(records, (0.0, 0.5, 1.0)):
+        assert "error" not in record
+        coords = np.array([[0.0, 0.0, shift], [0.0, 0.0, shift + 0.74]]) * AA2AU
+        assert pytest.approx(0.2 * coords, abs=1e-6) == np.array(record["gradient"])
+        assert pytest.approx(0.05 * np.tile(np.eye(3), (2, 1)), abs=1e-6) == (
+            np.array(record["dipgrad"])
+        )
+        assert pytest.approx(0.05 * coords.sum(axis=0), abs=1e-6) == record["dipole"]
+        assert pytest.approx(2.0 * np.eye(3), abs=1e-6) == np.array(record["alpha"])
+
+
+def test_batch_failure_is_isolated(fake_binaries: Path) -> None:
+    (fake_binaries / "good.xyz").write_text("1\n\nHe 0.0 0.0 0.0\n")
+    (fake_binaries / "bad.xyz").write_text("1\n\nX 0.0 0.0 0.0\n")
+    (fake_binaries / "list.txt").write_text("good.xyz\nbad.xyz\n")
+    # the fake ORCA fails for dummy atoms
+    console_entry_point(["batch", "-b", "qvSZP", "-i", "list.txt", "-g", "-n", "2"])
+    lines = (fake_binaries / "numgradpy_batch.jsonl").read_text().splitlines()
+    records = {record["structure"]: record for record in map(json.loads, lines)}
+    assert "error" not in records["good.xyz"]
+    assert len(records["good.xyz"]["gradient"]) == 1
+    assert "error" in records["bad.xyz"]
+
+
+def test_batch_cpscf(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+    console_entry_point(["batch", "-b", "qvSZP", "-i", "h2.xyz", "-a", "cpscf"])
+    (record,) = map(
+        json.loads, (fake_binaries / "numgradpy_batch.jsonl").read_text().splitlines()
+    )
+    assert pytest.approx(2.0 * np.eye(3)) == np.array(record["alpha"])
+    # the equilibrium calculation is the only single point
+    outputs = (fake_binaries / "numgradpy_batch" / "000000").glob("*.out")
+    assert sorted(path.name for path in outputs) == ["eq.out", "qvSZP_eq.out"]
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        ["--hessian"],
+        ["--beta"],
+        ["-a", "numdiff"],
+        ["-g", "analytic"],
+        ["--agents", "localhost:0"],
+    ],
+)
+def test_batch_unsupported(fake_binaries: Path, option: list[str]) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+    with pytest.raises(ValueError, match="Batch mode"):
+        console_entry_point(["batch", "-b", "qvSZP", "-i", "h2.xyz"] + option)
+
+
+def test_batch_store_closed(
+    fake_binaries: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+    (fake_binaries / "list.txt").write_text("h2.xyz\nmissing.xyz\n")
+    closed = []
+    close = ResultsStore.close
+
+    def record_close(store: ResultsStore) -> None:
+        closed.append(store.path)
+        close(store)
+
+    monkeypatch.setattr(ResultsStore, "close", record_close)
+    # the store is closed although the batch stops at the missing structure
+    with pytest.raises(FileNotFoundError):
+        console_entry_point(["batch", "-b", "qvSZP", "-i", "list.txt", "--store", "r"])
+    assert closed == ["r"]
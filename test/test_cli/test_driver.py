@@ -0,0 +1,465 @@
+"""
+Test single runs of the driver with fake binaries.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.cli import console_entry_point
+from numgradpy.constants import AA2AU, AU2KMMOL
+from numgradpy.io import ResultsReader
+
+
+def test_gradient_dipole_alpha(
+    fake_binaries: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-d", "-a", "-f", "1e-3"]
+        + ["--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    assert pytest.approx(0.05 * coords.sum(axis=0), abs=1e-6) == reader.tensor(
+        0, "dipole"
+    )
+    assert pytest.approx(2.0 * np.eye(3), abs=1e-6) == reader.tensor(0, "alpha")
+
+    # the printed rows start at the first column
+    lines = capsys.readouterr().out.splitlines()
+    gradient = reader.tensor(0, "gradient")
+    assert " ".join(f"{g:10.6f}" for g in gradient[1]) in lines
+    alpha = reader.tensor(0, "alpha")
+    assert " ".join(f"{a:12.8f}" for a in alpha[2]) in lines
+
+    kinds = list(reader.singlepoints["kind"])
+    assert kinds.count(b"eq") == 1
+    assert kinds.count(b"nuclear") == 12
+    nuclear = reader.singlepoints[reader.singlepoints["kind"] == b"nuclear"]
+    assert sorted(zip(nuclear["atom"], nuclear["coordinate"])) == sorted(
+        [(i, j) for i in range(2) for j in range(3)] * 2
+    )
+
+    gradfile = (fake_binaries / "gradient").read_text()
+    assert gradfile.startswith("$grad")
+
+
+def test_hessian(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "--hessian", "-f", "1e-3"]
+        + ["--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    assert pytest.approx(0.2 * np.eye(6), abs=1e-8) == reader.tensor(0, "hessian")
+    # linear molecule: a single stretching mode of two masses on a spring
+    frequencies = reader.tensor(0, "frequencies")
+    assert len(frequencies) == 1
+    mass = 1.008 * 1822.888486209
+    assert pytest.approx(np.sqrt(0.2 / mass) * 219474.6313632) == frequencies[0]
+    assert (fake_binaries / "hessian").read_text().startswith("$hessian")
+
+
+def test_gradient_with_hessian(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "--hessian", "-f", "1e-3"]
+        + ["--store", "r"]
+    )
+
+    # the gradient comes from the energies of the Hessian displacements
+    reader = ResultsReader("r")
+    kinds = list(reader.singlepoints["kind"])
+    assert kinds.count(b"engrad") == 12
+    assert kinds.count(b"nuclear") == 0
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    assert pytest.approx(0.2 * np.eye(6), abs=1e-8) == reader.tensor(0, "hessian")
+
+
+def test_retention(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-a", "-f", "1e-3", "--store", "res"]
+        + ["--set", "orca.retention=keep-outputs-compressed"]
+    )
+
+    reader = ResultsReader("res")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    assert pytest.approx(2.0 * np.eye(3), abs=1e-6) == reader.tensor(0, "alpha")
+    for prefix in ("numdiff_1_1", "efield_+0_+0_-1"):
+        assert (fake_binaries / (prefix + ".out.gz")).exists()
+        assert (fake_binaries / (prefix + "_property.txt.gz")).exists()
+        assert not (fake_binaries / (prefix + ".out")).exists()
+        assert not (fake_binaries / (prefix + ".gbw")).exists()
+        # the logs of the input generation are named after the calculation
+        assert (fake_binaries / ("qvSZP_" + prefix + ".out.gz")).exists()
+        assert not (fake_binaries / ("qvSZP_" + prefix + ".out")).exists()
+    # the equilibrium files are kept
+    assert (fake_binaries / "eq.gbw").exists()
+
+
+def test_ir_intensities(fake_binaries: Path) -> None:
+    (fake_binaries / "lih.xyz").write_text("2\n\nLi 0.0 0.0 0.0\nH 0.0 0.0 1.6\n")
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "lih.xyz", "--hessian", "-g", "-f", "1e-3"]
+        + ["--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    # the dipole moment of the fake model is 0.05 times the sum of positions
+    dipgrad = reader.tensor(0, "dipgrad")
+    assert pytest.approx(0.05 * np.tile(np.eye(3), (2, 1)), abs=1e-8) == dipgrad
+    assert (fake_binaries / "dipgrad").read_text().startswith("$dipgrad")
+
+    # stretching mode: atoms move with amplitudes 1/m_i relative to each other
+    m1, m2 = 6.94 * 1822.888486209, 1.008 * 1822.888486209
+    dmudq = 0.05 * (m2 - m1) / np.sqrt(m1 * m2 * (m1 + m2))
+    intensities = reader.tensor(0, "irintensities")
+    assert len(intensities) == 1
+    assert pytest.approx(dmudq**2 * AU2KMMOL, rel=1e-6) == intensities[0]
+    assert "IR intensity" in (fake_binaries / "vibspectrum").read_text()
+
+
+def test_raman(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "--raman", "-f", "1e-3"]
+        + ["--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    # the polarizability of the fake model does not depend on the geometry
+    assert pytest.approx(np.zeros((6, 3, 3)), abs=1e-6) == reader.tensor(0, "dalpha")
+    assert pytest.approx([0.0], abs=1e-6) == reader.tensor(0, "ramanactivities")
+    assert len(reader.tensor(0, "frequencies")) == 1
+
+    # six field points per displacement, all from the displacement's input
+    kinds = list(reader.singlepoints["kind"])
+    assert kinds.count(b"engrad") == 12
+    assert kinds.count(b"nucfield") == 72
+    fieldinput = (fake_binaries / "numdiff_2_6_efield_3_1.inp").read_text()
+    assert "efield 0.0, 0.0, 0.001\n" in fieldinput
+    assert "EnGrad" not in fieldinput
+
+
+def test_hyperpolarizabilities(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-a", "numdiff", "--beta", "--gamma"]
+        + ["-f", "1e-2", "--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    # energy stencil for alpha, dipole stencils for beta and gamma
+    assert pytest.approx(2.0 * np.eye(3), abs=1e-6) == reader.tensor(0, "alpha")
+    assert pytest.approx(np.zeros((3, 3, 3)), abs=1e-6) == reader.tensor(0, "beta")
+    assert pytest.approx(np.zeros((3, 3, 9)), abs=1e-6) == reader.tensor(0, "gamma")
+    # 19 points for alpha, 19 - 1 for beta (equilibrium reused), 32 for gamma
+    assert list(reader.singlepoints["kind"]).count(b"field") == 69
+    assert (
+        (fake_binaries / "gamma.qvSZP")
+        .read_text()
+        .startswith("$hyperpolarizability gamma")
+    )
+
+
+def test_directions(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+    # the stretch (as N rows of x, y, z) and a vector that is not normalised
+    (fake_binaries / "vectors.txt").write_text(
+        "# stretch\n0 0 -1\n0 0 1\n# mixed\n0 2 0\n0 0 2\n"
+    )
+    units = np.array([[0, 0, -1, 0, 0, 1], [0, 1, 0, 0, 0, 1]]) / np.sqrt([[2], [2]])
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "--directions", "vectors.txt"]
+        + ["-f", "1e-3", "--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    gradient = 0.2 * coords.ravel()
+    assert pytest.approx(units @ gradient, abs=1e-6) == reader.tensor(0, "dirgrad")
+    # the gradient projected on the space spanned by both vectors
+    projected = units.T @ np.linalg.solve(units @ units.T, units @ gradient)
+    assert pytest.approx(projected.reshape(2, 3), abs=1e-6) == reader.tensor(
+        0, "subspacegrad"
+    )
+    assert list(reader.singlepoints["kind"]).count(b"direct") == 4
+    assert (fake_binaries / "dirgrad").read_text().startswith("$dirgrad")
+
+
+def test_accuracy(fake_binaries: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-2", "--accuracy", "1e-3"]
+        + ["--measure-noise"]
+    )
+
+    out = capsys.readouterr().out
+    assert "NormalSCF, DefGrid1" in out and "42% of VeryTightSCF/DefGrid3" in out
+    assert "Measured energy deviation" in out
+    # selected settings for all single points, the configured ones for the check
+    assert (
+        "--defgrid 1 --conv NormalSCF"
+        in (fake_binaries / "qvSZP_numdiff_1_1.out").read_text()
+    )
+    assert (
+        "--defgrid 3 --conv VeryTightSCF"
+        in (fake_binaries / "qvSZP_eq_ref.out").read_text()
+    )
+
+
+def test_measure_noise_requires_accuracy(
+    fake_binaries: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+
+    with pytest.raises(SystemExit):
+        console_entry_point(["-b", "qvSZP", "-s", "h2.xyz", "-g", "--measure-noise"])
+    assert "--measure-noise requires --accuracy" in capsys.readouterr().err
+    assert not (fake_binaries / "qvSZP_eq.out").exists()
+
+
+def test_dipole(fake_binaries: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    dipole = 0.05 * np.array([0.0, 0.2, 0.94]) * AA2AU
+
+    # the SCF dipole moment of the equilibrium needs no further single points
+    console_entry_point(["-b", "qvSZP", "-s", "h2.xyz", "-d", "--store", "prop"])
+    reader = ResultsReader("prop")
+    assert pytest.approx(dipole, abs=1e-10) == reader.tensor(0, "dipole")
+    assert list(reader.singlepoints["kind"]) == [b"eq"]
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-d", "check", "-f", "1e-3", "--store", "ff"]
+    )
+    reader = ResultsReader("ff")
+    assert pytest.approx(dipole, abs=1e-10) == reader.tensor(0, "dipole")
+    assert pytest.approx(dipole, abs=1e-6) == reader.tensor(0, "dipolefield")
+    assert list(reader.singlepoints["kind"]).count(b"field") == 6
+    assert "Difference to the SCF dipole moment" in capsys.readouterr().out
+
+
+def test_alpha_cpscf(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+
+    console_entry_point(["-b", "qvSZP", "-s", "h2.xyz", "-a", "cpscf", "--store", "r"])
+
+    reader = ResultsReader("r")
+    assert pytest.approx(2.0 * np.eye(3)) == reader.tensor(0, "alpha")
+    # parsed from the equilibrium output without field single points
+    assert list(reader.singlepoints["kind"]) == [b"eq"]
+    assert "Polar 1" in (fake_binaries / "eq.inp").read_text()
+
+
+@pytest.mark.parametrize("alpha", ["analytical", "numdiff"])
+def test_alpha_in_field(fake_binaries: Path, alpha: str) -> None:
+    (fake_binaries / "h2.xyz").write_text(
+        '2\nefield="0.0 0.0 0.001"\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n'
+    )
+
+    console_entry_point(["-b", "qvSZP", "-s", "h2.xyz", "-a", alpha, "--store", "r"])
+
+    # the field points are centred at the field of the structure
+    reader = ResultsReader("r")
+    fields = reader.singlepoints["efield"][reader.singlepoints["kind"] == b"field"]
+    assert len(fields) > 0
+    assert pytest.approx([0.0, 0.0, 0.001]) == fields.mean(axis=0)
+    assert pytest.approx(2.0 * np.eye(3), abs=1e-4) == reader.tensor(0, "alpha")
+
+
+def test_analytic_gradient(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.1 0.2 0.3\nH 0.4 0.5 0.84\n")
+    coords = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.84]]) * AA2AU
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "analytic", "-f", "1e-3"]
+        + ["--spotchecks", "2", "--store", "results.ngp"]
+    )
+
+    reader = ResultsReader("results.ngp")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    kinds = list(reader.singlepoints["kind"])
+    assert kinds.count(b"eq") == 1
+    # two displacements per checked component
+    assert kinds.count(b"nuclear") == 4
+    assert "EnGrad" in (fake_binaries / "eq.inp").read_text()
+
+
+def test_analytic_gradient_fallback(
+    fake_binaries: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.1 0.2 0.3\nH 0.4 0.5 0.84\n")
+    coords = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.84]]) * AA2AU
+
+    # no check passes a tolerance below the finite-difference noise
+    argv = ["-b", "qvSZP", "-s", "h2.xyz", "-g", "analytic", "-f", "1e-3"]
+    argv += ["--spotchecks", "2", "--spotcheck-tol", "1e-14", "--store", "res"]
+    console_entry_point(argv + ["--spotcheck-seed", "7"])
+
+    output = capsys.readouterr().out
+    assert "Spot-check seed: 7" in output
+    assert "calculating the full numerical gradient" in output
+    reader = ResultsReader("res")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    # the checked displacements are not calculated again
+    kinds = list(reader.singlepoints["kind"])
+    assert kinds.count(b"nuclear") == 12
+    assert reader.tensor(0, "dipgrad").shape == (6, 3)
+    assert pytest.approx(0.05 * np.tile(np.eye(3), (2, 1)), abs=1e-6) == (
+        reader.tensor(0, "dipgrad")
+    )
+
+    # the same seed checks the same components
+    checked = [line for line in output.splitlines() if line.startswith("atom")]
+    console_entry_point(argv + ["--spotcheck-seed", "7", "--store", "res2"])
+    again = capsys.readouterr().out.splitlines()
+    assert checked == [line for line in again if line.startswith("atom")]
+
+
+def test_overlapped_preparation(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+
+    # the equilibrium ORCA run waits for the last displacement input
+    orca = fake_binaries.parent / "bin" / "orca"
+    orca.rename(orca.with_name("orca_model"))
+    orca.write_text(
+        f"""#!{sys.executable}
+import os, sys, time
+if sys.argv[1] == "eq.inp":
+    for _ in range(200):
+        if os.path.exists("numdiff_2_6.inp"):
+            open("overlap", "w").close()
+            break
+        time.sleep(0.05)
+os.execv({str(orca.with_name("orca_model"))!r}, [sys.argv[0], *sys.argv[1:]])
+"""
+    )
+    orca.chmod(0o755)
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3", "--store", "r"]
+    )
+
+    assert (fake_binaries / "overlap").exists()
+    reader = ResultsReader("r")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+
+
+def test_streamed_preparation(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+
+    # the last displacement input waits for the ORCA job of the first one
+    qvszp = fake_binaries.parent / "bin" / "qvSZP"
+    qvszp.rename(qvszp.with_name("qvSZP_model"))
+    qvszp.write_text(
+        f"""#!{sys.executable}
+import os, sys, time
+if "numdiff_2_6" in sys.argv:
+    for _ in range(200):
+        if os.path.exists(".numdiff_1_1.copy0") or os.path.exists("numdiff_1_1.out"):
+            open("streamed", "w").close()
+            break
+        time.sleep(0.05)
+os.execv({str(qvszp.with_name("qvSZP_model"))!r}, [sys.argv[0], *sys.argv[1:]])
+"""
+    )
+    qvszp.chmod(0o755)
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3", "--store", "r"]
+    )
+
+    assert (fake_binaries / "streamed").exists()
+    reader = ResultsReader("r")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+
+
+def test_preparation_environment(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    orcadir = fake_binaries.parent / "orcadir"
+    orcadir.mkdir()
+
+    # the inputs prepared in the background see the configured ORCA directory
+    qvszp = fake_binaries.parent / "bin" / "qvSZP"
+    qvszp.rename(qvszp.with_name("qvSZP_model"))
+    qvszp.write_text(
+        f"""#!{sys.executable}
+import os, sys
+outname = sys.argv[sys.argv.index("--outname") + 1]
+with open(outname + ".path", "w") as f:
+    f.write(os.environ["PATH"])
+os.execv({str(qvszp.with_name("qvSZP_model"))!r}, [sys.argv[0], *sys.argv[1:]])
+"""
+    )
+    qvszp.chmod(0o755)
+
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3"]
+        + ["--set", f"orca.path={orcadir}"]
+    )
+
+    for prefix in ("eq", "numdiff_1_1", "numdiff_2_6"):
+        path = (fake_binaries / (prefix + ".path")).read_text()
+        assert path.startswith(str(orcadir) + os.pathsep)
+
+
+def test_rerun_after_failure(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+
+    # one displacement fails as long as the file 'broken' exists
+    broken = fake_binaries / "broken"
+    calls = fake_binaries / "calls"
+    orca = fake_binaries.parent / "bin" / "orca"
+    orca.rename(orca.with_name("orca_model"))
+    orca.write_text(
+        f"""#!{sys.executable}
+import os, sys
+with open({str(calls)!r}, "a") as f:
+    f.write(sys.argv[1] + "\\n")
+if sys.argv[1] == "numdiff_2_6.inp" and os.path.exists({str(broken)!r}):
+    sys.exit(1)
+os.execv({str(orca.with_name("orca_model"))!r}, [sys.argv[0], *sys.argv[1:]])
+"""
+    )
+    orca.chmod(0o755)
+
+    argv = ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3", "--store", "r"]
+    argv += ["--set", "orca.retries=0", "--set", "orca.retention=keep-results-only"]
+    broken.touch()
+    with pytest.raises(RuntimeError, match="numdiff_2_6"):
+        console_entry_point(argv)
+    # the finished calculations are kept for the rerun
+    assert (fake_binaries / "numdiff_1_1.out.gz").exists()
+
+    broken.unlink()
+    calls.unlink()
+    console_entry_point(argv)
+    assert calls.read_text().split() == ["eq.inp", "numdiff_2_6.inp"]
+    reader = ResultsReader("r")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    # all files are removed once every calculation has succeeded
+    assert not list(fake_binaries.glob("numdiff_1_1.*"))
@@ -0,0 +1,47 @@
+"""
+Test the 'optimize' subcommand with fake binaries.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.cli import console_entry_point
+from numgradpy.io import Structure, XYZTrajectory
+from numgradpy.io.write_output import gradient_cycles
+
+
+def test_optimize(fake_binaries: Path) -> None:
+    # the model energy 0.1 |R|^2 has its minimum with all atoms at the origin
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+
+    assert console_entry_point(["optimize", "-b", "qvSZP", "-s", "h2.xyz"]) == 0
+
+    final = Structure()
+    final.read("h2.opt.xyz")
+    assert pytest.approx(np.zeros((2, 3)), abs=2e-3) == final.coordinates
+
+    # the energy decreases and every cycle is kept in the trajectory
+    with XYZTrajectory("numgradpy_opt.xyz", cache=False) as traj:
+        assert len(traj) > 1
+        energies = [
+            0.1 * np.sum(traj.read_frame(i).coordinates ** 2) for i in range(len(traj))
+        ]
+    assert energies == sorted(energies, reverse=True)
+
+    # the orbitals of the previous cycle are the guess of the last cycle
+    assert '%moinp "eq_guess.gbw"' in (fake_binaries / "eq.inp").read_text()
+    assert (fake_binaries / "energy").read_text().startswith("$energy")
+    gradfile = (fake_binaries / "gradient").read_text()
+    assert gradfile.startswith("$grad")
+    assert gradient_cycles(gradfile) == len(energies)
+
+
+def test_not_converged(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+
+    argv = ["optimize", "-b", "qvSZP", "-s", "h2.xyz", "--maxcycles", "1"]
+    assert console_entry_point(argv) == 1
@@ -0,0 +1,101 @@
+"""
+Test the daemon and its thin client with fake binaries.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import numgradpy
+from numgradpy.cli import console_entry_point
+from numgradpy.cli.client import PROTOCOL_VERSION, forward
+from numgradpy.cli.server import GradientServer
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="The daemon listens on a Unix socket."
+)
+
+
+def test_forward_without_daemon(tmp_path: Path) -> None:
+    assert forward(str(tmp_path / "missing.sock"), ["-h"]) is None
+
+
+def test_serve(fake_binaries: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # ORCA is found only through the configuration sent by the client
+    orcadir = fake_binaries.parent / "orca"
+    orcadir.mkdir()
+    (fake_binaries.parent / "bin" / "orca").rename(orcadir / "orca")
+
+    socketpath = str(fake_binaries / "ngp.sock")
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(numgradpy.__file__))
+    daemon = subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-c",
+            "import sys, numgradpy; "
+            "sys.exit(numgradpy.console_entry_point(sys.argv[1:]))",
+            "serve",
+            "--socket",
+            socketpath,
+            "-n",
+            "2",
+        ],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        for _ in range(300):
+            if os.path.exists(socketpath):
+                break
+            time.sleep(0.1)
+        monkeypatch.setenv("NUMGRADPY_SOCKET", socketpath)
+        monkeypatch.setenv("NUMGRADPY_ORCA_PATH", str(orcadir))
+
+        (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+        for _ in range(2):
+            argv = ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3"]
+            assert console_entry_point(argv) == 0
+            lines = (fake_binaries / "gradient").read_text().splitlines()
+            gradient = np.array([line.split() for line in lines[4:6]], dtype=float)
+            assert pytest.approx(0.2 * 0.74 * 1.8897261246, abs=1e-6) == gradient[1, 2]
+
+        # errors of a request are returned to the client
+        assert console_entry_point(["-b", "qvSZP", "-s", "missing.xyz"]) == 1
+        assert console_entry_point(["--unknown"]) == 2
+    finally:
+        console_entry_point(["serve", "--socket", socketpath, "--stop"])
+        output, _ = daemon.communicate(timeout=60)
+
+    assert "stopped after 4 requests" in output
+    assert not os.path.exists(socketpath)
+
+
+def test_request_settings(fake_binaries: Path) -> None:
+    server = GradientServer(str(fake_binaries / "ngp.sock"), 1)
+    try:
+        # the shared pool retries like the pool of a run without the daemon
+        assert server.scheduler.retries == 2
+        assert server.scheduler.speculate > 0.0
+
+        (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n")
+        response = server.handle(
+            {
+                "version": PROTOCOL_VERSION,
+                "argv": ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3"],
+                "cwd": str(fake_binaries),
+                "env": {"NUMGRADPY_ORCA_RETRIES": "4"},
+            }
+        )
+        assert response["returncode"] == 0, response["stderr"]
+        assert server.scheduler.retries == 4
+    finally:
+        server.close()
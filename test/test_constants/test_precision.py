@@ -0,0 +1,28 @@
+"""
+Test the selection of the SCF settings from the target accuracy.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from numgradpy.constants import describe_precision, select_precision
+
+
+def test_select_precision() -> None:
+    # the default step needs the default settings
+    default = select_precision(1e-4, 5e-5)
+    assert (default.conv, default.defgrid) == ("VeryTightSCF", 3)
+    # larger steps and rougher targets allow looser settings
+    rough = select_precision(1e-3, 1e-2)
+    assert (rough.conv, rough.defgrid) == ("NormalSCF", 1)
+    assert rough.error <= 1e-3 and rough.cost < default.cost
+    assert rough.overrides() == ["qvszp.conv=NormalSCF", "qvszp.defgrid=1"]
+
+    # out of reach: the most precise settings and a hint
+    tight = select_precision(1e-8, 5e-5)
+    assert tight.conv == "ExtremeSCF" and tight.error > 1e-8
+    assert "increase the step" in describe_precision(tight, 1e-8)
+
+    with pytest.raises(ValueError):
+        select_precision(0.0, 1e-3)
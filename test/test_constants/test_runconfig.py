@@ -0,0 +1,85 @@
+"""
+Test loading and merging of the run configuration.
+"""
+
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from numgradpy.constants import RunConfig
+
+
+def write_rc(directory: Path, mpi: int, guess: str) -> None:
+    (directory / ".numgradpyrc").write_text(
+        f"$qvszp\n    mpi={mpi}\n\n    guess={guess}\n$orca\n    path=/opt/orca\n$end\n",
+        encoding="UTF-8",
+    )
+
+
+def test_precedence(tmp_path: Path) -> None:
+    home = tmp_path / "home"
+    project = tmp_path / "project"
+    home.mkdir()
+    project.mkdir()
+    write_rc(home, 2, "hueckel")
+
+    config = RunConfig.load(environ={}, projectdir=str(project), home=str(home))
+    assert config.get("qvszp", "mpi") == "2"
+    assert config.get("qvszp", "guess") == "hueckel"
+    assert config.get("qvszp", "conv") == "VeryTightSCF"
+    assert config.get("orca", "path") == "/opt/orca"
+
+    write_rc(project, 3, "hcore")
+    config = RunConfig.load(
+        ["qvszp.guess=patom"],
+        environ={"NUMGRADPY_QVSZP_MPI": "4", "NUMGRADPY_QVSZP_GUESS": "pmodel"},
+        projectdir=str(project),
+        home=str(home),
+    )
+    assert config.get("qvszp", "mpi") == "4"
+    assert config.get("qvszp", "guess") == "patom"
+
+    # frozen and cheap to send to workers
+    with pytest.raises(AttributeError):
+        config.qvszp = ()  # type: ignore[misc]
+    assert pickle.loads(pickle.dumps(config)) == config
+
+
+def test_validation(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        RunConfig.load(["qvszp.mpi=many"], environ={}, home=str(tmp_path))
+    with pytest.raises(ValueError):
+        RunConfig.load(["mpi=4"], environ={}, home=str(tmp_path))
+    with pytest.raises(ValueError):
+        RunConfig.load(environ={"NUMGRADPY_QVSZP_GUESS": "x"}, home=str(tmp_path))
+
+
+def test_arglist_merge(tmp_path: Path) -> None:
+    config = RunConfig.load(environ={}, projectdir=str(tmp_path), home=str(tmp_path))
+    arguments = ["--struc", "eq.xyz", "--efield", "0.0", "-0.001", "0.0"]
+    arguments += ["--mpi", "6"]
+    copy = list(arguments)
+    arglist = config.qvszp_arglist(arguments)
+
+    assert arguments == copy
+    assert arglist[arglist.index("--mpi") + 1] == "6"
+    assert arglist.count("--mpi") == 1
+    i = arglist.index("--efield")
+    assert arglist[i + 1 : i + 4] == ["0.0", "-0.001", "0.0"]
+    assert arglist[arglist.index("--struc") + 1] == "eq.xyz"
+
+
+def test_job_settings(tmp_path: Path) -> None:
+    config = RunConfig.load(environ={}, projectdir=str(tmp_path), home=str(tmp_path))
+    assert config.get("orca", "retries") == "2"
+    assert config.get("orca", "timeout") is None
+
+    config = RunConfig.load(
+        ["orca.timeout=600"], environ={}, projectdir=str(tmp_path), home=str(tmp_path)
+    )
+    assert config.get("orca", "timeout") == "600"
+    with pytest.raises(ValueError):
+        RunConfig.load(["orca.retries=-1"], environ={}, home=str(tmp_path))
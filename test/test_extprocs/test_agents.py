@@ -0,0 +1,198 @@
+"""
+Test the coordinator and worker agents on localhost with fake binaries.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.cli import console_entry_point
+from numgradpy.constants import AA2AU
+from numgradpy.extprocs.agents import (
+    AGENT_PROTOCOL_VERSION,
+    AgentScheduler,
+    WorkerAgent,
+    _encode,
+    parse_address,
+)
+from numgradpy.extprocs.jobs import orca_job
+from numgradpy.extprocs.singlepoint import sp_qvszp
+from numgradpy.io import ResultsReader, get_orca_energy
+
+
+def start_agent(agent: WorkerAgent) -> threading.Thread:
+    thread = threading.Thread(target=agent.run, args=(30.0,), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_gradient_on_agents(fake_binaries: Path, tmp_path: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    coords = np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    agents = [
+        WorkerAgent(("127.0.0.1", port), capacity=n, scratch=str(tmp_path), token="s")
+        for n in (1, 2)
+    ]
+    threads = [start_agent(agent) for agent in agents]
+    console_entry_point(
+        ["-b", "qvSZP", "-s", "h2.xyz", "-g", "-f", "1e-3", "--store", "r"]
+        + ["--agents", f"127.0.0.1:{port}", "--agent-token", "s"]
+    )
+    for thread in threads:
+        thread.join(10.0)
+
+    reader = ResultsReader("r")
+    assert pytest.approx(0.2 * coords, abs=1e-6) == reader.tensor(0, "gradient")
+    assert sum(agent.ntasks for agent in agents) == 12
+    # the task directories are removed
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("ngp_")]
+
+
+def test_lost_agent(fake_binaries: Path) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    for prefix in ("job1", "job2"):
+        sp_qvszp("qvSZP", ["--struc", "h2.xyz", "--outname", prefix], prefix, False)
+
+    with AgentScheduler(("127.0.0.1", 0), token="s") as sched:
+        # agents with a wrong token are rejected
+        with socket.create_connection(sched.address) as intruder:
+            intruder.sendall(
+                json.dumps(
+                    {
+                        "version": AGENT_PROTOCOL_VERSION,
+                        "type": "register",
+                        "name": "x",
+                        "capacity": 1,
+                        "token": "wrong",
+                    }
+                ).encode()
+                + b"\n"
+            )
+            assert intruder.recv(1) == b""
+
+        for prefix in ("job1", "job2"):
+            sched.submit(prefix, orca_job, ("orca", prefix, str(fake_binaries), None))
+
+        # an agent with one slot receives one task and disappears
+        lost = socket.create_connection(sched.address)
+        lost.sendall(
+            json.dumps(
+                {
+                    "version": AGENT_PROTOCOL_VERSION,
+                    "type": "register",
+                    "name": "lost",
+                    "capacity": 1,
+                    "token": "s",
+                }
+            ).encode()
+            + b"\n"
+        )
+        stream = lost.makefile("rb")
+        task = json.loads(stream.readline())
+        assert task["type"] == "task"
+        assert set(task["files"]) == {task["prefix"] + ".inp"}
+        lost.settimeout(0.5)
+        with pytest.raises(socket.timeout):
+            stream.readline()
+        stream.close()
+        lost.close()
+
+        agent = WorkerAgent(sched.address, capacity=2, token="s")
+        thread = start_agent(agent)
+        done = {sched.next_done(), sched.next_done()}
+        assert done == {("job1", True, True), ("job2", True, True)}
+        assert sched.stats["lost_agents"] == 1
+        assert agent.ntasks == 2
+
+    thread.join(10.0)
+    assert not thread.is_alive()
+    for prefix in ("job1", "job2"):
+        assert (
+            pytest.approx(get_orca_energy(prefix + ".out"))
+            == 0.1
+            * ((np.array([[0.0, 0.0, 0.1], [0.0, 0.2, 0.84]]) * AA2AU) ** 2).sum()
+        )
+        assert (fake_binaries / (prefix + "_property.txt")).exists()
+
+
+def test_token_required() -> None:
+    assert parse_address("7070") == ("localhost", 7070)
+    assert parse_address("node01:7070") == ("node01", 7070)
+    # other hosts than the loopback interface could register without a token
+    for host in ("0.0.0.0", ""):
+        with pytest.raises(ValueError, match="requires a token"):
+            AgentScheduler((host, 0))
+    with AgentScheduler(("127.0.0.1", 0)) as sched:
+        assert sched._authorized(None)
+        assert not sched._authorized("s")
+    with AgentScheduler(("0.0.0.0", 0), token="s") as sched:
+        assert sched._authorized("s")
+        assert not sched._authorized("wrong")
+        assert not sched._authorized(None)
+
+
+def test_dispatch_outside_lock(
+    fake_binaries: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (fake_binaries / "h2.xyz").write_text("2\n\nH 0.0 0.0 0.1\nH 0.0 0.2 0.84\n")
+    sp_qvszp("qvSZP", ["--struc", "h2.xyz", "--outname", "job1"], "job1", False)
+
+    # the input files are encoded without blocking the other connections
+    encoding = threading.Event()
+    proceed = threading.Event()
+
+    def slow_encode(path: str) -> str:
+        encoding.set()
+        proceed.wait(10.0)
+        return _encode(path)
+
+    monkeypatch.setattr("numgradpy.extprocs.agents._encode", slow_encode)
+    with AgentScheduler(("127.0.0.1", 0)) as sched:
+        client = socket.create_connection(sched.address)
+        client.sendall(
+            json.dumps(
+                {
+                    "version": AGENT_PROTOCOL_VERSION,
+                    "type": "register",
+                    "name": "slow",
+                    "capacity": 1,
+                    "token": None,
+                }
+            ).encode()
+            + b"\n"
+        )
+        for _ in range(200):
+            if sched.capacity == 1:
+                break
+            time.sleep(0.01)
+        submit = threading.Thread(
+            target=sched.submit,
+            args=("job1", orca_job, ("orca", "job1", str(fake_binaries), None)),
+            daemon=True,
+        )
+        submit.start()
+        assert encoding.wait(10.0)
+        try:
+            assert sched._lock.acquire(timeout=2.0)
+            sched._lock.release()
+        finally:
+            proceed.set()
+        submit.join(10.0)
+
+        with client.makefile("rb") as stream:
+            task = json.loads(stream.readline())
+        assert task["prefix"] == "job1"
+        assert set(task["files"]) == {"job1.inp"}
+        client.close()
@@ -0,0 +1,69 @@
+"""
+Test the single point jobs of the worker processes.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from numgradpy.constants import AA2AU
+from numgradpy.extprocs.jobs import orca_job, publish_results
+from numgradpy.extprocs.retention import apply_retention
+from numgradpy.io import get_orca_energy
+
+INPUT = """\
+! PBE
+* xyz 0 1
+H 0.0 0.0 0.0
+H 0.0 0.0 1.4
+*
+"""
+
+
+def test_orca_job(fake_binaries: Path) -> None:
+    (fake_binaries / "sp.inp").write_text(INPUT)
+    assert orca_job("orca", "sp", str(fake_binaries))
+    energy = get_orca_energy(str(fake_binaries / "sp.out"))
+    assert pytest.approx(0.1 * (1.4 * AA2AU) ** 2) == energy
+    # the copy ran in a scratch directory that is removed afterwards
+    assert not [name for name in os.listdir(fake_binaries) if ".copy" in name]
+
+
+def test_publish_once(tmp_path: Path) -> None:
+    inpfile = tmp_path / "sp.inp"
+    inpfile.write_text(INPUT)
+    stamp = (inpfile.stat().st_size, inpfile.stat().st_mtime_ns)
+    scratches = []
+    for copy in range(2):
+        scratch = tmp_path / f".sp.copy{copy}"
+        scratch.mkdir()
+        (scratch / "sp.out").write_text(f"copy {copy}\n")
+        scratches.append(str(scratch))
+
+    # the first copy publishes, the late one does not overwrite its files
+    assert publish_results(scratches[0], "sp", str(tmp_path), stamp)
+    assert not publish_results(scratches[1], "sp", str(tmp_path), stamp)
+    assert (tmp_path / "sp.out").read_text() == "copy 0\n"
+
+    # nor those of a later calculation with the same name
+    inpfile.write_text(INPUT + "\n")
+    os.utime(inpfile, ns=(stamp[1] + 10**9, stamp[1] + 10**9))
+    assert not publish_results(scratches[1], "sp", str(tmp_path), stamp)
+    assert (tmp_path / "sp.out").read_text() == "copy 0\n"
+
+
+def test_retention_of_logs(tmp_path: Path) -> None:
+    for name in ("sp.out", "sp.gbw", "qvSZP_sp.out", "qvSZP_sp.err"):
+        (tmp_path / name).write_text("x\n")
+
+    apply_retention("sp", "keep-outputs-compressed", str(tmp_path), binaryname="qvSZP")
+    assert sorted(os.listdir(tmp_path)) == [
+        "qvSZP_sp.err.gz",
+        "qvSZP_sp.out.gz",
+        "sp.out.gz",
+    ]
+    apply_retention("sp", "keep-results-only", str(tmp_path), binaryname="qvSZP")
+    assert not os.listdir(tmp_path)
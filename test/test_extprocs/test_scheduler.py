@@ -0,0 +1,62 @@
+"""
+Test the retries, timeouts and speculative copies of the job scheduler.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from numgradpy.extprocs.helpfcts import runexec
+from numgradpy.extprocs.scheduler import JobScheduler
+
+
+def flaky(counter: str) -> int:
+    """Fail on the first call and succeed on the second one."""
+    with open(counter, "a", encoding="UTF-8") as f:
+        f.write("x")
+    ncalls = os.path.getsize(counter)
+    if ncalls < 2:
+        raise RuntimeError("first call fails")
+    return ncalls
+
+
+def straggler(duration: float, copy: int = 0) -> int:
+    """The original hangs, a second copy finishes immediately."""
+    time.sleep(duration if copy == 0 else 0.0)
+    return copy
+
+
+def test_retry(tmp_path: Path) -> None:
+    counter = str(tmp_path / "counter")
+    with JobScheduler(2, retries=1, backoff=0.01) as sched:
+        sched.submit("flaky", flaky, (counter,))
+        assert sched.next_done() == ("flaky", True, 2)
+        assert sched.stats["retries"] == 1
+
+    with JobScheduler(2, retries=0) as sched:
+        sched.submit("flaky", flaky, (str(tmp_path / "other"),))
+        key, success, result = sched.next_done()
+        assert not success and isinstance(result, RuntimeError)
+        assert sched.stats["failed"] == 1
+
+
+def test_speculative_copy() -> None:
+    st = time.monotonic()
+    with JobScheduler(2, speculate=2.0) as sched:
+        for k in range(4):
+            sched.submit(k, straggler, (0.05,), speculative=True)
+        sched.submit("slow", straggler, (60.0,), speculative=True)
+        results = dict(sched.next_done()[::2] for _ in range(5))
+        assert results["slow"] == 1
+        assert sched.stats["speculative_wins"] == 1
+        assert "1 speculative copies (1 finished first)" in sched.report()
+    assert time.monotonic() - st < 30.0
+
+
+def test_timeout(tmp_path: Path) -> None:
+    with pytest.raises(TimeoutError):
+        runexec("sleep", "sleep.out", "sleep.err", ["10"], str(tmp_path), 0.2)
@@ -0,0 +1,68 @@
+"""
+Test the recovery ladder of ORCA single points with fake binaries.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.extprocs import SCFConvergenceError, sp_orca_recover
+from numgradpy.extprocs.singlepoint import recovery_inputs, write_orca_efield_input
+from numgradpy.io import get_orca_convergence, get_orca_energy
+
+INPUT = """\
+! PBE VeryTightSCF PModel
+%scf
+ efield 0.0, 0.0, 0.0
+end
+* xyz 0 1
+{atom} 0.0 0.0 0.0
+*
+"""
+
+
+def test_recovery_inputs() -> None:
+    content = '! MORead\n%moinp "eq.gbw"\n' + INPUT.format(atom="He")
+    (guess,) = recovery_inputs(content, "guess", "sp")
+    assert guess.startswith("! Hueckel NoAutoStart\n")
+    assert "PModel" not in guess and "moinp" not in guess
+
+    loose, tight = recovery_inputs(content, "loose-tight", "sp")
+    assert "VeryTightSCF" not in loose and "LooseSCF" in loose
+    assert '%moinp "sp_loose.gbw"' in tight and "VeryTightSCF" in tight
+
+
+def test_recovery(fake_binaries: Path) -> None:
+    (fake_binaries / "he.inp").write_text(INPUT.format(atom="He"))
+    assert sp_orca_recover("orca", "he") == "damping"
+    assert get_orca_convergence("he.out")
+    assert pytest.approx(0.0) == get_orca_energy("he.out")
+    # the original input is restored
+    assert (fake_binaries / "he.inp").read_text() == INPUT.format(atom="He")
+
+    (fake_binaries / "h.inp").write_text(INPUT.format(atom="H"))
+    assert sp_orca_recover("orca", "h") == "default"
+
+    (fake_binaries / "x.inp").write_text(INPUT.format(atom="X"))
+    with pytest.raises(SCFConvergenceError):
+        sp_orca_recover("orca", "x")
+
+
+def test_efield_input(tmp_path: Path) -> None:
+    (tmp_path / "sp.inp").write_text(INPUT.format(atom="H"))
+    write_orca_efield_input(
+        str(tmp_path / "sp.inp"), str(tmp_path / "f.inp"), np.array([0.0, 1e-3, 0.0])
+    )
+    assert " efield 0.0, 0.001, 0.0\n" in (tmp_path / "f.inp").read_text()
+
+    # inputs without a field get a %scf block in front of the coordinates
+    (tmp_path / "nofield.inp").write_text("! PBE\n* xyz 0 1\nH 0.0 0.0 0.0\n*\n")
+    write_orca_efield_input(
+        str(tmp_path / "nofield.inp"), str(tmp_path / "f.inp"), np.ones(3)
+    )
+    assert (tmp_path / "f.inp").read_text() == (
+        "! PBE\n%scf\n efield 1.0, 1.0, 1.0\nend\n* xyz 0 1\nH 0.0 0.0 0.0\n*\n"
+    )
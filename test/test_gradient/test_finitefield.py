@@ -0,0 +1,64 @@
+"""
+Test the finite-field stencils on analytical field expansions.
+"""
+
+from __future__ import annotations
+
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from numgradpy.gradient import FieldStencil, central_stencil
+
+
+def symmetric(rank: int) -> np.ndarray:
+    tensor = np.random.rand(*(3,) * rank)
+    perms = list(permutations(range(rank)))
+    return sum(np.transpose(tensor, perm) for perm in perms) / len(perms)
+
+
+def test_central_stencil() -> None:
+    assert central_stencil(1) == pytest.approx({-1: -0.5, 1: 0.5})
+    assert central_stencil(4) == pytest.approx({-2: 1, -1: -4, 0: 6, 1: -4, 2: 1})
+
+
+def test_unique_points() -> None:
+    # the diagonal and off-diagonal stencils share the axial points
+    assert len(FieldStencil(2).points) == 19
+    assert len(FieldStencil(3).points) == 32
+    assert len(FieldStencil(1, [(2,)]).points) == 2
+
+
+def test_hyperpolarizabilities() -> None:
+    mu, alpha = symmetric(1), symmetric(2)
+    beta, gamma = symmetric(3), symmetric(4)
+    step = 1e-2
+
+    def energy(f: np.ndarray) -> float:
+        return float(
+            -mu @ f
+            - np.einsum("ij,i,j", alpha, f, f) / 2
+            - np.einsum("ijk,i,j,k", beta, f, f, f) / 6
+            - np.einsum("ijkl,i,j,k,l", gamma, f, f, f, f) / 24
+        )
+
+    def dipole(f: np.ndarray) -> np.ndarray:
+        return (
+            mu
+            + alpha @ f
+            + np.einsum("ijk,j,k", beta, f, f) / 2
+            + np.einsum("ijkl,j,k,l", gamma, f, f, f) / 6
+        )
+
+    # the stencils are exact for polynomials of one degree more than the order
+    for order, tensor in ((3, beta), (4, gamma)):
+        stencil = FieldStencil(order)
+        energies = np.array([energy(f) for f in stencil.fields(step)])
+        assert pytest.approx(tensor, abs=1e-6) == -stencil.tensor(energies, step)
+
+        stencil = FieldStencil(order - 1)
+        dipoles = np.array([dipole(f) for f in stencil.fields(step)])
+        assert pytest.approx(tensor, abs=1e-8) == np.moveaxis(
+            stencil.tensor(dipoles, step), -1, 0
+        )
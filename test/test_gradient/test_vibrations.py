@@ -0,0 +1,38 @@
+"""
+Test the spectral intensities of the harmonic analysis.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from numgradpy.constants import AU2A4AMU, AU2KMMOL
+from numgradpy.gradient import ir_intensities, raman_activities
+
+
+def test_ir_intensities() -> None:
+    modes = np.array([[1.0, 0.0], [0.0, 0.0], [0.0, 2.0]])
+    dipgrad = np.array([[0.1, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.3]])
+    assert pytest.approx([0.01 * AU2KMMOL, 0.36 * AU2KMMOL]) == ir_intensities(
+        dipgrad, modes
+    )
+
+
+def test_raman_activities() -> None:
+    modes = np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+    dalpha = np.zeros((3, 3, 3), dtype=np.float64)
+    # isotropic derivative along the first mode: 45 a'^2
+    dalpha[0] = 0.2 * np.eye(3)
+    # uniaxial derivative along the second mode: 45 (c/3)^2 + 7 c^2
+    dalpha[1, 2, 2] = 0.2
+    assert pytest.approx([45 * 0.04 * AU2A4AMU, 12 * 0.04 * AU2A4AMU]) == (
+        raman_activities(dalpha, modes)
+    )
+    # the activity does not depend on the order of the field and the dipole
+    dalpha[1, 0, 1] = 0.1
+    symmetric = dalpha.copy()
+    symmetric[1, 0, 1] = symmetric[1, 1, 0] = 0.05
+    assert pytest.approx(raman_activities(symmetric, modes)) == raman_activities(
+        dalpha, modes
+    )
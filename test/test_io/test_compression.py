@@ -0,0 +1,29 @@
+"""
+Test the transparent reading of compressed output files.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from numgradpy.io import get_orca_energy
+from numgradpy.io.compression import compress_file, open_text
+
+
+def test_gzip(tmp_path: Path) -> None:
+    fname = tmp_path / "sp.out"
+    fname.write_text("FINAL SINGLE POINT ENERGY      -1.5\n", encoding="UTF-8")
+
+    compressed = compress_file(str(fname))
+    assert compressed == str(fname) + ".gz"
+    assert not fname.exists()
+    with open_text(str(fname)) as f:
+        assert f.read().startswith("FINAL")
+    assert pytest.approx(-1.5) == get_orca_energy(str(fname))
+
+    with pytest.raises(FileNotFoundError):
+        open_text(str(tmp_path / "missing.out"))
+    with pytest.raises(ValueError):
+        compress_file(compressed, "lzma")
@@ -0,0 +1,109 @@
+"""
+Test the parsers for ORCA output files.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.io import (
+    get_orca_engrad,
+    get_orca_polarizability,
+    get_orca_scf_iterations,
+    read_displacement_vectors,
+)
+
+ENGRAD = """\
+#
+# Number of atoms
+#
+ 3
+#
+# The current total energy in Eh
+#
+    -76.358925362498
+#
+# The current gradient in Eh/bohr
+#
+       0.000000000117
+      -0.000000000035
+      -0.005287624394
+      -0.000000000130
+       0.003120476451
+       0.002643812081
+       0.000000000013
+      -0.003120476416
+       0.002643812313
+#
+# The atomic numbers and current coordinates in Bohr
+#
+   8     0.0000000    0.0000000   -0.1294800
+   1     0.0000000    1.4941800    1.0274500
+   1     0.0000000   -1.4941800    1.0274500
+"""
+
+
+def test_orca_engrad(tmp_path: Path) -> None:
+    fname = tmp_path / "h2o.engrad"
+    fname.write_text(ENGRAD, encoding="UTF-8")
+    energy, gradient = get_orca_engrad(str(fname))
+    assert pytest.approx(-76.358925362498) == energy
+    assert gradient.shape == (3, 3)
+    assert pytest.approx(-0.005287624394) == gradient[0, 2]
+    assert pytest.approx(0.0, abs=1e-8) == np.sum(gradient, axis=0)
+
+    fname.write_text(ENGRAD[:200], encoding="UTF-8")
+    with pytest.raises(RuntimeError):
+        get_orca_engrad(str(fname))
+
+
+def test_orca_scf_iterations(tmp_path: Path) -> None:
+    fname = tmp_path / "eq.out"
+    fname.write_text(
+        "                  *****************************************************\n"
+        "                  *                     SUCCESS                       *\n"
+        "                  *           SCF CONVERGED AFTER  11 CYCLES          *\n"
+        "                  *****************************************************\n",
+        encoding="UTF-8",
+    )
+    assert get_orca_scf_iterations(str(fname)) == 11
+
+    fname.write_text("FINAL SINGLE POINT ENERGY  -1.0\n", encoding="UTF-8")
+    assert get_orca_scf_iterations(str(fname)) is None
+
+
+def test_displacement_vectors(tmp_path: Path) -> None:
+    vectors = np.arange(12, dtype=np.float64).reshape(2, 6)
+    np.save(tmp_path / "modes.npy", vectors)
+    np.savetxt(tmp_path / "modes.txt", vectors.reshape(4, 3))
+    for name in ("modes.npy", "modes.txt"):
+        assert pytest.approx(vectors) == read_displacement_vectors(
+            str(tmp_path / name), 2
+        )
+    with pytest.raises(ValueError):
+        read_displacement_vectors(str(tmp_path / "modes.txt"), 3)
+
+
+def test_orca_polarizability(tmp_path: Path) -> None:
+    (tmp_path / "sp.out").write_text(
+        "-------------------------\n"
+        "THE POLARIZABILITY TENSOR\n"
+        "-------------------------\n"
+        "\n"
+        "The raw cartesian tensor (atomic units):\n"
+        "       8.4327   0.0000   0.0010\n"
+        "       0.0000   5.9126   0.0000\n"
+        "       0.0010   0.0000   7.0271\n"
+        "diagonalized tensor:\n"
+        "       5.9126   7.0271   8.4327\n"
+    )
+    alpha = get_orca_polarizability(str(tmp_path / "sp.out"))
+    assert pytest.approx(np.diag([8.4327, 5.9126, 7.0271]), abs=2e-3) == alpha
+    assert alpha[0, 2] == pytest.approx(0.001)
+
+    (tmp_path / "none.out").write_text("FINAL SINGLE POINT ENERGY -1.0\n")
+    with pytest.raises(RuntimeError):
+        get_orca_polarizability(str(tmp_path / "none.out"))
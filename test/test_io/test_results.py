@@ -0,0 +1,73 @@
+"""
+Test the binary results store.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.io import ResultsReader, ResultsStore, Structure
+
+
+def test_store_roundtrip(tmp_path: Path) -> None:
+    struc = Structure()
+    struc.set_structure(["O", "H", "H"], np.arange(9, dtype=np.float64))
+    struc.charge = -1
+    struc.multiplicity = 2
+    gradient = np.linspace(-1.0, 1.0, 9).reshape(3, 3)
+
+    path = str(tmp_path / "results.ngp")
+    with ResultsStore(path) as store:
+        store.add_structure(0, struc)
+        store.add_singlepoint(0, "eq", -76.0)
+        store.add_singlepoint(
+            0,
+            "nuclear",
+            -75.9,
+            atom=1,
+            coordinate=2,
+            step=-1e-3,
+            dipole=np.array([0.1, 0.2, 0.3]),
+        )
+
+    # appending to an existing store
+    with ResultsStore(path) as store:
+        store.add_tensor(0, "gradient", gradient)
+        store.add_structure(1, struc)
+        store.add_tensor(1, "dipole", np.ones(3))
+
+    reader = ResultsReader(path)
+    sps = reader.singlepoints
+    assert isinstance(sps, np.memmap)
+    assert list(sps["kind"]) == [b"eq", b"nuclear"]
+    assert sps["atom"][1] == 1 and sps["coordinate"][1] == 2
+    assert pytest.approx(-1e-3) == sps["step"][1]
+    assert np.isnan(sps["dipole"][0]).all()
+    assert pytest.approx([0.1, 0.2, 0.3]) == sps["dipole"][1]
+
+    newstruc = reader.structure(1)
+    assert newstruc.atoms == ["O", "H", "H"]
+    assert newstruc.charge == -1 and newstruc.multiplicity == 2
+    assert (newstruc.coordinates == struc.coordinates).all()
+
+    assert (reader.tensor(0, "gradient") == gradient).all()
+    assert (reader.tensor(1, "dipole") == 1.0).all()
+    with pytest.raises(KeyError):
+        reader.tensor(1, "alpha")
+
+
+def test_store_truncated_record(tmp_path: Path) -> None:
+    path = tmp_path / "results.ngp"
+    with ResultsStore(str(path)) as store:
+        store.add_singlepoint(0, "eq", -1.0)
+    # simulate an interrupted write
+    with open(path / "singlepoints.bin", "ab") as file:
+        file.write(b"\0" * 5)
+
+    assert len(ResultsReader(str(path)).singlepoints) == 1
+    with ResultsStore(str(path)) as store:
+        store.add_singlepoint(0, "eq", -2.0)
+    assert list(ResultsReader(str(path)).singlepoints["energy"]) == [-1.0, -2.0]
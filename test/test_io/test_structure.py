@@ -0,0 +1,179 @@
+"""
+Test the structure class.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.constants import AA2AU
+from numgradpy.io import Structure, detect_format
+
+
+def make_structure() -> Structure:
+    struc = Structure()
+    struc.set_structure(
+        ["O", "H", "H"],
+        np.array([[0.0, 0.0, 0.1], [0.0, 1.4, -0.9], [0.0, -1.4, -0.9]]),
+    )
+    return struc
+
+
+def test_displaced_coordinates() -> None:
+    struc = make_structure()
+    fdiff = 5e-3
+    displaced = struc.displaced_coordinates(fdiff)
+    assert displaced.shape == (18, 3, 3)
+
+    # reference: element-wise modification as done previously
+    for i in range(struc.nat):
+        for j in range(3):
+            for k, sign in enumerate((1.0, -1.0)):
+                ref = struc.copy()
+                ref.modify_structure(i, j, sign * fdiff, verbose=False)
+                assert pytest.approx(ref.coordinates) == displaced[6 * i + 2 * j + k]
+
+    # the original structure must not be changed
+    assert pytest.approx(make_structure().coordinates) == struc.coordinates
+
+
+def test_iter_displaced_coordinates() -> None:
+    struc = make_structure()
+    blocks = list(struc.iter_displaced_coordinates(1e-3, maxbytes=1))
+    assert [first for first, _ in blocks] == [0, 1, 2]
+    stacked = np.concatenate([block for _, block in blocks])
+    assert pytest.approx(struc.displaced_coordinates(1e-3)) == stacked
+
+
+def test_write_read_xyz(tmp_path: Path) -> None:
+    struc = make_structure()
+    fnames = [str(tmp_path / f"disp_{k}.xyz") for k in range(18)]
+    displaced = struc.displaced_coordinates(1e-3)
+    struc.write_xyz_batch(fnames, displaced, verbose=False)
+
+    for fname, ref in zip(fnames, displaced):
+        newstruc = Structure()
+        nat, atoms, coords = newstruc.read_xyz(fname)
+        assert nat == 3
+        assert atoms == ["O", "H", "H"]
+        assert pytest.approx(ref, abs=1e-12 * AA2AU) == coords
+
+
+def test_slots() -> None:
+    struc = make_structure()
+    assert struc.coordinates.flags["C_CONTIGUOUS"]
+    with pytest.raises(AttributeError):
+        struc.foo = 0  # type: ignore[attr-defined]
+
+
+def test_coord_roundtrip(tmp_path: Path) -> None:
+    coord = tmp_path / "coord"
+    coord.write_text(
+        "$coord\n"
+        "    0.00000000000000      0.00000000000000      0.12345678901234  o\n"
+        "    0.00000000000000      1.43000000000000     -0.98765432109876  h\n"
+        "    0.00000000000000     -1.43000000000000     -0.98765432109876  h f\n"
+        "$user-defined bonds\n"
+        "$end\n",
+        encoding="UTF-8",
+    )
+    struc = Structure()
+    nat, atoms, coords = struc.read(str(coord))
+    assert struc.filetype == "coord"
+    assert nat == 3
+    assert atoms == ["O", "H", "H"]
+    # atomic units are taken over without conversion
+    assert coords[0, 2] == 0.12345678901234
+    assert coords[1, 1] == 1.43
+
+    newfile = tmp_path / "new.coord"
+    struc.write(str(newfile), verbose=False)
+    newstruc = Structure()
+    newstruc.read(str(newfile))
+    assert newstruc.atoms == atoms
+    assert (newstruc.coordinates == coords).all()
+
+
+def test_extended_xyz(tmp_path: Path) -> None:
+    xyzfile = tmp_path / "ion.xyz"
+    xyzfile.write_text(
+        "2\n"
+        'charge=-1 mult=2 efield="0.0 0.0 0.001" comment=anion\n'
+        "O 0.0 0.0 0.0\n"
+        "H 0.0 0.0 0.97\n",
+        encoding="UTF-8",
+    )
+    struc = Structure()
+    struc.read(str(xyzfile))
+    assert struc.charge == -1
+    assert struc.multiplicity == 2
+    assert struc.efield is not None
+    assert pytest.approx([0.0, 0.0, 0.001]) == struc.efield
+
+    newfile = tmp_path / "ion_new.xyz"
+    struc.write_xyz(str(newfile), verbose=False)
+    newstruc = Structure()
+    newstruc.read(str(newfile))
+    assert newstruc.charge == -1
+    assert newstruc.multiplicity == 2
+    assert pytest.approx(struc.efield) == newstruc.efield
+    assert pytest.approx(struc.coordinates) == newstruc.coordinates
+
+
+def test_read_resets_metadata(tmp_path: Path) -> None:
+    ion = tmp_path / "ion.xyz"
+    ion.write_text(
+        '2\ncharge=-1 mult=2 efield="0.0 0.0 0.001"\nO 0.0 0.0 0.0\nH 0.0 0.0 0.97\n',
+        encoding="UTF-8",
+    )
+    neutral = tmp_path / "neutral.xyz"
+    neutral.write_text("2\n\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n", encoding="UTF-8")
+    coord = tmp_path / "coord"
+    coord.write_text("$coord\n 0.0 0.0 0.0 h\n 0.0 0.0 1.4 h\n$end\n", encoding="UTF-8")
+
+    # the charge, multiplicity and field of one structure do not leak into
+    # the next one read by the same object
+    for filename in (neutral, coord):
+        struc = Structure()
+        struc.read(str(ion))
+        assert struc.charge == -1
+        struc.read(str(filename))
+        assert struc.charge is None
+        assert struc.multiplicity is None
+        assert struc.efield is None
+
+
+def test_coord_modifiers(tmp_path: Path) -> None:
+    coord = tmp_path / "coord"
+    coord.write_text(
+        "$coord natoms=2\n 0.0 0.0 0.0 h f\n 0.0 0.0 1.4 h\n$end\n",
+        encoding="UTF-8",
+    )
+    struc = Structure()
+    nat, atoms, coords = struc.read(str(coord))
+    assert nat == 2
+    assert atoms == ["H", "H"]
+    assert coords[1, 2] == 1.4
+
+    coord.write_text("$coord frac\n 0.0 0.0 0.0 h\n$end\n", encoding="UTF-8")
+    with pytest.raises(ValueError, match="Fractional coordinates"):
+        struc.read(str(coord))
+
+
+def test_detect_format(tmp_path: Path) -> None:
+    noext = tmp_path / "geometry"
+    noext.write_text("\n$coord\n 0.0 0.0 0.0 he\n$end\n", encoding="UTF-8")
+    assert detect_format(str(noext)) == "coord"
+    noext.write_text("1\n\nHe 0.0 0.0 0.0\n", encoding="UTF-8")
+    assert detect_format(str(noext)) == "xyz"
+    assert detect_format(str(tmp_path / "coord")) == "coord"
+
+    # files recognised by their content are read whatever their suffix
+    text = tmp_path / "mol.txt"
+    text.write_text("1\n\nHe 0.0 0.0 1.0\n", encoding="UTF-8")
+    struc = Structure()
+    struc.read(str(text))
+    assert struc.atoms == ["He"] and struc.filetype == "xyz"
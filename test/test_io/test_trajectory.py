@@ -0,0 +1,73 @@
+"""
+Test the indexed multi-frame XYZ reader.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.constants import AA2AU
+from numgradpy.io import XYZTrajectory
+from numgradpy.io import trajectory as trajmodule
+
+
+def write_trajectory(fname: Path, nframes: int, end: str = "\n") -> None:
+    frames = []
+    for i in range(nframes):
+        nat = 1 + i % 3
+        lines = [f"{nat}", f"frame={i} charge={i % 2}"]
+        for k in range(nat):
+            lines.append(f"H {0.1 * i:.4f} {float(k):.4f} -1.0000")
+        frames.append("\n".join(lines))
+    fname.write_text("\n".join(frames) + end, encoding="UTF-8")
+
+
+@pytest.mark.parametrize("end", ["\n", "", "\n\n  \n"])
+@pytest.mark.parametrize("chunk", [7, 2**26])
+def test_random_access(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, end: str, chunk: int
+) -> None:
+    monkeypatch.setattr(trajmodule, "SCAN_CHUNK", chunk)
+    fname = tmp_path / "traj.xyz"
+    write_trajectory(fname, 25, end)
+
+    with XYZTrajectory(str(fname), cache=False) as traj:
+        assert len(traj) == 25
+        for i in (0, 13, 24, -1):
+            struc = traj[i]
+            i = i % 25
+            assert struc.nat == 1 + i % 3
+            assert struc.charge == i % 2
+            assert pytest.approx(0.1 * i * AA2AU) == struc.coordinates[0, 0]
+            assert (
+                pytest.approx(np.arange(struc.nat) * AA2AU) == struc.coordinates[:, 1]
+            )
+        with pytest.raises(IndexError):
+            traj.read_frame(25)
+
+
+def test_index_cache(tmp_path: Path) -> None:
+    fname = tmp_path / "traj.xyz"
+    write_trajectory(fname, 10)
+
+    with XYZTrajectory(str(fname)) as traj:
+        offsets = traj.offsets.copy()
+    assert Path(str(fname) + ".idx.npy").exists()
+
+    with XYZTrajectory(str(fname)) as traj:
+        assert (traj.offsets == offsets).all()
+
+    # a modified trajectory invalidates the cached index
+    write_trajectory(fname, 4)
+    with XYZTrajectory(str(fname)) as traj:
+        assert len(traj) == 4
+
+
+def test_incomplete_frame(tmp_path: Path) -> None:
+    fname = tmp_path / "traj.xyz"
+    fname.write_text("2\n\nH 0.0 0.0 0.0\n", encoding="UTF-8")
+    with pytest.raises(ValueError):
+        XYZTrajectory(str(fname), cache=False)
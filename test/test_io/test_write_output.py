@@ -0,0 +1,61 @@
+"""
+Test the Turbomole-style output files.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from numgradpy.io import Structure, write_tm_gradient, write_tm_hessian
+from numgradpy.io.write_output import format_block, gradient_cycles
+
+
+def test_format_block() -> None:
+    block = format_block([[1.0, -2.5], [0.25, 4.0]], "%6.2f%6.2f %s", ["H", "O"])
+    assert block == "  1.00 -2.50 H\n  0.25  4.00 O\n"
+    assert format_block(np.zeros((0, 3)), "%f %f %f") == ""
+
+
+def test_gradient_cycles(tmp_path: Path) -> None:
+    struc = Structure()
+    struc.nat = 2
+    struc.atoms = ["H", "H"]
+    struc.coordinates = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 1.4]])
+    outfile = str(tmp_path / "gradient")
+
+    gradients = [np.full((2, 3), 0.1 * n) for n in range(3)]
+    for n, gradient in enumerate(gradients):
+        assert (
+            write_tm_gradient(gradient, -1.0 - n, struc, outfile, append=True) == n + 1
+        )
+
+    lines = Path(outfile).read_text().splitlines()
+    assert lines[0].startswith("$grad") and lines[-1] == "$end"
+    assert lines.count("$end") == 1
+    assert [line.split()[2] for line in lines if "cycle" in line] == ["1", "2", "3"]
+    # every cycle holds the coordinates and the gradient
+    last = np.array([line.split() for line in lines[-3:-1]], dtype=float)
+    assert pytest.approx(gradients[-1]) == last
+    assert lines[-5].split()[-1] == "H"
+
+    # without 'append' the previous cycles are replaced
+    assert write_tm_gradient(gradients[0], -1.0, struc, outfile) == 1
+    assert gradient_cycles(Path(outfile).read_text()) == 1
+    assert os.listdir(tmp_path) == ["gradient"]
+
+
+def test_hessian_layout(tmp_path: Path) -> None:
+    hessian = np.arange(49, dtype=float).reshape(7, 7)
+    write_tm_hessian(hessian, str(tmp_path / "hessian"))
+
+    lines = (tmp_path / "hessian").read_text().splitlines()
+    assert lines[0] == "$hessian" and lines[-1] == "$end"
+    assert len(lines) == 2 + 7 * 2
+    assert lines[3].split() == ["2", "1", "7.0000000000", "8.0000000000"] + [
+        f"{x:.10f}" for x in (9.0, 10.0, 11.0)
+    ]
+    assert lines[4].split() == ["2", "2", "12.0000000000", "13.0000000000"]
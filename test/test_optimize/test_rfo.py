@@ -0,0 +1,30 @@
+"""
+Test the RFO optimiser on an analytical function.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from numgradpy.optimize import RFOptimizer
+
+
+def test_quadratic() -> None:
+    hessian = np.diag([0.1, 0.5, 2.0])
+    minimum = np.array([0.3, -0.2, 0.1])
+    x = np.zeros((3), dtype=np.float64)
+
+    optimizer = RFOptimizer(3, trustradius=0.3)
+    for _ in range(50):
+        gradient = hessian @ (x - minimum)
+        energy = 0.5 * (x - minimum) @ gradient
+        if optimizer.converged(None, gradient):
+            break
+        x = optimizer.step(x, energy, gradient)
+        # steps are limited by the trust radius
+        assert np.linalg.norm(optimizer.laststep) <= 0.3 + 1e-12
+    else:
+        pytest.fail("RFO did not converge.")
+
+    assert pytest.approx(minimum, abs=1e-3) == x